@@ -1,10 +1,19 @@
 # app.py - ENHANCED VERSION WITH INTEGRATED STEP VIEWER + ACCESS TOKEN ROUTE
-from flask import Flask, jsonify, send_from_directory, redirect, url_for
+import time
+_STARTUP_BEGIN = time.perf_counter()
+
+import hmac
+import threading
+from flask import Flask, jsonify, send_from_directory, redirect, url_for, Response, request
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager
+from flask_jwt_extended import JWTManager, verify_jwt_in_request, get_jwt
 from config import Config
 from utils.database import db
 from services.auth_service import AuthService
+from utils.auth_utils import is_admin
+from services.metrics import registry
+from services.geometry_worker import get_geometry_pool
+from services.analysis_jobs import get_job_manager
 
 # Import controllers
 from controllers.auth_controller import auth_bp
@@ -439,6 +448,7 @@ def create_app():
                 "database": "connected",
                 "collections": collections_info,
                 "step_viewer": step_viewer_status,
+                "startup_seconds": app.config.get('STARTUP_SECONDS'),
                 "features": {
                     "enhanced_step_viewer": "active",
                     "step_analysis": "active",
@@ -459,6 +469,13 @@ def create_app():
                 "timestamp": "2025-01-01T00:00:00Z"
             }), 500
     
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus text formatında aşama süreleri, sayaçlar ve kuyruk durumu (METRICS_TOKEN veya admin)"""
+        if not _metrics_authorized():
+            return jsonify({"success": False, "message": "Metriklere erişim yetkiniz yok"}), 401
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+    
     @app.route('/api/info')
     def api_info():
         """API bilgileri ve sürüm detayları"""
@@ -606,8 +623,41 @@ def create_app():
         
         return response
     
+    # ✅ Açılış süresi - ağır bilimsel kütüphaneler burada yüklenmez (ilk kullanımda / worker'larda)
+    startup_seconds = time.perf_counter() - _STARTUP_BEGIN
+    app.config['STARTUP_SECONDS'] = round(startup_seconds, 3)
+    registry.set("engteklif_startup_seconds", startup_seconds, "API açılış süresi (import + create_app)")
+    print(f"[STARTUP] ⏱️ API {startup_seconds:.2f}s içinde hazır")
+    
+    # Geometri worker'larını arka planda hazırla (CadQuery import'u worker süreçlerinde)
+    geometry_pool = get_geometry_pool()
+    if geometry_pool is not None and Config.GEOMETRY_WORKERS_PREWARM > 0:
+        geometry_pool.prewarm(Config.GEOMETRY_WORKERS_PREWARM)
+    
+    # Yeniden başlatma sonrası yarım kalan analizleri arka planda tekrar kuyruğa al
+    threading.Thread(target=_recover_analysis_jobs, name="analysis-job-recovery", daemon=True).start()
+    
     return app
 
+def _metrics_authorized():
+    """/metrics: Bearer METRICS_TOKEN (Prometheus) veya admin rolündeki JWT"""
+    auth_header = request.headers.get('Authorization', '')
+    if Config.METRICS_TOKEN and auth_header.startswith('Bearer '):
+        if hmac.compare_digest(auth_header[len('Bearer '):], Config.METRICS_TOKEN):
+            return True
+
+    try:
+        verify_jwt_in_request()
+        return is_admin(get_jwt().get('role'))
+    except Exception:
+        return False
+
+def _recover_analysis_jobs():
+    try:
+        get_job_manager().recover_stale()
+    except Exception as e:
+        print(f"[JOBS] ⚠️ Yarım kalan analizler kontrol edilemedi: {e}")
+
 # Create app instance
 app = create_app()
 
@@ -15,4 +15,78 @@ class Config:
     BCRYPT_LOG_ROUNDS = 12
     
     ADMIN_USERNAME = os.getenv('ADMIN_USERNAME', 'admin')
-    ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', 'engteklif')
\ No newline at end of file
+    ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', 'engteklif')
+    
+    # Malzeme maliyetinde stok hacmi: aabb (eksen hizalı prizma), obb, cylinder, min
+    STOCK_FIT_METHOD = os.getenv('STOCK_FIT_METHOD', 'aabb')
+    
+    # Geometri worker havuzu (CadQuery/OCCT işleri ayrı süreçlerde çalışır)
+    GEOMETRY_WORKERS_ENABLED = os.getenv('GEOMETRY_WORKERS_ENABLED', 'true').lower() == 'true'
+    GEOMETRY_WORKERS = int(os.getenv('GEOMETRY_WORKERS', min(4, os.cpu_count() or 1)))
+    GEOMETRY_JOB_TIMEOUT = int(os.getenv('GEOMETRY_JOB_TIMEOUT', 300))              # saniye
+    GEOMETRY_WORKER_MEMORY_MB = int(os.getenv('GEOMETRY_WORKER_MEMORY_MB', 2048))   # RLIMIT_AS
+    GEOMETRY_WORKER_MAX_JOBS = int(os.getenv('GEOMETRY_WORKER_MAX_JOBS', 20))       # sonra yenilenir
+    # CadQuery/matplotlib yalnızca worker'larda yüklenir; açılışta hazır bekleyen worker sayısı
+    GEOMETRY_PRELOAD_MODULES = os.getenv(
+        'GEOMETRY_PRELOAD_MODULES', 'services.geometry_jobs,services.step_analysis,services.step_renderer'
+    ).split(',')
+    GEOMETRY_WORKERS_PREWARM = int(os.getenv('GEOMETRY_WORKERS_PREWARM', 1))
+    
+    # Görünüm seti (izometrik, wireframe, teknik, malzeme, 6 ortografik) worker içinde fork edilen
+    # süreçlerde paralel render edilir; 1 = sıralı. Varsayılan: çekirdekler geometri worker'ları
+    # arasında paylaştırılır (her worker kendi render havuzunu açar)
+    RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', max(1, (os.cpu_count() or 1) // GEOMETRY_WORKERS)))
+    # lazy: analiz yalnızca izometrik render'ı üretir, diğer görünümler ilk istendiğinde render edilir
+    # eager: tüm görünüm seti + OBJ/PLY/viewer HTML analiz sırasında üretilir
+    RENDER_MODE = os.getenv('RENDER_MODE', 'lazy').lower()
+    # Görünümler HLR kenarlarından doğrudan rasterize edilir; SVG yalnızca istenirse yazılır
+    RENDER_SVG = os.getenv('RENDER_SVG', 'false').lower() == 'true'
+    # Projeksiyon görünümleri (izometrik, ortografik): NumPy z-buffer ile gölgeli mesh
+    # shaded_edges: gölgeli + görünen HLR kenarları, shaded: yalnızca gölgeli, lines: gizli çizgili kenar çizimi
+    RENDER_STYLE = os.getenv('RENDER_STYLE', 'shaded_edges').lower()
+    RENDER_SHADING = os.getenv('RENDER_SHADING', 'gouraud').lower()     # gouraud / flat
+    
+    # Adaptif tessellation: LOD başına (bbox köşegen oranı, açısal sapma radyan);
+    # lineer sapma köşegen * oran olarak seçilir ve mm sınırları içinde tutulur
+    TESSELLATION_LODS = {
+        'analysis': (float(os.getenv('TESSELLATION_ANALYSIS_RATIO', 0.0005)), 0.2),
+        'viewer_high': (float(os.getenv('TESSELLATION_VIEWER_HIGH_RATIO', 0.001)), 0.3),
+        'viewer_low': (float(os.getenv('TESSELLATION_VIEWER_LOW_RATIO', 0.005)), 0.5)
+    }
+    TESSELLATION_MIN_DEFLECTION = float(os.getenv('TESSELLATION_MIN_DEFLECTION', 0.001))   # mm
+    TESSELLATION_MAX_DEFLECTION = float(os.getenv('TESSELLATION_MAX_DEFLECTION', 2.0))     # mm
+    # OCCT BRepMesh paralel modu - büyük modellerin yüzeyleri tüm çekirdeklerde üçgenlenir
+    TESSELLATION_PARALLEL = os.getenv('TESSELLATION_PARALLEL', 'true').lower() == 'true'
+    # Viewer için progressive mesh: viewer_low altındaki ek kaba seviyelerin vertex clustering grid çözünürlükleri
+    MESH_LOD_GRIDS = [int(grid) for grid in os.getenv('MESH_LOD_GRIDS', '48').split(',') if grid.strip()]
+    
+    # PDF sayfa raster önbelleği: (PDF hash, sayfa, dpi, döndürme) başına bir PPM dosyası;
+    # OCR, PDF render'ları ve malzeme araması aynı raster'ları kullanır
+    PAGE_RASTER_DIR = os.getenv('PAGE_RASTER_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp', 'page_rasters'))
+    PAGE_RASTER_CACHE_MB = int(os.getenv('PAGE_RASTER_CACHE_MB', 2048))
+    # Gömülü metin katmanı en az bu kadar harf/rakam içeriyorsa sayfa OCR'lanmaz
+    TEXT_LAYER_MIN_CHARS = int(os.getenv('TEXT_LAYER_MIN_CHARS', 20))
+    # Sayfa yönü tespiti: düşük çözünürlüklü raster üzerinde Tesseract OSD, güven eşiğinin
+    # altında metin satırı ekseni tahmini (4 yönde OCR yerine)
+    ORIENTATION_DPI = int(os.getenv('ORIENTATION_DPI', 150))
+    ORIENTATION_MIN_CONFIDENCE = float(os.getenv('ORIENTATION_MIN_CONFIDENCE', 2.0))
+    # Tam sayfa OCR'da ortalama kelime güveni bu eşiğin üstündeyse sayfa o yönde okunabilir
+    # sayılır; malzeme bulunamasa da diğer aday yön denenmez
+    OCR_READABLE_CONFIDENCE = float(os.getenv('OCR_READABLE_CONFIDENCE', 60))
+    OCR_READABLE_MIN_WORDS = int(os.getenv('OCR_READABLE_MIN_WORDS', 10))
+    # Antet (title block) tespiti bu çözünürlükte yapılır; yalnızca antet bölgesi 300 dpi'da OCR'lanır
+    LAYOUT_DPI = int(os.getenv('LAYOUT_DPI', 100))
+    # Sayfa başına tek yapılandırılmış OCR (kelime, kutu, güven) - sayfa raster anahtarı ile saklanır
+    OCR_CACHE_DIR = os.getenv('OCR_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp', 'ocr'))
+
+    # API açılış süresi bütçesi (measure_startup.py bu sınırı kontrol eder)
+    STARTUP_BUDGET_SECONDS = float(os.getenv('STARTUP_BUDGET_SECONDS', 1.0))
+    
+    # Asenkron analiz kuyruğu (POST /analyze 202 + job id döner, /batch-analyze paralel çalışır)
+    ANALYSIS_JOB_WORKERS = int(os.getenv('ANALYSIS_JOB_WORKERS', GEOMETRY_WORKERS))
+    BATCH_ANALYZE_MAX_FILES = int(os.getenv('BATCH_ANALYZE_MAX_FILES', 500))
+    ANALYSIS_STALE_SECONDS = int(os.getenv('ANALYSIS_STALE_SECONDS', 3600))   # yarım kalmış işler
+    
+    # /metrics erişimi: Prometheus "Authorization: Bearer <METRICS_TOKEN>" ile okur;
+    # token tanımlı değilse yalnızca admin JWT'si kabul edilir (dosya adları / kuyruk durumu dışarı açılmaz)
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
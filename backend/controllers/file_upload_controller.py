@@ -3,16 +3,21 @@
 import os
 import time
 import uuid
-from flask import Blueprint, request, jsonify, send_file, Response, send_from_directory
+from flask import Blueprint, request, jsonify, send_file, Response, send_from_directory, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
 from werkzeug.datastructures import FileStorage
 from typing import List, Dict, Any
 from models.user import User
 from models.file_analysis import FileAnalysis, FileAnalysisCreate
-from services.material_analysis import MaterialAnalysisService, CostEstimationService
-from services.step_renderer import StepRendererEnhanced
-import numpy as np
+from services.analysis_jobs import AnalysisRunner, get_job_manager
+from services.analysis_events import get_event_bus
+from services.metrics import timed
+from config import Config
+from services.geometry_worker import run_geometry_job
+from services.geometry_jobs import render_step_job, export_stl_job, compact_mesh_job
+from services.render_on_demand import OnDemandRenderService
+from services.render_store import RenderStore
 import math
 
 # Blueprint oluştur
@@ -243,9 +248,16 @@ def upload_multiple_files():
 @upload_bp.route('/analyze/<analysis_id>', methods=['POST'])
 @jwt_required()
 def analyze_uploaded_file(analysis_id):
-    """✅ ENHANCED - Yüklenmiş dosyayı analiz et + STEP viewer entegrasyonu"""
+    """
+    ✅ ASYNC - Yüklenmiş dosyayı analiz kuyruğuna al (202 + job id)
+
+    Body (opsiyonel):
+        stock_method: aabb, obb, cylinder, min
+        wait: true ise analiz senkron çalışır ve sonuç doğrudan döner
+    """
     try:
         current_user = get_current_user()
+        options = request.get_json(silent=True) or {}
         
         # Analiz kaydını bul
         analysis = FileAnalysis.find_by_id(analysis_id)
@@ -269,188 +281,36 @@ def analyze_uploaded_file(analysis_id):
                 "message": "Dosya sistemde bulunamadı"
             }), 404
         
+        job_manager = get_job_manager()
+        
         # Analiz durumu kontrolü
-        if analysis['analysis_status'] == 'analyzing':
+        if job_manager.is_active(analysis):
             return jsonify({
                 "success": False,
-                "message": "Dosya zaten analiz ediliyor"
+                "message": "Dosya zaten analiz ediliyor",
+                "analysis_id": analysis_id,
+                "status": analysis['analysis_status'],
+                "job_id": analysis.get('job_id'),
+                "status_url": f"/api/upload/status/{analysis_id}"
             }), 409
         
-        # Analiz durumunu güncelle
-        FileAnalysis.update_analysis(analysis_id, {
-            "analysis_status": "analyzing",
-            "processing_time": None,
-            "error_message": None
-        })
+        # Senkron mod - eski istemciler için
+        if options.get('wait'):
+            response_data, http_status = AnalysisRunner.run(
+                analysis_id, current_user['id'], stock_method=options.get('stock_method')
+            )
+            return jsonify(response_data), http_status
         
-        start_time = time.time()
+        job = job_manager.submit(analysis_id, current_user['id'], stock_method=options.get('stock_method'))
         
-        # ✅ Material Analysis Service kullan
-        try:
-            material_service = MaterialAnalysisService()
-            
-            print(f"[ANALYSIS] 🔍 Enhanced analiz başlatılıyor: {analysis['file_type']} - {analysis['original_filename']}")
-            
-            # Kapsamlı analiz
-            if analysis['file_type'] in ['pdf', 'document', 'step']:
-                result = material_service.analyze_document_comprehensive(
-                    analysis['file_path'], 
-                    analysis['file_type'],
-                    current_user['id']
-                )
-                
-                print(f"[ANALYSIS] 📊 Material analysis tamamlandı - Success: {not result.get('error')}")
-                
-                analysis_success = not result.get('error')
-                
-                if analysis_success:
-                    processing_time = time.time() - start_time
-                    
-                    # ✅ STEP DOSYASI İÇİN STL OLUŞTUR
-                    if analysis['file_type'] in ['step', 'stp']:
-                        stl_result = create_stl_for_step_analysis(analysis['file_path'], analysis_id)
-                        if stl_result['success']:
-                            result['stl_generated'] = True
-                            result['stl_path'] = stl_result['stl_path']
-                            result['stl_url'] = stl_result['stl_url']
-                            print(f"[ANALYSIS] ✅ STEP için STL oluşturuldu: {stl_result['stl_path']}")
-                    
-                    # PDF'den çıkarılan STEP için STL
-                    elif analysis['file_type'] == 'pdf' and result.get('step_file_hash'):
-                        # PDF'den çıkarılan kalıcı STEP dosyasını kullan
-                        if result.get('extracted_step_path') and os.path.exists(result['extracted_step_path']):
-                            stl_result = create_stl_for_step_analysis(result['extracted_step_path'], analysis_id)
-                            if stl_result['success']:
-                                result['stl_generated'] = True
-                                result['stl_path'] = stl_result['stl_path']
-                                result['stl_url'] = stl_result['stl_url']
-                                print(f"[ANALYSIS] ✅ PDF-STEP için STL oluşturuldu: {stl_result['stl_path']}")
-                        else:
-                            print(f"[ANALYSIS] ⚠️ PDF-STEP dosyası bulunamadı: {result.get('extracted_step_path')}")
-                    
-                    # Sonuçları kaydet
-                    update_data = {
-                        "analysis_status": "completed",
-                        "processing_time": processing_time,
-                        "material_matches": result.get('material_matches', []),
-                        "best_material_block": result.get('best_block', ''),
-                        "rotation_count": result.get('rotation_count', 0),
-                        "step_analysis": result.get('step_analysis', {}),
-                        "cost_estimation": result.get('cost_estimation', {}),
-                        "ai_price_prediction": result.get('ai_price_prediction', {}),
-                        "processing_log": result.get('processing_log', []),
-                        "all_material_calculations": result.get('all_material_calculations', []),
-                        "material_options": result.get('material_options', []),
-                        "isometric_view": result.get('isometric_view'),
-                        "isometric_view_clean": result.get('isometric_view_clean'),
-                        "enhanced_renders": result.get('enhanced_renders', {}),
-                        "step_file_hash": result.get('step_file_hash'),
-                        "render_quality": "high" if result.get('enhanced_renders') else "none",
-                        "stl_path": result.get('stl_path'),
-                        "stl_generated": result.get('stl_generated', False)
-                    }
-                    
-                    # PDF özel alanlar
-                    if analysis['file_type'] == 'pdf':
-                        update_data["pdf_step_extracted"] = bool(result.get('step_file_hash'))
-                        update_data["pdf_rotation_count"] = result.get('rotation_count', 0)
-                        update_data["extracted_step_path"] = result.get('extracted_step_path')
-                        update_data["pdf_analysis_id"] = result.get('pdf_analysis_id')
-                    
-                    FileAnalysis.update_analysis(analysis_id, update_data)
-                    
-                    # Güncellenmiş analizi döndür
-                    updated_analysis = FileAnalysis.find_by_id(analysis_id)
-                    
-                    # ✅ STEP viewer bilgilerini ekle
-                    step_viewer_info = {}
-                    if result.get('stl_generated'):
-                        step_viewer_info = {
-                            "viewer_url": f"/step-viewer/{analysis_id}",
-                            "stl_ready": True,
-                            "stl_path": result.get('stl_path'),
-                            "stl_url": result.get('stl_url')
-                        }
-                    elif analysis['file_type'] == 'step' or (analysis['file_type'] == 'pdf' and result.get('step_file_hash')):
-                        step_viewer_info = {
-                            "viewer_url": f"/step-viewer/{analysis_id}",
-                            "stl_ready": False,
-                            "note": "STL henüz oluşturulmamış, otomatik oluşturulacak"
-                        }
-                    
-                    response_data = {
-                        "success": True,
-                        "message": "Analiz başarıyla tamamlandı",
-                        "analysis": updated_analysis,
-                        "processing_time": processing_time,
-                        "analysis_details": {
-                            "material_matches_count": len(result.get('material_matches', [])),
-                            "step_analysis_available": bool(result.get('step_analysis')),
-                            "cost_estimation_available": bool(result.get('cost_estimation')),
-                            "processing_steps": len(result.get('processing_log', [])),
-                            "all_material_calculations_count": len(result.get('all_material_calculations', [])),
-                            "material_options_count": len(result.get('material_options', [])),
-                            "3d_render_available": bool(result.get('isometric_view')),
-                            "excel_friendly_render": bool(result.get('isometric_view_clean')),
-                            "pdf_step_extracted": analysis['file_type'] == 'pdf' and bool(result.get('step_file_hash')),
-                            "step_file_hash": result.get('step_file_hash'),
-                            "pdf_rotation_attempts": result.get('rotation_count', 0),
-                            "stl_generated": result.get('stl_generated', False)
-                        }
-                    }
-                    
-                    # ✅ STEP viewer bilgilerini response'a ekle
-                    if step_viewer_info:
-                        response_data["step_viewer"] = step_viewer_info
-                    
-                    return jsonify(response_data), 200
-                    
-                else:
-                    # Analiz hatası
-                    error_msg = result.get('error', 'Bilinmeyen analiz hatası')
-                    
-                    FileAnalysis.update_analysis(analysis_id, {
-                        "analysis_status": "failed",
-                        "error_message": error_msg,
-                        "processing_time": time.time() - start_time
-                    })
-                    
-                    return jsonify({
-                        "success": False,
-                        "message": f"Analiz hatası: {error_msg}",
-                        "error_details": result.get('processing_log', [])
-                    }), 500
-            else:
-                # Desteklenmeyen dosya türü
-                FileAnalysis.update_analysis(analysis_id, {
-                    "analysis_status": "failed",
-                    "error_message": "Desteklenmeyen dosya türü"
-                })
-                
-                return jsonify({
-                    "success": False,
-                    "message": "Desteklenmeyen dosya türü"
-                }), 400
-                
-        except Exception as analysis_error:
-            # Material Analysis hatası
-            error_message = f"Material Analysis hatası: {str(analysis_error)}"
-            
-            FileAnalysis.update_analysis(analysis_id, {
-                "analysis_status": "failed",
-                "error_message": error_message,
-                "processing_time": time.time() - start_time
-            })
-            
-            print(f"[ANALYSIS] ❌ Analiz hatası: {error_message}")
-            import traceback
-            print(f"[ANALYSIS] 📋 Traceback: {traceback.format_exc()}")
-            
-            return jsonify({
-                "success": False,
-                "message": error_message,
-                "traceback": traceback.format_exc()
-            }), 500
+        return jsonify({
+            "success": True,
+            "message": "Analiz kuyruğa alındı",
+            "job_id": job['job_id'],
+            "analysis_id": analysis_id,
+            "status": job['status'],
+            "status_url": f"/api/upload/status/{analysis_id}"
+        }), 202
         
     except Exception as e:
         # Genel hata durumunda analiz durumunu güncelle
@@ -520,31 +380,44 @@ def generate_step_render(analysis_id):
         
         print(f"[STEP-RENDER] 🎨 Render isteği: {analysis_id}")
         
-        # Step Renderer'ı kullan
-        step_renderer = StepRendererEnhanced()
-        
-        render_result = step_renderer.generate_comprehensive_views(
-            analysis['file_path'],
-            analysis_id=analysis_id,
-            include_dimensions=include_dimensions,
-            include_materials=include_materials,
-            high_quality=high_quality
-        )
+        # Aynı geometri + parametrelerle üretilmiş render'lar paylaşılan dizinden alınır
+        previous_session = analysis.get('render_session_id')
+        session_id = RenderStore.session_id(
+            analysis.get('step_file_hash'), include_dimensions, include_materials, high_quality
+        ) or analysis_id
+        
+        # Step Renderer'ı geometri worker havuzunda çalıştır - iş ve kayıt güncellemesi
+        # boyunca dizin, başka bir analizin silinmesiyle kaldırılmaz
+        with RenderStore.claim(session_id):
+            render_result = run_geometry_job(
+                render_step_job,
+                analysis['file_path'],
+                session_id,
+                include_dimensions=include_dimensions,
+                include_materials=include_materials,
+                high_quality=high_quality
+            )
         
-        if render_result['success']:
-            # Analiz kaydını güncelle
-            update_data = {
-                "enhanced_renders": render_result['renders'],
-                "render_quality": "high" if high_quality else "standard"
-            }
+            if render_result['success']:
+                # Analiz kaydını güncelle
+                update_data = {
+                    "enhanced_renders": render_result['renders'],
+                    "render_session_id": session_id,
+                    "render_quality": "high" if high_quality else "standard"
+                }
             
-            # Ana isometric view'ı ekle
-            if 'isometric' in render_result['renders']:
-                update_data["isometric_view"] = render_result['renders']['isometric']['file_path']
-                if 'excel_path' in render_result['renders']['isometric']:
-                    update_data["isometric_view_clean"] = render_result['renders']['isometric']['excel_path']
+                # Ana isometric view'ı ekle
+                if 'isometric' in render_result['renders']:
+                    update_data["isometric_view"] = render_result['renders']['isometric']['file_path']
+                    if 'excel_path' in render_result['renders']['isometric']:
+                        update_data["isometric_view_clean"] = render_result['renders']['isometric']['excel_path']
             
-            FileAnalysis.update_analysis(analysis_id, update_data)
+                FileAnalysis.update_analysis(analysis_id, update_data)
+        
+        if render_result['success']:
+            # Analiz dizini (STL, mesh.json) kendi kaydıyla birlikte silinir
+            if previous_session not in (session_id, analysis_id):
+                RenderStore.release_session(previous_session)
             
             return jsonify({
                 "success": True,
@@ -588,20 +461,20 @@ def get_wireframe_view(analysis_id):
                 "message": "Bu dosyaya erişim yetkiniz yok"
             }), 403
         
-        # Enhanced renders kontrolü
-        enhanced_renders = analysis.get('enhanced_renders', {})
-        if 'wireframe' in enhanced_renders and enhanced_renders['wireframe'].get('success'):
-            wireframe_data = enhanced_renders['wireframe']
+        # Kayıtta yoksa ilk istekte render et (lazy render)
+        view_result = OnDemandRenderService.get_view(analysis_id, analysis, 'wireframe')
+        if view_result['success']:
             return jsonify({
                 "success": True,
-                "wireframe": wireframe_data,
-                "analysis_id": analysis_id
+                "wireframe": view_result['view'],
+                "analysis_id": analysis_id,
+                "rendered_on_demand": view_result['rendered']
             }), 200
         else:
             return jsonify({
                 "success": False,
-                "message": "Wireframe görünümü mevcut değil. Önce render oluşturun."
-            }), 404
+                "message": view_result['message']
+            }), view_result['status']
             
     except Exception as e:
         return jsonify({
@@ -700,11 +573,12 @@ def get_analysis_status(analysis_id):
                 "message": "Bu dosyaya erişim yetkiniz yok"
             }), 403
         
-        return jsonify({
+        status_data = {
             "success": True,
             "analysis": {
                 "id": analysis['id'],
                 "status": analysis.get('analysis_status', 'unknown'),
+                "job_id": analysis.get('job_id'),
                 "filename": analysis.get('original_filename'),
                 "file_type": analysis.get('file_type'),
                 "processing_time": analysis.get('processing_time'),
@@ -716,7 +590,29 @@ def get_analysis_status(analysis_id):
                 "material_matches_count": len(analysis.get('material_matches', [])),
                 "render_count": len(analysis.get('enhanced_renders', {}))
             }
-        }), 200
+        }
+        
+        # Bu süreçteki kuyruk bilgisi (queued / analyzing / completed)
+        job_manager = get_job_manager()
+        job = job_manager.get_job_for_analysis(analysis_id)
+        if job:
+            status_data["job"] = job_manager.public_job(job)
+            status_data["queue"] = job_manager.stats()
+        
+        # ?include_result=true - tamamlanan analizin /analyze ile aynı formattaki sonucu
+        if request.args.get('include_result', 'false').lower() == 'true' and \
+                analysis.get('analysis_status') == 'completed':
+            if job and job.get('result') and job['status'] == 'completed':
+                status_data["result"] = job['result']
+            else:
+                status_data["result"] = {
+                    "success": True,
+                    "message": "Analiz başarıyla tamamlandı",
+                    "analysis": analysis,
+                    "processing_time": analysis.get('processing_time')
+                }
+        
+        return jsonify(status_data), 200
         
     except Exception as e:
         return jsonify({
@@ -724,6 +620,69 @@ def get_analysis_status(analysis_id):
             "message": f"Durum sorgulama hatası: {str(e)}"
         }), 500
 
+@upload_bp.route('/events/<analysis_id>', methods=['GET'])
+@jwt_required()
+def stream_analysis_events(analysis_id):
+    """
+    ✅ SSE - Analiz aşamalarını tamamlandıkça akıt
+
+    Her olay: stage, status, duration, payload (kısmi sonuçlar). Geç bağlanan istemci
+    geçmişi baştan alır; Last-Event-ID ile kaldığı yerden devam eder. Akış
+    "analysis" aşamasının completed/failed olayıyla kapanır.
+    """
+    try:
+        current_user = get_current_user()
+        
+        analysis = FileAnalysis.find_by_id(analysis_id)
+        if not analysis:
+            return jsonify({
+                "success": False,
+                "message": "Analiz kaydı bulunamadı"
+            }), 404
+        
+        if analysis['user_id'] != current_user['id']:
+            return jsonify({
+                "success": False,
+                "message": "Bu dosyaya erişim yetkiniz yok"
+            }), 403
+        
+        bus = get_event_bus()
+        last_seq = request.headers.get('Last-Event-ID', request.args.get('last_event_id', -1))
+        try:
+            last_seq = int(last_seq)
+        except (TypeError, ValueError):
+            last_seq = -1
+        
+        def generate():
+            if not bus.has_stream(analysis_id):
+                # Bu süreçte akış yok - kayıttaki son durumu tek olay olarak gönder
+                yield bus.format_sse({
+                    "seq": 0,
+                    "stage": "analysis",
+                    "status": analysis.get('analysis_status', 'unknown'),
+                    "timestamp": time.time(),
+                    "duration": analysis.get('processing_time'),
+                    "payload": {"error": analysis.get('error_message')}
+                })
+                return
+            for event in bus.subscribe(analysis_id, last_seq=last_seq):
+                yield bus.format_sse(event)
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Olay akışı hatası: {str(e)}"
+        }), 500
+
 @upload_bp.route('/my-uploads', methods=['GET'])
 @jwt_required()
 def get_my_uploads():
@@ -801,18 +760,10 @@ def delete_analysis(analysis_id):
                 "message": "Bu dosyayı silme yetkiniz yok"
             }), 403
         
-        # Dosyaları sil
+        # Yüklenen dosyayı sil
         try:
             if analysis.get('file_path') and os.path.exists(analysis['file_path']):
                 os.remove(analysis['file_path'])
-            
-            # Render dosyalarını sil
-            enhanced_renders = analysis.get('enhanced_renders', {})
-            for view_name, view_data in enhanced_renders.items():
-                if view_data.get('file_path'):
-                    file_path = os.path.join(os.getcwd(), view_data['file_path'])
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
         except Exception as file_error:
             print(f"[WARN] Dosya silme hatası: {file_error}")
         
@@ -820,6 +771,12 @@ def delete_analysis(analysis_id):
         success = FileAnalysis.delete_analysis(analysis_id)
         
         if success:
+            # Render'lar geometri hash'ine göre paylaşılır - başka analiz referans vermiyorsa kaldır
+            try:
+                RenderStore.release(analysis)
+            except Exception as file_error:
+                print(f"[WARN] Render dizini temizleme hatası: {file_error}")
+            
             return jsonify({
                 "success": True,
                 "message": "Analiz başarıyla silindi"
@@ -888,21 +845,15 @@ def download_render(analysis_id, view_type):
                 "message": "Bu dosyaya erişim yetkiniz yok"
             }), 403
         
-        # Render dosyasını bul
-        enhanced_renders = analysis.get('enhanced_renders', {})
-        if view_type not in enhanced_renders:
+        # Render dosyasını bul - kayıtta yoksa ilk istekte render et (lazy render)
+        view_result = OnDemandRenderService.get_view(analysis_id, analysis, view_type)
+        if not view_result['success']:
             return jsonify({
                 "success": False,
-                "message": f"'{view_type}' görünümü bulunamadı"
-            }), 404
-        
-        render_data = enhanced_renders[view_type]
-        if not render_data.get('success') or not render_data.get('file_path'):
-            return jsonify({
-                "success": False,
-                "message": f"'{view_type}' dosyası mevcut değil"
-            }), 404
+                "message": view_result['message']
+            }), view_result['status']
         
+        render_data = view_result['view']
         file_path = os.path.join(os.getcwd(), render_data['file_path'])
         if not os.path.exists(file_path):
             return jsonify({
@@ -927,6 +878,7 @@ def download_render(analysis_id, view_type):
 
 @upload_bp.route('/export-excel/<analysis_id>', methods=['GET'])
 @jwt_required()
+@timed("excel_export")
 def export_analysis_excel(analysis_id):
     """✅ ENHANCED - Analiz sonuçlarını Excel'e aktar (resimlerle birlikte)"""
     try:
@@ -1190,7 +1142,16 @@ def search_analyses():
 @upload_bp.route('/batch-analyze', methods=['POST'])
 @jwt_required()
 def batch_analyze():
-    """Toplu dosya analizi"""
+    """
+    ✅ Toplu dosya analizi - analizler paralel worker'larda çalışır
+
+    Body:
+        analysis_ids: Analiz ID listesi (en fazla BATCH_ANALYZE_MAX_FILES)
+        stock_method: opsiyonel stok yöntemi
+        force: true ise tamamlanmış analizler de yeniden çalıştırılır
+
+    Küçük dosyalar önce çalışır; ilerleme /batch-status/<batch_id> ile izlenir.
+    """
     try:
         current_user = get_current_user()
         
@@ -1208,38 +1169,46 @@ def batch_analyze():
                 "message": "Geçerli analiz ID listesi gerekli"
             }), 400
         
-        if len(analysis_ids) > 10:
+        if len(analysis_ids) > Config.BATCH_ANALYZE_MAX_FILES:
             return jsonify({
                 "success": False,
-                "message": "Maksimum 10 dosya aynı anda analiz edilebilir"
+                "message": f"Maksimum {Config.BATCH_ANALYZE_MAX_FILES} dosya aynı anda analiz edilebilir"
             }), 400
         
+        job_manager = get_job_manager()
+        force = bool(data.get('force'))
+        
         results = []
-        for analysis_id in analysis_ids:
+        to_queue = []
+        for analysis_id in dict.fromkeys(analysis_ids):
             try:
-                # Her analiz için analyze endpoint'ini çağır
                 analysis = FileAnalysis.find_by_id(analysis_id)
-                if analysis and analysis['user_id'] == current_user['id']:
-                    # Analiz durumunu kontrol et
-                    if analysis['analysis_status'] in ['uploaded', 'failed']:
-                        # Analizi başlat (async olarak implement edilebilir)
-                        results.append({
-                            "analysis_id": analysis_id,
-                            "status": "queued",
-                            "filename": analysis.get('original_filename')
-                        })
-                    else:
-                        results.append({
-                            "analysis_id": analysis_id,
-                            "status": "already_processed",
-                            "filename": analysis.get('original_filename')
-                        })
-                else:
+                if not analysis or analysis['user_id'] != current_user['id']:
                     results.append({
                         "analysis_id": analysis_id,
                         "status": "not_found_or_unauthorized",
                         "filename": None
                     })
+                elif not os.path.exists(analysis['file_path']):
+                    results.append({
+                        "analysis_id": analysis_id,
+                        "status": "file_missing",
+                        "filename": analysis.get('original_filename')
+                    })
+                elif job_manager.is_active(analysis):
+                    results.append({
+                        "analysis_id": analysis_id,
+                        "status": "already_running",
+                        "filename": analysis.get('original_filename')
+                    })
+                elif analysis['analysis_status'] == 'completed' and not force:
+                    results.append({
+                        "analysis_id": analysis_id,
+                        "status": "already_processed",
+                        "filename": analysis.get('original_filename')
+                    })
+                else:
+                    to_queue.append(analysis)
             except Exception as e:
                 results.append({
                     "analysis_id": analysis_id,
@@ -1248,12 +1217,29 @@ def batch_analyze():
                     "filename": None
                 })
         
+        batch = None
+        if to_queue:
+            batch = job_manager.submit_batch(to_queue, current_user['id'], stock_method=data.get('stock_method'))
+            results = [
+                {
+                    "analysis_id": item['analysis_id'],
+                    "job_id": item['job_id'],
+                    "status": "queued",
+                    "filename": item.get('filename'),
+                    "file_size": item.get('file_size')
+                }
+                for item in batch['items']
+            ] + results
+        
         return jsonify({
             "success": True,
-            "message": f"{len(analysis_ids)} dosya için toplu analiz başlatıldı",
+            "message": f"{len(to_queue)} dosya için toplu analiz başlatıldı",
+            "batch_id": batch['batch_id'] if batch else None,
+            "status_url": f"/api/upload/batch-status/{batch['batch_id']}" if batch else None,
+            "workers": job_manager.max_workers,
             "results": results,
-            "queued_count": len([r for r in results if r['status'] == 'queued'])
-        }), 200
+            "queued_count": len(to_queue)
+        }), 202 if batch else 200
         
     except Exception as e:
         return jsonify({
@@ -1261,6 +1247,39 @@ def batch_analyze():
             "message": f"Toplu analiz hatası: {str(e)}"
         }), 500
 
+@upload_bp.route('/batch-status/<batch_id>', methods=['GET'])
+@jwt_required()
+def get_batch_status(batch_id):
+    """Toplu analizin toplam ilerlemesi"""
+    try:
+        current_user = get_current_user()
+        job_manager = get_job_manager()
+        
+        batch = job_manager.get_batch(batch_id)
+        if not batch:
+            return jsonify({
+                "success": False,
+                "message": "Toplu analiz bulunamadı"
+            }), 404
+        
+        if batch['user_id'] != current_user['id']:
+            return jsonify({
+                "success": False,
+                "message": "Bu toplu analize erişim yetkiniz yok"
+            }), 403
+        
+        return jsonify({
+            "success": True,
+            "batch": job_manager.batch_progress(batch_id),
+            "queue": job_manager.stats()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Toplu analiz durum hatası: {str(e)}"
+        }), 500
+
 @upload_bp.route('/statistics', methods=['GET'])
 @jwt_required()
 def get_user_statistics():
@@ -1388,32 +1407,16 @@ def generate_stl_for_analysis(analysis_id):
         
         print(f"[STL-GEN] 🔧 STL oluşturuluyor: {analysis_id}")
         
-        # StepRendererEnhanced kullan
-        step_renderer = StepRendererEnhanced()
-        
-        # Session output directory
-        session_output_dir = os.path.join("static", "stepviews", analysis_id)
-        os.makedirs(session_output_dir, exist_ok=True)
-        
-        # STL dosya yolu
+        # STL dosya adı
         stl_filename = f"model_{analysis_id}.stl"
-        stl_path_full = os.path.join(session_output_dir, stl_filename)
         
         try:
-            # CadQuery ile STEP'i import et ve STL olarak export et
-            import cadquery as cq
-            from cadquery import exporters
-            
-            # STEP dosyasını yükle
-            assembly = cq.importers.importStep(step_path)
-            shape = assembly.val()
-            
-            # STL olarak export et
-            exporters.export(shape, stl_path_full)
+            # STEP'i geometri worker'ında import et ve STL olarak export et
+            stl_result = run_geometry_job(export_stl_job, step_path, analysis_id)
             
             # Dosya boyutunu kontrol et
-            if os.path.exists(stl_path_full):
-                file_size = os.path.getsize(stl_path_full)
+            if stl_result['success']:
+                file_size = stl_result['file_size']
                 print(f"[STL-GEN] ✅ STL oluşturuldu: {stl_filename} ({file_size} bytes)")
                 
                 # Analiz kaydını güncelle
@@ -1451,7 +1454,7 @@ def generate_stl_for_analysis(analysis_id):
                     "viewer_url": f"/step-viewer/{analysis_id}"
                 }), 200
             else:
-                raise Exception("STL dosyası oluşturulamadı")
+                raise Exception(stl_result.get('error') or "STL dosyası oluşturulamadı")
                 
         except Exception as stl_error:
             print(f"[STL-GEN] ❌ STL oluşturma hatası: {stl_error}")
@@ -1558,56 +1561,65 @@ def get_3d_model_info(analysis_id):
             "success": False,
             "message": f"Model bilgisi hatası: {str(e)}"
         }), 500
-    
-def create_stl_for_step_analysis(step_path, analysis_id):
-    """STEP dosyasından STL oluştur"""
+
+@upload_bp.route('/mesh/<analysis_id>', methods=['GET'])
+@jwt_required()
+def get_compact_mesh(analysis_id):
+    """Viewer için progressive mesh manifest'i (quantize + gzip LOD dosyaları)"""
     try:
-        import cadquery as cq
-        from cadquery import exporters
+        from services.compact_mesh import CompactMeshService
+        from services.analysis_cache import AnalysisCacheService
+
+        current_user = get_current_user()
         
-        # Session output directory
-        session_output_dir = os.path.join("static", "stepviews", analysis_id)
-        os.makedirs(session_output_dir, exist_ok=True)
+        analysis = FileAnalysis.find_by_id(analysis_id)
+        if not analysis:
+            return jsonify({
+                "success": False,
+                "message": "Analiz kaydı bulunamadı"
+            }), 404
         
-        # STL dosya yolu
-        stl_filename = f"model_{analysis_id}.stl"
-        stl_path_full = os.path.join(session_output_dir, stl_filename)
+        if analysis['user_id'] != current_user['id']:
+            return jsonify({
+                "success": False,
+                "message": "Bu dosyaya erişim yetkiniz yok"
+            }), 403
         
-        # STEP dosyasını yükle
-        assembly = cq.importers.importStep(step_path)
-        shape = assembly.val()
+        if analysis['file_type'] in ['step', 'stp']:
+            step_path = analysis['file_path']
+        else:
+            step_path = analysis.get('extracted_step_path')
         
-        # STL olarak export et
-        exporters.export(shape, stl_path_full)
+        if not step_path or not os.path.exists(step_path):
+            return jsonify({
+                "success": False,
+                "message": "STEP dosyası bulunamadı"
+            }), 404
         
-        # Dosya boyutunu kontrol et
-        if os.path.exists(stl_path_full):
-            file_size = os.path.getsize(stl_path_full)
-            stl_relative = f"/static/stepviews/{analysis_id}/{stl_filename}"
-            
-            print(f"[STL-CREATE] ✅ STL oluşturuldu: {stl_filename} ({file_size} bytes)")
-            
-            return {
-                "success": True,
-                "stl_path": stl_relative,
-                "stl_url": stl_relative,
-                "file_size": file_size
-            }
+        # Mesh STEP içerik hash'ine göre saklanır - aynı geometri için tekrar üretilmez
+        step_hash = analysis.get('step_file_hash') or AnalysisCacheService.compute_file_hash(step_path)
+        manifest = CompactMeshService.load_manifest(step_hash)
+        if manifest:
+            CompactMeshService.link(manifest, analysis_id)
         else:
-            return {
-                "success": False,
-                "error": "STL dosyası oluşturulamadı"
-            }
-            
+            print(f"[COMPACT-MESH] 🔧 Mesh oluşturuluyor: {analysis_id}")
+            manifest = run_geometry_job(compact_mesh_job, step_path, analysis_id)
+        
+        return jsonify({
+            "success": True,
+            "manifest": manifest
+        }), 200
+        
     except Exception as e:
-        print(f"[STL-CREATE] ❌ STL oluşturma hatası: {str(e)}")
-        return {
+        print(f"[COMPACT-MESH] ❌ Mesh hatası: {str(e)}")
+        return jsonify({
             "success": False,
-            "error": str(e)
-        }
-
+            "message": f"Mesh hatası: {str(e)}"
+        }), 500
+    
 @upload_bp.route('/merge-with-excel', methods=['POST'])
 @jwt_required()
+@timed("excel_merge")
 def merge_with_excel():
     """✅ FIXED - Excel dosyasını analiz sonuçlarıyla birleştir - KÜTLE VE FİYAT HESAPLAMALARİ İLE"""
     try:
@@ -2123,6 +2135,7 @@ def merge_with_excel():
 
 @upload_bp.route('/export-excel-multiple', methods=['POST'])
 @jwt_required()
+@timed("excel_export_multiple")
 def export_multiple_analyses_excel():
     """✅ FIXED - Birden fazla analizi Excel'e aktar - KÜTLE VE MALİYET HESAPLAMALARİ İLE"""
     try:
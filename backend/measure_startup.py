@@ -0,0 +1,88 @@
+# measure_startup.py - API açılış süresi ve ağır modül kontrolü
+#
+# Kullanım:
+#   python measure_startup.py            # blueprint import süresi (MongoDB gerekmez)
+#   python measure_startup.py --full     # app.py import + create_app (MongoDB gerekir)
+#   python measure_startup.py --runs 5 --budget 1.0
+#
+# Her ölçüm temiz bir Python sürecinde yapılır. Süre bütçeyi aşarsa veya ağır bilimsel
+# kütüphanelerden biri API sürecinde yüklenmişse çıkış kodu 1 olur.
+import os
+import sys
+import json
+import argparse
+import subprocess
+from config import Config
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# API sürecinde açılışta yüklenmemesi gereken modüller (worker'larda veya ilk kullanımda yüklenir)
+HEAVY_MODULES = [
+    "cadquery", "OCP", "matplotlib", "mpl_toolkits", "trimesh", "cairosvg",
+    "scipy", "cv2", "pytesseract", "pdf2image", "pikepdf", "docx", "pandas", "openpyxl"
+]
+
+BLUEPRINT_MODULES = [
+    "controllers.auth_controller",
+    "controllers.user_controller",
+    "controllers.geometric_measurement_controller",
+    "controllers.cost_calculation_controller",
+    "controllers.material_controller",
+    "controllers.file_upload_controller",
+    "controllers.material_price_controller"
+]
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print("__STARTUP__" + json.dumps({{"seconds": elapsed, "heavy_modules": heavy, "module_count": len(sys.modules)}}))
+"""
+
+
+def measure_once(full):
+    modules = ["app"] if full else ["flask", "flask_jwt_extended", "flask_cors"] + BLUEPRINT_MODULES
+    code = PROBE.format(modules=modules, heavy=HEAVY_MODULES)
+    env = dict(os.environ, GEOMETRY_WORKERS_PREWARM="0")
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith("__STARTUP__"):
+            return json.loads(line[len("__STARTUP__"):])
+    raise RuntimeError(f"Ölçüm başarısız (exit {completed.returncode}):\n{completed.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EngTeklif API açılış süresi ölçümü")
+    parser.add_argument("--full", action="store_true", help="app.py'yi import et (create_app + MongoDB)")
+    parser.add_argument("--runs", type=int, default=3, help="Ölçüm tekrar sayısı")
+    parser.add_argument("--budget", type=float, default=Config.STARTUP_BUDGET_SECONDS, help="İzin verilen süre (s)")
+    options = parser.parse_args()
+
+    results = [measure_once(options.full) for _ in range(options.runs)]
+    seconds = sorted(result["seconds"] for result in results)
+    median = seconds[len(seconds) // 2]
+    heavy = sorted({module for result in results for module in result["heavy_modules"]})
+
+    print(f"⏱️  Açılış süresi ({'app + create_app' if options.full else 'blueprint import'}): "
+          f"medyan {median:.3f}s, min {seconds[0]:.3f}s, max {seconds[-1]:.3f}s ({options.runs} ölçüm)")
+    print(f"📦 Yüklenen modül sayısı: {results[-1]['module_count']}")
+
+    failed = False
+    if heavy:
+        print(f"❌ API sürecinde ağır modüller yüklendi: {', '.join(heavy)}")
+        failed = True
+    if median > options.budget:
+        print(f"❌ Açılış süresi bütçeyi aştı: {median:.3f}s > {options.budget:.3f}s")
+        failed = True
+    if not failed:
+        print(f"✅ Bütçe içinde ({options.budget:.3f}s), ağır modül yüklenmedi")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# models/analysis_job.py - Persistent analysis job and batch state
+#
+# AnalysisJobManager iş ve toplu analiz durumunu bellekte tutar; aynı durum burada
+# MongoDB'ye yazılır. Birden fazla gunicorn worker'ı veya yeniden başlatma sonrası
+# /status ve /batch-status başka süreçte oluşturulan işleri buradan okur.
+# İş sonucu (response_data) büyük olduğundan saklanmaz - kalıcı sonuç FileAnalysis kaydıdır.
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+from utils.database import db
+
+
+class AnalysisJob:
+    jobs_collection = None
+    batches_collection = None
+
+    @classmethod
+    def get_jobs_collection(cls):
+        if cls.jobs_collection is None:
+            cls.jobs_collection = db.get_db().analysis_jobs
+            cls.jobs_collection.create_index([("analysis_id", 1), ("created_at", -1)])
+            cls.jobs_collection.create_index("batch_id")
+        return cls.jobs_collection
+
+    @classmethod
+    def get_batches_collection(cls):
+        if cls.batches_collection is None:
+            cls.batches_collection = db.get_db().analysis_batches
+            cls.batches_collection.create_index("created_at")
+        return cls.batches_collection
+
+    # ===== İŞLER =====
+
+    @classmethod
+    def save_job(cls, job: Dict[str, Any]):
+        """İşi kaydet (result hariç) - aynı job_id varsa üzerine yazılır"""
+        document = {key: value for key, value in job.items() if key != "result"}
+        document["updated_at"] = datetime.utcnow()
+        cls.get_jobs_collection().replace_one({"_id": job["job_id"]}, document, upsert=True)
+
+    @classmethod
+    def update_job(cls, job_id: str, update_data: Dict[str, Any]):
+        """İş alanlarını güncelle"""
+        update_data = {key: value for key, value in update_data.items() if key != "result"}
+        update_data["updated_at"] = datetime.utcnow()
+        cls.get_jobs_collection().update_one({"_id": job_id}, {"$set": update_data})
+
+    @classmethod
+    def find_job(cls, job_id: str) -> Optional[Dict[str, Any]]:
+        return cls._clean(cls.get_jobs_collection().find_one({"_id": job_id}))
+
+    @classmethod
+    def find_jobs(cls, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """job_id -> iş (bulunamayanlar yok)"""
+        jobs = cls.get_jobs_collection().find({"_id": {"$in": list(job_ids)}})
+        return {job["_id"]: cls._clean(job) for job in jobs}
+
+    @classmethod
+    def find_latest_for_analysis(cls, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """Analizin en son işi"""
+        job = cls.get_jobs_collection().find_one({"analysis_id": analysis_id}, sort=[("created_at", -1)])
+        return cls._clean(job)
+
+    # ===== TOPLU ANALİZLER =====
+
+    @classmethod
+    def save_batch(cls, batch: Dict[str, Any]):
+        document = dict(batch)
+        document["updated_at"] = datetime.utcnow()
+        cls.get_batches_collection().replace_one({"_id": batch["batch_id"]}, document, upsert=True)
+
+    @classmethod
+    def find_batch(cls, batch_id: str) -> Optional[Dict[str, Any]]:
+        return cls._clean(cls.get_batches_collection().find_one({"_id": batch_id}))
+
+    @staticmethod
+    def _clean(document):
+        if document:
+            document.pop("_id", None)
+            document.pop("updated_at", None)
+        return document
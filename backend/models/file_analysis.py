@@ -15,7 +15,9 @@ class FileAnalysisModel(BaseModel):
     file_path: Optional[str] = Field(None, description="Dosya yolu")
     
     # Analiz sonuçları
-    analysis_status: str = Field(default="pending", description="Analiz durumu")
+    analysis_status: str = Field(default="pending", description="Analiz durumu (pending, queued, analyzing, completed, failed)")
+    job_id: Optional[str] = Field(None, description="Asenkron analiz işinin ID'si")
+    stage_timings: Optional[Dict[str, Any]] = Field(default={}, description="Aşama bazında süre dökümü (count, total_seconds, max_seconds, errors)")
     material_matches: Optional[List[str]] = Field(default=[], description="Bulunan malzeme eşleşmeleri")
     best_material_block: Optional[str] = Field(None, description="En iyi malzeme bloğu")
     rotation_count: Optional[int] = Field(default=0, description="PDF döndürme sayısı")
@@ -32,9 +34,15 @@ class FileAnalysisModel(BaseModel):
     
     # ✅ PDF STEP EXTRACTION FIELDS
     pdf_step_extracted: Optional[bool] = Field(default=False, description="PDF'den STEP çıkarıldı mı")
-    step_file_hash: Optional[str] = Field(None, description="STEP dosya hash'i")
+    step_file_hash: Optional[str] = Field(None, description="STEP dosya hash'i (SHA-256)")
     pdf_rotation_count: Optional[int] = Field(default=0, description="PDF döndürme sayısı")
-    
+
+    # ✅ GEOMETRİ ÖNBELLEĞİ
+    render_session_id: Optional[str] = Field(None, description="Render dosyalarının bulunduğu oturum dizini")
+    geometry_cache_source: Optional[str] = Field(None, description="Geometri sonuçlarının kopyalandığı analiz ID'si")
+    geometry_schema_version: Optional[int] = Field(None, description="step_analysis şema sürümü (önbellek uyumluluğu)")
+    stock_method: Optional[str] = Field(None, description="Malzeme maliyetinde kullanılan stok yöntemi (aabb, obb, cylinder, min)")
+
     # ✅ ENHANCED MATERIAL CALCULATIONS
     all_material_calculations: Optional[List[Dict[str, Any]]] = Field(default=[], description="Bulunan malzemeler için hesaplamalar")
     material_options: Optional[List[Dict[str, Any]]] = Field(default=[], description="Tüm malzeme seçenekleri")
@@ -99,6 +107,12 @@ class FileAnalysisUpdate(BaseModel):
     pdf_step_extracted: Optional[bool] = None
     step_file_hash: Optional[str] = None
     pdf_rotation_count: Optional[int] = None
+    render_session_id: Optional[str] = None
+    geometry_cache_source: Optional[str] = None
+    geometry_schema_version: Optional[int] = None
+    stock_method: Optional[str] = None
+    job_id: Optional[str] = None
+    stage_timings: Optional[Dict[str, Any]] = None
     all_material_calculations: Optional[List[Dict[str, Any]]] = None
     material_options: Optional[List[Dict[str, Any]]] = None
     cost_estimation: Optional[Dict[str, Any]] = None
@@ -122,6 +136,7 @@ class FileAnalysis:
             # ✅ PDF STEP için yeni index'ler
             cls.collection.create_index("pdf_step_extracted")
             cls.collection.create_index("step_file_hash")
+            cls.collection.create_index("render_session_id")
             cls.collection.create_index([("file_type", 1), ("pdf_step_extracted", 1)])
         return cls.collection
     
@@ -301,6 +316,35 @@ class FileAnalysis:
             del analysis['_id']
         return analyses
     
+    @classmethod
+    def count_references(cls, field: str, value: str) -> int:
+        """Alanı verilen değere eşit analiz sayısı (paylaşılan render dizinleri için referans sayımı)"""
+        collection = cls.get_collection()
+        return collection.count_documents({field: value})
+
+    @classmethod
+    def claim_stale_analyses(cls, statuses: List[str], cutoff: datetime) -> List[Dict[str, Any]]:
+        """
+        cutoff'tan beri güncellenmemiş (yarım kalmış) analizleri sahiplen
+
+        Her kayıt koşullu update_one ile tek tek alınır; aynı anda açılan başka bir
+        süreç aynı kaydı alamaz (updated_at yenilenir).
+        """
+        collection = cls.get_collection()
+        query = {"analysis_status": {"$in": list(statuses)}, "updated_at": {"$lt": cutoff}}
+
+        claimed = []
+        for analysis in collection.find(query):
+            result = collection.update_one(
+                {"_id": analysis["_id"], "analysis_status": analysis["analysis_status"], "updated_at": analysis["updated_at"]},
+                {"$set": {"updated_at": datetime.utcnow()}}
+            )
+            if result.modified_count:
+                analysis['id'] = str(analysis['_id'])
+                del analysis['_id']
+                claimed.append(analysis)
+        return claimed
+
     @classmethod
     def find_by_step_hash(cls, step_hash: str) -> Optional[Dict[str, Any]]:
         """STEP hash'i ile analiz bul"""
@@ -310,7 +354,30 @@ class FileAnalysis:
             analysis['id'] = str(analysis['_id'])
             del analysis['_id']
         return analysis
-    
+
+    @classmethod
+    def find_completed_by_step_hash(cls, step_hash: str, exclude_id: Optional[str] = None,
+                                    schema_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """STEP hash'i ile tamamlanmış (önbelleğe uygun) en güncel analizi bul"""
+        collection = cls.get_collection()
+        query = {
+            "step_file_hash": step_hash,
+            "analysis_status": "completed",
+            "step_analysis.error": {"$exists": False},
+            "enhanced_renders": {"$ne": {}, "$exists": True}
+        }
+        if schema_version is not None:
+            # Eski şemayla kaydedilmiş step_analysis (ör. stock_fit alanları eksik) önbelleğe uygun değil
+            query["geometry_schema_version"] = schema_version
+        if exclude_id:
+            query["_id"] = {"$ne": ObjectId(exclude_id)}
+
+        analysis = collection.find_one(query, sort=[("updated_at", -1)])
+        if analysis:
+            analysis['id'] = str(analysis['_id'])
+            del analysis['_id']
+        return analysis
+
     @classmethod
     def get_user_statistics_enhanced(cls, user_id: str) -> Dict[str, Any]:
         """Kullanıcı için gelişmiş istatistikler"""
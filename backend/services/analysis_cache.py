@@ -0,0 +1,174 @@
+# services/analysis_cache.py - Content-addressed STEP analysis cache
+import os
+import shutil
+import hashlib
+from typing import Optional, Dict, Any
+from models.file_analysis import FileAnalysis
+
+
+class AnalysisCacheService:
+    """STEP geometri sonuçlarını (boyutlar, render'lar, STL) dosya hash'ine göre yeniden kullanır"""
+
+    HASH_CHUNK_SIZE = 1024 * 1024  # 1MB
+    # step_analysis alanları değiştiğinde artırılır - eski kayıtlar önbellekten kullanılmaz
+    # (2: stock_fit - Min. Prizma / Silindir hacimleri)
+    GEOMETRY_SCHEMA_VERSION = 2
+    STEPVIEWS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "static", "stepviews")
+
+    @classmethod
+    def compute_file_hash(cls, file_path: str) -> Optional[str]:
+        """Dosya içeriğinin SHA-256 hash'i (parça parça okunur)"""
+        try:
+            sha256 = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(cls.HASH_CHUNK_SIZE), b''):
+                    sha256.update(chunk)
+            return sha256.hexdigest()
+        except Exception as e:
+            print(f"[CACHE] ⚠️ Hash hesaplama hatası: {e}")
+            return None
+
+    @classmethod
+    def load_cached_geometry(cls, step_hash: Optional[str], session_id: str,
+                             analysis_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Aynı hash'e sahip tamamlanmış analiz varsa geometri sonuçlarını yeni kayda aktar
+
+        Args:
+            step_hash: STEP dosyasının SHA-256 hash'i
+            session_id: Yeni render oturum dizini (RenderStore anahtarı ise kaynakla paylaşılır)
+            analysis_id: Yeni analiz ID'si (STL dizini ve kendi kaydını hariç tutmak için)
+
+        Returns:
+            analyze_document_comprehensive sonucuna eklenecek alanlar veya None (cache miss)
+        """
+        if not step_hash:
+            return None
+
+        try:
+            source = FileAnalysis.find_completed_by_step_hash(
+                step_hash, exclude_id=analysis_id, schema_version=cls.GEOMETRY_SCHEMA_VERSION
+            )
+            if not source:
+                print(f"[CACHE] 🔍 Cache miss: {step_hash[:12]}")
+                return None
+
+            source_session = cls._get_render_session_id(source)
+            if not source_session or not os.path.isdir(os.path.join(cls.STEPVIEWS_DIR, source_session)):
+                print(f"[CACHE] ⚠️ Kaynak render dizini bulunamadı: {source_session}")
+                return None
+
+            # Render dizini geometri hash'ine göre paylaşılıyorsa yalnızca referans alınır;
+            # eski (analiz başına) oturumlar yeni dizine kopyalanır
+            if source_session != session_id:
+                cls._copy_session_dir(source_session, session_id)
+
+            cached = {
+                "step_analysis": dict(source.get('step_analysis', {})),
+                "enhanced_renders": cls._rewrite_paths(source.get('enhanced_renders', {}), source_session, session_id),
+                "isometric_view": cls._rewrite_paths(source.get('isometric_view'), source_session, session_id),
+                "isometric_view_clean": cls._rewrite_paths(source.get('isometric_view_clean'), source_session, session_id),
+                "step_file_hash": step_hash,
+                "render_session_id": session_id,
+                "geometry_cache_hit": True,
+                "geometry_cache_source": source['id']
+            }
+
+            # STL modelini kopyala
+            if analysis_id:
+                stl_result = cls._copy_stl(source, analysis_id)
+                if stl_result:
+                    cached.update(stl_result)
+
+                # Progressive mesh hash'e göre paylaşılır - yalnızca bağlantı yazılır
+                from services.compact_mesh import CompactMeshService
+                manifest = CompactMeshService.load_manifest(step_hash)
+                if manifest:
+                    CompactMeshService.link(manifest, analysis_id)
+
+            print(f"[CACHE] ♻️ Cache hit: {step_hash[:12]} -> kaynak analiz {source['id']}")
+            return cached
+
+        except Exception as e:
+            print(f"[CACHE] ⚠️ Önbellekten yükleme hatası: {e}")
+            return None
+
+    @classmethod
+    def _get_render_session_id(cls, analysis: Dict[str, Any]) -> Optional[str]:
+        """Render oturum dizinini kayıttan veya render yolundan çıkar"""
+        if analysis.get('render_session_id'):
+            return analysis['render_session_id']
+
+        render_path = analysis.get('isometric_view')
+        if not render_path:
+            for view_data in analysis.get('enhanced_renders', {}).values():
+                if isinstance(view_data, dict) and view_data.get('file_path'):
+                    render_path = view_data['file_path']
+                    break
+
+        if render_path:
+            return os.path.basename(os.path.dirname(render_path))
+        return None
+
+    @classmethod
+    def _copy_session_dir(cls, source_session: str, target_session: str):
+        """Oturum dizinini kopyala - dosya adlarındaki oturum ID'si de yenilenir"""
+        source_dir = os.path.join(cls.STEPVIEWS_DIR, source_session)
+        target_dir = os.path.join(cls.STEPVIEWS_DIR, target_session)
+        os.makedirs(target_dir, exist_ok=True)
+
+        for name in os.listdir(source_dir):
+            source_path = os.path.join(source_dir, name)
+            if not os.path.isfile(source_path):
+                continue
+
+            target_path = os.path.join(target_dir, name.replace(source_session, target_session))
+            if name.endswith('.html'):
+                with open(source_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                with open(target_path, 'w', encoding='utf-8') as f:
+                    f.write(content.replace(source_session, target_session))
+            else:
+                shutil.copy2(source_path, target_path)
+
+    @classmethod
+    def _copy_stl(cls, source: Dict[str, Any], analysis_id: str) -> Optional[Dict[str, Any]]:
+        """Kaynak analizin STL modelini yeni analiz dizinine bağla (hard link, olmazsa kopya)"""
+        stl_path = source.get('stl_path')
+        if not stl_path:
+            return None
+
+        source_stl = os.path.join(cls.STEPVIEWS_DIR, "..", "..", stl_path.lstrip("/\\"))
+        if not os.path.exists(source_stl):
+            return None
+
+        target_dir = os.path.join(cls.STEPVIEWS_DIR, analysis_id)
+        os.makedirs(target_dir, exist_ok=True)
+
+        stl_filename = f"model_{analysis_id}.stl"
+        target_stl = os.path.join(target_dir, stl_filename)
+        if os.path.exists(target_stl):
+            os.remove(target_stl)
+        try:
+            os.link(source_stl, target_stl)
+        except OSError:
+            shutil.copy2(source_stl, target_stl)
+
+        stl_relative = f"/static/stepviews/{analysis_id}/{stl_filename}"
+        return {
+            "stl_generated": True,
+            "stl_path": stl_relative,
+            "stl_url": stl_relative,
+            "stl_file_size": os.path.getsize(target_stl)
+        }
+
+    @classmethod
+    def _rewrite_paths(cls, value, source_session: str, target_session: str):
+        """Render sözlüğündeki tüm yolları yeni oturuma yönlendir"""
+        if isinstance(value, str):
+            return value.replace(source_session, target_session)
+        if isinstance(value, dict):
+            return {k: cls._rewrite_paths(v, source_session, target_session) for k, v in value.items()}
+        if isinstance(value, list):
+            return [cls._rewrite_paths(v, source_session, target_session) for v in value]
+        return value
@@ -0,0 +1,151 @@
+# services/analysis_events.py - Stage progress events for live analysis streaming (SSE)
+#
+# Pipeline kodu report_progress() ile aşama olaylarını bildirir. Olayın nereye
+# gideceğini çağıran thread belirler (progress_sink): ana süreçte analiz event
+# bus'ı, geometri worker'ında ise ana sürece giden pipe. Sink yoksa çağrı no-op'tur.
+import time
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+def current_progress_sink():
+    """Bu thread için tanımlı olay hedefi (yoksa None)"""
+    return getattr(_local, "sink", None)
+
+
+@contextmanager
+def progress_sink(sink):
+    """Blok süresince bu thread'deki report_progress çağrılarını sink'e yönlendir"""
+    previous = current_progress_sink()
+    _local.sink = sink
+    try:
+        yield
+    finally:
+        _local.sink = previous
+
+
+def report_progress(stage, status="completed", duration=None, **payload):
+    """
+    Aşama olayı bildir
+
+    Args:
+        stage: Aşama adı (step_import, orientation, dimensions, render_isometric, stl ...)
+        status: started / completed / failed / skipped
+        duration: Aşama süresi (saniye)
+        payload: JSON uyumlu kısmi sonuçlar
+    """
+    sink = current_progress_sink()
+    if sink is None:
+        return
+    event = {
+        "stage": stage,
+        "status": status,
+        "timestamp": time.time(),
+        "duration": round(duration, 4) if duration is not None else None,
+        "payload": payload
+    }
+    try:
+        sink(event)
+    except Exception as e:
+        print(f"[EVENTS] ⚠️ Olay iletilemedi ({stage}): {e}")
+
+
+class AnalysisEventBus:
+    """
+    Analiz başına olay geçmişi + bekleyen abonelere bildirim.
+
+    Geç bağlanan istemciler geçmişi baştan alır; analiz bitince akış kapanır.
+    """
+
+    MAX_ANALYSES = 500          # Bellekte tutulan analiz sayısı
+    TERMINAL_STAGES = ("completed", "failed")
+
+    def __init__(self):
+        self._streams = OrderedDict()
+        self._condition = threading.Condition()
+
+    def reset(self, analysis_id):
+        """Yeni analiz çalıştırması için geçmişi temizle"""
+        with self._condition:
+            self._streams[analysis_id] = {"events": [], "closed": False}
+            self._streams.move_to_end(analysis_id)
+            while len(self._streams) > self.MAX_ANALYSES:
+                self._streams.popitem(last=False)
+            self._condition.notify_all()
+
+    def open(self, analysis_id):
+        """Açık akış yoksa (hiç yok veya önceki çalıştırma bitmiş) yeni akış başlat"""
+        with self._condition:
+            stream = self._streams.get(analysis_id)
+            if stream is not None and not stream["closed"]:
+                return
+        self.reset(analysis_id)
+
+    def publish(self, analysis_id, event):
+        with self._condition:
+            stream = self._streams.get(analysis_id)
+            if stream is None:
+                stream = self._streams[analysis_id] = {"events": [], "closed": False}
+            event = dict(event, seq=len(stream["events"]))
+            stream["events"].append(event)
+            if event["stage"] == "analysis" and event["status"] in self.TERMINAL_STAGES:
+                stream["closed"] = True
+            self._condition.notify_all()
+
+    def sink_for(self, analysis_id):
+        """report_progress için bu analize yazan sink"""
+        return lambda event: self.publish(analysis_id, event)
+
+    def has_stream(self, analysis_id):
+        with self._condition:
+            return analysis_id in self._streams
+
+    def subscribe(self, analysis_id, last_seq=-1, heartbeat=15.0):
+        """
+        Olayları sırayla üret - analiz bitince durur
+
+        Yeni olay yokken heartbeat saniyede bir None üretilir (bağlantıyı canlı tutmak için).
+        """
+        next_seq = last_seq + 1
+        while True:
+            timed_out = False
+            with self._condition:
+                stream = self._streams.get(analysis_id)
+                if stream is None:
+                    return
+                if next_seq >= len(stream["events"]) and not stream["closed"]:
+                    timed_out = not self._condition.wait(heartbeat)
+                    stream = self._streams.get(analysis_id)
+                    if stream is None:
+                        return
+                pending = stream["events"][next_seq:]
+                closed = stream["closed"]
+
+            for event in pending:
+                next_seq = event["seq"] + 1
+                yield event
+            if not pending:
+                if closed:
+                    return
+                if timed_out:
+                    yield None
+
+    @staticmethod
+    def format_sse(event):
+        """Olayı SSE satırlarına çevir (None -> yorum satırı heartbeat)"""
+        if event is None:
+            return ": keep-alive\n\n"
+        data = json.dumps(event, ensure_ascii=False, default=str)
+        return f"id: {event['seq']}\nevent: {event['stage']}\ndata: {data}\n\n"
+
+
+_bus = AnalysisEventBus()
+
+
+def get_event_bus():
+    """Uygulama genelinde paylaşılan olay bus'ı"""
+    return _bus
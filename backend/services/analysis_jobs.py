@@ -0,0 +1,638 @@
+# services/analysis_jobs.py - Asynchronous analysis job queue
+import os
+import time
+import uuid
+import queue
+import itertools
+import threading
+import traceback
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from config import Config
+from models.file_analysis import FileAnalysis
+from models.analysis_job import AnalysisJob
+from services.analysis_cache import AnalysisCacheService
+from services.geometry_worker import run_geometry_job
+from services.geometry_jobs import export_stl_job
+from services.analysis_events import get_event_bus, progress_sink, report_progress
+from services.metrics import registry, collect_stages, summarize_stages
+
+# analysis_status yaşam döngüsü: pending -> queued -> analyzing -> completed / failed
+ACTIVE_STATUSES = ("queued", "analyzing")
+
+
+class AnalysisRunner:
+    """Tek bir analizi çalıştırır ve sonuçlarını kaydeder (senkron)"""
+
+    @classmethod
+    def run(cls, analysis_id, user_id, stock_method=None):
+        """
+        analyze_document_comprehensive çalıştır, sonuçları FileAnalysis kaydına yaz
+
+        Aşama olayları analiz event bus'ına yayınlanır (/events/<analysis_id> SSE akışı).
+
+        Returns:
+            (response_data, http_status) - eski senkron /analyze cevabıyla aynı yapı
+        """
+        bus = get_event_bus()
+        bus.open(analysis_id)
+        start_time = time.time()
+
+        with progress_sink(bus.sink_for(analysis_id)), collect_stages() as stages:
+            report_progress("analysis", status="started")
+            response_data, http_status = cls._run(analysis_id, user_id, stock_method)
+            cls._save_stage_timings(analysis_id, stages, response_data)
+
+            if http_status == 200:
+                report_progress(
+                    "analysis", status="completed", duration=time.time() - start_time,
+                    analysis_details=response_data.get("analysis_details"),
+                    step_viewer=response_data.get("step_viewer")
+                )
+            else:
+                report_progress(
+                    "analysis", status="failed", duration=time.time() - start_time,
+                    error=response_data.get("message")
+                )
+
+        duration = time.time() - start_time
+        outcome = "completed" if http_status == 200 else "failed"
+        registry.inc("engteklif_analyses_total", 1, "Biten analizler", status=outcome)
+        registry.observe("engteklif_analysis_duration_seconds", duration, "Analiz başına toplam süre", status=outcome)
+        return response_data, http_status
+
+    @staticmethod
+    def _save_stage_timings(analysis_id, stages, response_data):
+        """Aşama süre dökümünü analiz kaydına yaz (hangi aşama yavaş: OCR, OCCT, render?)"""
+        try:
+            stage_timings = summarize_stages(stages)
+            FileAnalysis.update_analysis(analysis_id, {"stage_timings": stage_timings})
+            if isinstance(response_data.get("analysis"), dict):
+                response_data["analysis"]["stage_timings"] = stage_timings
+        except Exception as e:
+            print(f"[ANALYSIS] ⚠️ Aşama süreleri kaydedilemedi: {e}")
+
+    @classmethod
+    def _run(cls, analysis_id, user_id, stock_method=None):
+        start_time = time.time()
+
+        try:
+            analysis = FileAnalysis.find_by_id(analysis_id)
+            if not analysis:
+                return {"success": False, "message": "Analiz kaydı bulunamadı"}, 404
+
+            # Analiz durumunu güncelle
+            FileAnalysis.update_analysis(analysis_id, {
+                "analysis_status": "analyzing",
+                "processing_time": None,
+                "error_message": None
+            })
+
+            # Desteklenmeyen dosya türü
+            if analysis['file_type'] not in ['pdf', 'document', 'step']:
+                FileAnalysis.update_analysis(analysis_id, {
+                    "analysis_status": "failed",
+                    "error_message": "Desteklenmeyen dosya türü"
+                })
+                return {"success": False, "message": "Desteklenmeyen dosya türü"}, 400
+
+            # OCR/PDF yığını ilk analizde yüklenir (API açılışını yavaşlatmaz)
+            from services.material_analysis import MaterialAnalysisService
+            material_service = MaterialAnalysisService()
+
+            print(f"[ANALYSIS] 🔍 Enhanced analiz başlatılıyor: {analysis['file_type']} - {analysis['original_filename']}")
+
+            # Kapsamlı analiz
+            result = material_service.analyze_document_comprehensive(
+                analysis['file_path'],
+                analysis['file_type'],
+                user_id,
+                analysis_id=analysis_id,
+                stock_method=stock_method
+            )
+
+            print(f"[ANALYSIS] 📊 Material analysis tamamlandı - Success: {not result.get('error')}")
+
+            if result.get('error'):
+                # Analiz hatası
+                error_msg = result.get('error', 'Bilinmeyen analiz hatası')
+
+                FileAnalysis.update_analysis(analysis_id, {
+                    "analysis_status": "failed",
+                    "error_message": error_msg,
+                    "processing_time": time.time() - start_time
+                })
+
+                return {
+                    "success": False,
+                    "message": f"Analiz hatası: {error_msg}",
+                    "error_details": result.get('processing_log', [])
+                }, 500
+
+            processing_time = time.time() - start_time
+            cls._ensure_stl(analysis, analysis_id, result)
+            cls._save_result(analysis, analysis_id, result, processing_time)
+
+            return cls._build_response(analysis, analysis_id, result, processing_time), 200
+
+        except Exception as analysis_error:
+            # Material Analysis hatası
+            error_message = f"Material Analysis hatası: {str(analysis_error)}"
+
+            try:
+                FileAnalysis.update_analysis(analysis_id, {
+                    "analysis_status": "failed",
+                    "error_message": error_message,
+                    "processing_time": time.time() - start_time
+                })
+            except Exception:
+                pass
+
+            print(f"[ANALYSIS] ❌ Analiz hatası: {error_message}")
+            print(f"[ANALYSIS] 📋 Traceback: {traceback.format_exc()}")
+
+            return {
+                "success": False,
+                "message": error_message,
+                "traceback": traceback.format_exc()
+            }, 500
+
+    @staticmethod
+    def _ensure_stl(analysis, analysis_id, result):
+        """✅ STEP için STL oluştur (analiz sırasında oluşturulduysa veya önbellekten geldiyse atla)"""
+        if result.get('stl_generated'):
+            print(f"[ANALYSIS] ♻️ STL analiz sırasında hazırlandı: {result.get('stl_path')}")
+            return
+
+        step_path = None
+        if analysis['file_type'] in ['step', 'stp']:
+            step_path = analysis['file_path']
+        elif analysis['file_type'] == 'pdf' and result.get('step_file_hash'):
+            # PDF'den çıkarılan kalıcı STEP dosyasını kullan
+            step_path = result.get('extracted_step_path')
+            if not step_path or not os.path.exists(step_path):
+                print(f"[ANALYSIS] ⚠️ PDF-STEP dosyası bulunamadı: {step_path}")
+                return
+
+        if not step_path:
+            return
+
+        try:
+            stl_result = run_geometry_job(export_stl_job, step_path, analysis_id)
+        except Exception as e:
+            print(f"[STL-CREATE] ❌ STL oluşturma hatası: {str(e)}")
+            return
+
+        if stl_result['success']:
+            result['stl_generated'] = True
+            result['stl_path'] = stl_result['stl_path']
+            result['stl_url'] = stl_result['stl_url']
+            print(f"[ANALYSIS] ✅ STL oluşturuldu: {stl_result['stl_path']}")
+
+    @staticmethod
+    def _save_result(analysis, analysis_id, result, processing_time):
+        """Sonuçları kaydet"""
+        update_data = {
+            "analysis_status": "completed",
+            "processing_time": processing_time,
+            "material_matches": result.get('material_matches', []),
+            "best_material_block": result.get('best_block', ''),
+            "rotation_count": result.get('rotation_count', 0),
+            "step_analysis": result.get('step_analysis', {}),
+            "cost_estimation": result.get('cost_estimation', {}),
+            "ai_price_prediction": result.get('ai_price_prediction', {}),
+            "processing_log": result.get('processing_log', []),
+            "all_material_calculations": result.get('all_material_calculations', []),
+            "material_options": result.get('material_options', []),
+            "isometric_view": result.get('isometric_view'),
+            "isometric_view_clean": result.get('isometric_view_clean'),
+            "enhanced_renders": result.get('enhanced_renders', {}),
+            "step_file_hash": result.get('step_file_hash'),
+            "render_session_id": result.get('render_session_id'),
+            "geometry_cache_source": result.get('geometry_cache_source'),
+            "geometry_schema_version": AnalysisCacheService.GEOMETRY_SCHEMA_VERSION if result.get('step_analysis') else None,
+            "stock_method": result.get('stock_method'),
+            "render_quality": "high" if result.get('enhanced_renders') else "none",
+            "stl_path": result.get('stl_path'),
+            "stl_generated": result.get('stl_generated', False)
+        }
+
+        # PDF özel alanlar
+        if analysis['file_type'] == 'pdf':
+            update_data["pdf_step_extracted"] = bool(result.get('step_file_hash'))
+            update_data["pdf_rotation_count"] = result.get('rotation_count', 0)
+            update_data["extracted_step_path"] = result.get('extracted_step_path')
+            update_data["pdf_analysis_id"] = result.get('pdf_analysis_id')
+
+        FileAnalysis.update_analysis(analysis_id, update_data)
+
+    @staticmethod
+    def _build_response(analysis, analysis_id, result, processing_time):
+        """Analiz cevabı - güncellenmiş kayıt + özet"""
+        updated_analysis = FileAnalysis.find_by_id(analysis_id)
+
+        # ✅ STEP viewer bilgilerini ekle
+        step_viewer_info = {}
+        if result.get('stl_generated'):
+            step_viewer_info = {
+                "viewer_url": f"/step-viewer/{analysis_id}",
+                "stl_ready": True,
+                "stl_path": result.get('stl_path'),
+                "stl_url": result.get('stl_url')
+            }
+        elif analysis['file_type'] == 'step' or (analysis['file_type'] == 'pdf' and result.get('step_file_hash')):
+            step_viewer_info = {
+                "viewer_url": f"/step-viewer/{analysis_id}",
+                "stl_ready": False,
+                "note": "STL henüz oluşturulmamış, otomatik oluşturulacak"
+            }
+
+        response_data = {
+            "success": True,
+            "message": "Analiz başarıyla tamamlandı",
+            "analysis": updated_analysis,
+            "processing_time": processing_time,
+            "analysis_details": {
+                "material_matches_count": len(result.get('material_matches', [])),
+                "step_analysis_available": bool(result.get('step_analysis')),
+                "cost_estimation_available": bool(result.get('cost_estimation')),
+                "processing_steps": len(result.get('processing_log', [])),
+                "all_material_calculations_count": len(result.get('all_material_calculations', [])),
+                "material_options_count": len(result.get('material_options', [])),
+                "3d_render_available": bool(result.get('isometric_view')),
+                "excel_friendly_render": bool(result.get('isometric_view_clean')),
+                "pdf_step_extracted": analysis['file_type'] == 'pdf' and bool(result.get('step_file_hash')),
+                "step_file_hash": result.get('step_file_hash'),
+                "pdf_rotation_attempts": result.get('rotation_count', 0),
+                "stl_generated": result.get('stl_generated', False),
+                "geometry_cache_hit": result.get('geometry_cache_hit', False)
+            }
+        }
+
+        # ✅ STEP viewer bilgilerini response'a ekle
+        if step_viewer_info:
+            response_data["step_viewer"] = step_viewer_info
+
+        return response_data
+
+
+class AnalysisJobManager:
+    """
+    Analiz işleri için öncelikli kuyruk + sınırlı sayıda worker thread.
+
+    Ağır geometri işleri zaten GeometryWorkerPool süreçlerinde çalışır; buradaki
+    thread'ler OCR, veritabanı ve iş koordinasyonunu yürütür. Tekil /analyze
+    istekleri toplu işlerin önüne geçer; toplu işlerde küçük dosyalar önce çalışır.
+
+    İş ve toplu analiz durumu AnalysisJob ile MongoDB'ye de yazılır: başka bir
+    süreçte oluşturulan işler oradan okunur, yarım kalan işler recover_stale ile
+    yeniden kuyruğa alınır. İş dict'leri yalnızca _lock altında değiştirilir.
+    """
+
+    MAX_FINISHED_JOBS = 1000    # Bellekte tutulan tamamlanmış iş sayısı
+    MAX_BATCHES = 200           # Bellekte tutulan toplu analiz sayısı
+    INTERACTIVE_PRIORITY = -1   # Tekil analizler (batch önceliği = file_size >= 0)
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._jobs = {}
+        self._jobs_by_analysis = {}
+        self._finished = []
+        self._batches = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def submit(self, analysis_id, user_id, stock_method=None, priority=None, batch_id=None, job_id=None):
+        """
+        Analizi kuyruğa al - analysis_status 'queued' olur
+
+        Args:
+            priority: Küçük değer önce çalışır (varsayılan: tekil analiz önceliği)
+            batch_id: İşin ait olduğu toplu analiz
+            job_id: Yeniden kuyruğa alınan işin kimliği (varsayılan: yeni kimlik)
+        """
+        job = {
+            "job_id": job_id or str(uuid.uuid4()),
+            "analysis_id": analysis_id,
+            "user_id": user_id,
+            "stock_method": stock_method,
+            "batch_id": batch_id,
+            "priority": self.INTERACTIVE_PRIORITY if priority is None else priority,
+            "status": "queued",
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "processing_time": None,
+            "error": None,
+            "result": None
+        }
+
+        FileAnalysis.update_analysis(analysis_id, {
+            "analysis_status": "queued",
+            "job_id": job["job_id"],
+            "processing_time": None,
+            "error_message": None
+        })
+        AnalysisJob.save_job(job)
+
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+            self._jobs_by_analysis[analysis_id] = job["job_id"]
+            self._ensure_workers()
+
+        bus = get_event_bus()
+        bus.reset(analysis_id)
+        bus.publish(analysis_id, {
+            "stage": "analysis", "status": "queued", "timestamp": time.time(), "duration": None,
+            "payload": {"job_id": job["job_id"], "batch_id": batch_id}
+        })
+
+        self._queue.put((job["priority"], next(self._sequence), job["job_id"]))
+        print(f"[JOBS] 📥 Analiz kuyruğa alındı: {analysis_id} (job {job['job_id']}, kuyruk: {self._queue.qsize()})")
+        return self.public_job(job)
+
+    def submit_batch(self, analyses, user_id, stock_method=None):
+        """
+        Birden fazla analizi kuyruğa al - küçük dosyalar önce (file_size)
+
+        Args:
+            analyses: FileAnalysis kayıtları
+
+        Returns:
+            Dict: batch bilgisi ve ilerleme
+        """
+        batch_id = str(uuid.uuid4())
+        ordered = sorted(analyses, key=lambda analysis: analysis.get('file_size') or 0)
+
+        batch = {
+            "batch_id": batch_id,
+            "user_id": user_id,
+            "created_at": datetime.utcnow().isoformat(),
+            "started": time.time(),
+            "job_ids": [],
+            "files": {}
+        }
+        with self._lock:
+            self._batches[batch_id] = batch
+            while len(self._batches) > self.MAX_BATCHES:
+                self._batches.popitem(last=False)
+
+        for analysis in ordered:
+            job = self.submit(
+                analysis['id'], user_id, stock_method=stock_method,
+                priority=analysis.get('file_size') or 0, batch_id=batch_id
+            )
+            with self._lock:
+                batch["job_ids"].append(job["job_id"])
+                batch["files"][job["job_id"]] = {
+                    "filename": analysis.get('original_filename'),
+                    "file_size": analysis.get('file_size')
+                }
+        AnalysisJob.save_batch(batch)
+
+        print(f"[JOBS] 📦 Toplu analiz kuyruğa alındı: {batch_id} ({len(ordered)} dosya, {self.max_workers} paralel)")
+        return self.batch_progress(batch_id)
+
+    def get_job(self, job_id):
+        """İşin kopyası - bu süreçte yoksa MongoDB'den (result alanı olmadan)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                return dict(job)
+        return AnalysisJob.find_job(job_id)
+
+    def get_job_for_analysis(self, analysis_id):
+        """Analizin son işinin kopyası - bu süreçte yoksa MongoDB'den"""
+        job = self._local_job_for_analysis(analysis_id)
+        if job:
+            return job
+        return AnalysisJob.find_latest_for_analysis(analysis_id)
+
+    def get_batch(self, batch_id):
+        """Toplu analizin kopyası - bu süreçte yoksa MongoDB'den"""
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch:
+                return {**batch, "job_ids": list(batch["job_ids"]), "files": dict(batch["files"])}
+        return AnalysisJob.find_batch(batch_id)
+
+    def batch_progress(self, batch_id):
+        """
+        Toplu analizin toplam ilerlemesi
+
+        Returns:
+            Dict: durum sayıları, yüzde, tahmini kalan süre ve dosya bazında durumlar
+            (batch bulunamazsa None)
+        """
+        batch = self.get_batch(batch_id)
+        if not batch:
+            return None
+
+        with self._lock:
+            jobs = {job_id: dict(self._jobs[job_id]) for job_id in batch["job_ids"] if job_id in self._jobs}
+
+        # Başka süreçte çalışan veya bellekten düşmüş işler
+        missing = [job_id for job_id in batch["job_ids"] if job_id not in jobs]
+        if missing:
+            jobs.update(AnalysisJob.find_jobs(missing))
+
+        counts = {"queued": 0, "analyzing": 0, "completed": 0, "failed": 0}
+        items = []
+        finished_times = []
+        for job_id in batch["job_ids"]:
+            job = jobs.get(job_id)
+            status = job["status"] if job else "completed"
+            counts[status] = counts.get(status, 0) + 1
+            if job and job.get("processing_time") is not None:
+                finished_times.append(job["processing_time"])
+            items.append({
+                "job_id": job_id,
+                "analysis_id": job["analysis_id"] if job else None,
+                "status": status,
+                "processing_time": job.get("processing_time") if job else None,
+                "error": job.get("error") if job else None,
+                **batch["files"].get(job_id, {})
+            })
+
+        total = len(batch["job_ids"])
+        done = counts["completed"] + counts["failed"]
+        remaining = total - done
+
+        # Kalan süre: ortalama iş süresi × kalan iş / paralel worker sayısı
+        estimated_remaining = None
+        if finished_times and remaining:
+            average = sum(finished_times) / len(finished_times)
+            estimated_remaining = round(average * remaining / max(1, self.max_workers), 1)
+
+        return {
+            "batch_id": batch_id,
+            "created_at": batch["created_at"],
+            "total": total,
+            "counts": counts,
+            "progress_percent": round(100.0 * done / total, 1) if total else 100.0,
+            "finished": remaining == 0,
+            "elapsed_seconds": round(time.time() - batch["started"], 1),
+            "estimated_remaining_seconds": estimated_remaining,
+            "workers": self.max_workers,
+            "items": items
+        }
+
+    def is_active(self, analysis):
+        """
+        Analiz kuyrukta veya çalışıyor mu?
+
+        Başka bir süreçte başlatılmış veya yeniden başlatma sonrası yarım kalmış işler
+        ANALYSIS_STALE_SECONDS sonunda pasif kabul edilir.
+        """
+        if analysis.get('analysis_status') not in ACTIVE_STATUSES:
+            return False
+
+        job = self._local_job_for_analysis(analysis['id'])
+        if job and job["status"] in ACTIVE_STATUSES:
+            return True
+
+        updated_at = analysis.get('updated_at')
+        if isinstance(updated_at, datetime):
+            return datetime.utcnow() - updated_at < timedelta(seconds=Config.ANALYSIS_STALE_SECONDS)
+        return False
+
+    def recover_stale(self):
+        """
+        Yeniden başlatma sonrası 'queued' / 'analyzing' durumunda kalmış analizleri
+        tekrar kuyruğa al (ANALYSIS_STALE_SECONDS boyunca güncellenmemiş olanlar)
+
+        Kayıtlar FileAnalysis.claim_stale_analyses ile atomik olarak sahiplenilir;
+        birden fazla süreç aynı anda açılsa da her iş bir kez kuyruğa girer.
+        İş kimliği, toplu analiz ve öncelik korunur.
+
+        Returns:
+            int: Yeniden kuyruğa alınan analiz sayısı
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=Config.ANALYSIS_STALE_SECONDS)
+        analyses = FileAnalysis.claim_stale_analyses(ACTIVE_STATUSES, cutoff)
+
+        for analysis in analyses:
+            job = AnalysisJob.find_job(analysis['job_id']) if analysis.get('job_id') else None
+            job = job or {}
+            try:
+                self.submit(
+                    analysis['id'],
+                    job.get('user_id') or analysis.get('user_id'),
+                    stock_method=job.get('stock_method', analysis.get('stock_method')),
+                    priority=job.get('priority'),
+                    batch_id=job.get('batch_id'),
+                    job_id=job.get('job_id')
+                )
+            except Exception as e:
+                print(f"[JOBS] ❌ Yarım kalan analiz kuyruğa alınamadı ({analysis['id']}): {e}")
+
+        if analyses:
+            print(f"[JOBS] ♻️ Yarım kalan {len(analyses)} analiz yeniden kuyruğa alındı")
+        return len(analyses)
+
+    def stats(self):
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job["status"] == "analyzing")
+        return {
+            "queued": self._queue.qsize(),
+            "running": running,
+            "workers": self.max_workers
+        }
+
+    @staticmethod
+    def public_job(job):
+        """API'de gösterilecek iş alanları"""
+        return {key: value for key, value in job.items() if key not in ("result", "user_id")}
+
+    def _local_job_for_analysis(self, analysis_id):
+        """Bu süreçteki işin kopyası (MongoDB'ye bakmaz)"""
+        with self._lock:
+            job_id = self._jobs_by_analysis.get(analysis_id)
+            job = self._jobs.get(job_id) if job_id else None
+            return dict(job) if job else None
+
+    def _update_job(self, job_id, **fields):
+        """İş alanlarını kilit altında güncelle ve MongoDB'ye yaz; güncel kopyayı döndür"""
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields)
+            snapshot = dict(job)
+        try:
+            AnalysisJob.update_job(job_id, fields)
+        except Exception as e:
+            print(f"[JOBS] ⚠️ İş durumu kaydedilemedi ({job_id}): {e}")
+        return snapshot
+
+    def _ensure_workers(self):
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(
+                target=self._worker_loop, name=f"analysis-job-{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _worker_loop(self):
+        while True:
+            _, _, job_id = self._queue.get()
+            try:
+                with self._lock:
+                    known = job_id in self._jobs
+                if known:
+                    self._run_job(job_id)
+            except Exception as e:
+                print(f"[JOBS] ❌ İş çalıştırma hatası ({job_id}): {e}")
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, job_id):
+        start_time = time.time()
+        job = self._update_job(job_id, status="analyzing", started_at=datetime.utcnow().isoformat())
+        print(f"[JOBS] ▶️ Analiz başladı: {job['analysis_id']} (job {job_id})")
+
+        response_data, http_status = AnalysisRunner.run(job["analysis_id"], job["user_id"], job["stock_method"])
+
+        job = self._update_job(
+            job_id,
+            status="completed" if http_status == 200 else "failed",
+            error=None if http_status == 200 else response_data.get("message"),
+            result=response_data,
+            processing_time=time.time() - start_time,
+            finished_at=datetime.utcnow().isoformat()
+        )
+        print(f"[JOBS] ⏹️ Analiz bitti: {job['analysis_id']} - {job['status']} ({job['processing_time']:.1f}s)")
+
+        self._remember_finished(job)
+
+    def _remember_finished(self, job):
+        with self._lock:
+            self._finished.append(job["job_id"])
+            while len(self._finished) > self.MAX_FINISHED_JOBS:
+                old_id = self._finished.pop(0)
+                old_job = self._jobs.pop(old_id, None)
+                if old_job and self._jobs_by_analysis.get(old_job["analysis_id"]) == old_id:
+                    del self._jobs_by_analysis[old_job["analysis_id"]]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """Uygulama genelinde paylaşılan analiz iş yöneticisi"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = AnalysisJobManager(Config.ANALYSIS_JOB_WORKERS)
+            registry.register_collector(_collect_queue_metrics)
+        return _manager
+
+
+def _collect_queue_metrics(metrics):
+    """/metrics için kuyruk durumu"""
+    stats = _manager.stats()
+    metrics.set("engteklif_analysis_jobs", stats["queued"], "Kuyruktaki / çalışan analiz işleri", state="queued")
+    metrics.set("engteklif_analysis_jobs", stats["running"], "Kuyruktaki / çalışan analiz işleri", state="running")
+    metrics.set("engteklif_analysis_job_workers", stats["workers"], "Analiz worker thread sayısı")
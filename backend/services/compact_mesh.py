@@ -0,0 +1,197 @@
+# services/compact_mesh.py - Quantized, progressive (LOD) mesh files for the STEP viewers
+#
+# viewer_low / viewer_high tessellation'larından (MeshBuffers) üretilir ve STEP içerik hash'ine göre
+# static/meshes/<step_hash>/ altında saklanır; aynı geometri tekrar üretilmez.
+#
+# Dosya formatı (.etm, gzip'li, little-endian):
+#   header (44 byte): "ETMS", version u16, level u16, vertex_count u32, index_count u32,
+#                     flags u32 (bit0: uint32 indeks), bbox min f32*3, bbox max f32*3
+#   positions: u16 * 3 * N  (bbox içinde 16 bit quantize)
+#   normals:   i8 * 2 * N   (oct-encoded)
+#   indices:   u16 veya u32 * index_count
+import os
+import gzip
+import json
+import time
+import struct
+import numpy as np
+from config import Config
+from services.mesh_export import MeshBuffers
+
+MESH_MAGIC = b"ETMS"
+MESH_VERSION = 1
+FLAG_UINT32_INDICES = 1
+HEADER_FORMAT = "<4sHHIII3f3f"
+
+
+class CompactMeshService:
+    """Progressive mesh üretimi, önbelleği ve analiz bağlantısı"""
+
+    STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "static")
+    MESH_DIR = os.path.join(STATIC_DIR, "meshes")
+    STEPVIEWS_DIR = os.path.join(STATIC_DIR, "stepviews")
+
+    @classmethod
+    def load_manifest(cls, step_hash):
+        """Hash için üretilmiş manifest (yoksa veya dosyalar eksikse None)"""
+        if not step_hash:
+            return None
+        try:
+            with open(cls._manifest_path(step_hash), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        for lod in manifest.get("lods", []):
+            if not os.path.exists(os.path.join(cls.MESH_DIR, step_hash, lod["file"])):
+                return None
+        return manifest
+
+    @classmethod
+    def ensure(cls, context, analysis_id=None):
+        """
+        Context'in viewer tessellation'larından progressive mesh'i üret (önbellekte yoksa)
+
+        analysis_id verilirse static/stepviews/<analysis_id>/mesh.json bağlantısı yazılır.
+        """
+        step_hash = context.shape_hash
+        manifest = cls.load_manifest(step_hash)
+        if manifest is None:
+            coarse = MeshBuffers.from_context(context, lod="viewer_low")
+            full = MeshBuffers.from_context(context, lod="viewer_high")
+            manifest = cls.build([coarse, full], step_hash)
+        if analysis_id:
+            cls.link(manifest, analysis_id)
+        return manifest
+
+    @classmethod
+    def build(cls, meshes, step_hash):
+        """
+        LOD dosyalarını ve manifest'i yaz
+
+        Args:
+            meshes: Kabadan hassasa MeshBuffers listesi (son eleman tam seviye)
+        """
+        start_time = time.time()
+        target_dir = os.path.join(cls.MESH_DIR, step_hash)
+        os.makedirs(target_dir, exist_ok=True)
+
+        # En kaba mesh'in altına vertex clustering seviyeleri; belirgin küçülme yoksa atlanır
+        levels = []
+        for grid in Config.MESH_LOD_GRIDS:
+            coarse = cls.cluster(meshes[0], grid)
+            if coarse.face_count and coarse.face_count <= meshes[0].face_count * 0.5 and \
+                    (not levels or coarse.face_count >= levels[-1].face_count * 2):
+                levels.append(coarse)
+        for mesh in meshes:
+            if not levels or mesh.face_count > levels[-1].face_count:
+                levels.append(mesh)
+
+        populated = [mesh.vertices for mesh in levels if mesh.vertex_count]
+        all_vertices = np.concatenate(populated) if populated else np.zeros((1, 3), dtype=np.float32)
+        low, high = all_vertices.min(axis=0), all_vertices.max(axis=0)
+
+        lods = []
+        for level, lod_mesh in enumerate(levels):
+            filename = f"lod{level}.etm.gz"
+            payload = gzip.compress(cls.encode(lod_mesh, level, low, high), compresslevel=6)
+            cls._write_atomic(os.path.join(target_dir, filename), payload)
+            lods.append({
+                "level": level,
+                "file": filename,
+                "url": f"/static/meshes/{step_hash}/{filename}",
+                "vertices": lod_mesh.vertex_count,
+                "triangles": lod_mesh.face_count,
+                "bytes": len(payload)
+            })
+
+        manifest = {
+            "format": "etm",
+            "version": MESH_VERSION,
+            "step_file_hash": step_hash,
+            "bbox": {"min": [float(v) for v in low], "max": [float(v) for v in high]},
+            "lods": lods,
+            "created_at": time.time()
+        }
+        cls._write_atomic(cls._manifest_path(step_hash), json.dumps(manifest).encode("utf-8"))
+        print(f"[COMPACT-MESH] ✅ {len(lods)} LOD üretildi ({step_hash[:12]}): "
+              f"{', '.join(str(lod['bytes']) for lod in lods)} byte ({time.time() - start_time:.2f}s)")
+        return manifest
+
+    @classmethod
+    def link(cls, manifest, analysis_id):
+        """Viewer'ın statik olarak bulabilmesi için analiz dizinine manifest kopyası yaz"""
+        target_dir = os.path.join(cls.STEPVIEWS_DIR, analysis_id)
+        os.makedirs(target_dir, exist_ok=True)
+        cls._write_atomic(os.path.join(target_dir, "mesh.json"), json.dumps(manifest).encode("utf-8"))
+
+    # ===== KODLAMA =====
+
+    @staticmethod
+    def encode(mesh, level, low, high):
+        """Mesh'i .etm formatında kodla (sıkıştırılmamış)"""
+        extent = np.where(high - low > 0, high - low, 1.0)
+        positions = np.round((mesh.vertices - low) / extent * 65535).clip(0, 65535).astype("<u2")
+        normals = oct_encode(mesh.vertex_normals)
+
+        wide = mesh.vertex_count > 65535
+        indices = mesh.faces.astype("<u4" if wide else "<u2")
+
+        header = struct.pack(
+            HEADER_FORMAT, MESH_MAGIC, MESH_VERSION, level,
+            mesh.vertex_count, indices.size, FLAG_UINT32_INDICES if wide else 0,
+            *[float(v) for v in low], *[float(v) for v in high]
+        )
+        return header + positions.tobytes() + normals.tobytes() + indices.tobytes()
+
+    @staticmethod
+    def cluster(mesh, grid):
+        """
+        Vertex clustering ile kaba LOD: en uzun kenar grid hücresine bölünür,
+        aynı hücredeki vertex'ler ortalamada birleşir, dejenere üçgenler atılır.
+        """
+        vertices = mesh.vertices.astype(np.float64)
+        if not len(vertices):
+            return mesh
+        low = vertices.min(axis=0)
+        cell = max(float(np.ptp(vertices, axis=0).max()), 1e-9) / grid
+        cells = np.floor((vertices - low) / cell).astype(np.int64)
+        keys = cells[:, 0] + (grid + 1) * (cells[:, 1] + (grid + 1) * cells[:, 2])
+        unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+
+        centers = np.column_stack([
+            np.bincount(inverse, weights=vertices[:, axis], minlength=len(unique)) for axis in range(3)
+        ]) / counts[:, None]
+
+        faces = inverse[mesh.faces]
+        keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+        faces = faces[keep]
+        if len(faces):
+            # Aynı köşelere düşen tekrar eden üçgenleri tekle
+            _, first = np.unique(np.sort(faces, axis=1), axis=0, return_index=True)
+            faces = faces[np.sort(first)]
+        return MeshBuffers(centers, faces)
+
+    # ===== YARDIMCI =====
+
+    @classmethod
+    def _manifest_path(cls, step_hash):
+        return os.path.join(cls.MESH_DIR, step_hash, "manifest.json")
+
+    @staticmethod
+    def _write_atomic(path, data):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+
+def oct_encode(normals):
+    """Birim normalleri octahedral 2 x int8 olarak kodla"""
+    normals = np.asarray(normals, dtype=np.float64)
+    l1 = np.abs(normals).sum(axis=1, keepdims=True)
+    l1[l1 == 0] = 1.0
+    projected = normals[:, :2] / l1
+    lower = normals[:, 2] < 0
+    folded = projected[lower]
+    projected[lower] = (1.0 - np.abs(folded[:, ::-1])) * np.where(folded >= 0, 1.0, -1.0)
+    return np.clip(np.round(projected * 127), -127, 127).astype(np.int8)
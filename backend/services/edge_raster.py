@@ -0,0 +1,208 @@
+# services/edge_raster.py - OCCT hidden-line projection rasterized directly with NumPy
+#
+# HLR (HLRBRep_Algo) kenarları 2B polyline'lara ayrıştırılır ve bellek içinde
+# anti-aliased olarak çizilir: SVG yazıp cairosvg ile tekrar okumaya gerek kalmaz.
+# Aynı polyline'lardan istenirse SVG de üretilir (opsiyonel çıktı). Wireframe için
+# tüm model kenarları HLR olmadan doğrudan projekte edilir.
+import numpy as np
+import cadquery as cq
+from OCP.BRep import BRep_Tool
+from OCP.BRepLib import BRepLib
+from OCP.GCPnts import GCPnts_QuasiUniformDeflection
+from OCP.HLRAlgo import HLRAlgo_Projector
+from OCP.HLRBRep import HLRBRep_Algo, HLRBRep_HLRToShape
+from OCP.gp import gp_Ax2, gp_Dir, gp_Pnt
+from services.mesh_raster import view_basis, fit_transform
+
+# CadQuery SVG exporter ile aynı değerler
+HLR_TOLERANCE = 1e-6
+DISCRETIZATION_TOLERANCE = 1e-3
+
+VISIBLE_COLOR = (0, 0, 0)
+HIDDEN_COLOR = (160, 160, 160)
+BACKGROUND_COLOR = (255, 255, 255)
+
+
+class EdgeProjection:
+    """
+    Bir şeklin belirli yönden görünen / gizli kenarları (projeksiyon düzleminde 2B polyline'lar)
+    """
+
+    def __init__(self, visible, hidden):
+        self.visible = visible      # [(N, 2) float64]
+        self.hidden = hidden
+
+    @classmethod
+    def from_shape(cls, shape, direction):
+        """HLR ile projeksiyon kenarlarını hesapla"""
+        hlr = HLRBRep_Algo()
+        hlr.Add(shape.wrapped)
+        # Gölgeli mesh görüntüsü ile aynı ekran eksenleri (üst üste çizilebilmesi için)
+        right, _, toward = view_basis(direction)
+        hlr.Projector(HLRAlgo_Projector(gp_Ax2(gp_Pnt(), gp_Dir(*toward), gp_Dir(*right))))
+        hlr.Update()
+        hlr.Hide()
+        hlr_shapes = HLRBRep_HLRToShape(hlr)
+
+        visible = [hlr_shapes.VCompound(), hlr_shapes.Rg1LineVCompound(), hlr_shapes.OutLineVCompound()]
+        hidden = [hlr_shapes.HCompound(), hlr_shapes.Rg1LineHCompound(), hlr_shapes.OutLineHCompound()]
+        return cls(cls._polylines(visible), cls._polylines(hidden))
+
+    @classmethod
+    def from_edges(cls, shape, direction):
+        """Tüm model kenarlarının projeksiyonu (gizli çizgi hesabı yok) - wireframe için"""
+        basis = np.stack(view_basis(direction)[:2])
+        return cls([points @ basis.T for points in cls._discretize(shape.Edges())], [])
+
+    @classmethod
+    def _polylines(cls, compounds):
+        """HLR sonuç compound'larından 2B polyline'lar (projeksiyon düzleminde z = 0)"""
+        polylines = []
+        for compound in compounds:
+            if compound.IsNull():
+                continue
+            # HLR kenarlarında 3B eğri yok - ayrıştırmadan önce oluşturulmalı
+            BRepLib.BuildCurves3d_s(compound, HLR_TOLERANCE)
+            polylines.extend(points[:, :2] for points in cls._discretize(cq.Shape.cast(compound).Edges()))
+        return polylines
+
+    @staticmethod
+    def _discretize(edges):
+        """Kenarları sapma toleransı ile (N, 3) noktalara ayrıştır"""
+        for edge in edges:
+            if BRep_Tool.Degenerated_s(edge.wrapped):
+                continue
+            curve = edge._geomAdaptor()
+            points = GCPnts_QuasiUniformDeflection(
+                curve, DISCRETIZATION_TOLERANCE, curve.FirstParameter(), curve.LastParameter()
+            )
+            if not points.IsDone() or points.NbPoints() < 2:
+                continue
+            yield np.array([points.Value(i).Coord() for i in range(1, points.NbPoints() + 1)], dtype=np.float64)
+
+    # ===== GÖRÜNTÜ DÖNÜŞÜMÜ =====
+
+    def bounds(self):
+        """Projeksiyon düzlemindeki (low, high) kutusu"""
+        all_points = np.concatenate(self.visible + self.hidden) if (self.visible or self.hidden) else np.zeros((1, 2))
+        return all_points.min(axis=0), all_points.max(axis=0)
+
+    def rasterize(self, size, line_width=1.5, supersample=3, show_hidden=True, bounds=None, background=None):
+        """
+        Kenarları anti-aliased RGB görüntüye çiz
+
+        Args:
+            bounds: Ortak sığdırma kutusu (None = kenarların kendi kutusu)
+            background: Üzerine çizilecek (height, width, 3) görüntü (örn. gölgeli mesh)
+
+        Returns:
+            (height, width, 3) uint8 dizi
+        """
+        width, height = size
+        to_pixels = fit_transform(bounds if bounds is not None else self.bounds(), size)
+        image = np.empty((height, width, 3), dtype=np.float32)
+        image[:] = BACKGROUND_COLOR if background is None else background
+
+        layers = [(self.hidden, HIDDEN_COLOR, (6.0, 4.0))] if show_hidden else []
+        layers.append((self.visible, VISIBLE_COLOR, None))
+        for polylines, color, dash in layers:
+            if not polylines:
+                continue
+            coverage = _coverage(
+                [to_pixels(p) * supersample for p in polylines],
+                (height * supersample, width * supersample),
+                line_width * supersample,
+                tuple(d * supersample for d in dash) if dash else None
+            )
+            # Box filtre ile örnekleme çözünürlüğüne indir
+            alpha = coverage.reshape(height, supersample, width, supersample).mean(axis=(1, 3))[..., None]
+            image = image * (1.0 - alpha) + np.asarray(color, dtype=np.float32) * alpha
+
+        return np.clip(image + 0.5, 0, 255).astype(np.uint8)
+
+    def to_svg(self, size, show_hidden=True):
+        """Aynı polyline'lardan SVG metni (opsiyonel çıktı)"""
+        width, height = size
+        to_pixels = fit_transform(self.bounds(), size)
+
+        def paths(polylines):
+            for polyline in polylines:
+                points = to_pixels(polyline)
+                yield "M" + " L".join(f"{x:.2f},{y:.2f}" for x, y in points)
+
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8" standalone="no"?>',
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+            f'<rect width="{width}" height="{height}" fill="rgb{BACKGROUND_COLOR}"/>'
+        ]
+        if show_hidden and self.hidden:
+            lines.append(f'<g stroke="rgb{HIDDEN_COLOR}" stroke-width="1" stroke-dasharray="6,4" fill="none">')
+            lines.extend(f'<path d="{d}"/>' for d in paths(self.hidden))
+            lines.append('</g>')
+        lines.append(f'<g stroke="rgb{VISIBLE_COLOR}" stroke-width="1.5" fill="none">')
+        lines.extend(f'<path d="{d}"/>' for d in paths(self.visible))
+        lines.append('</g>')
+        lines.append('</svg>')
+        return "\n".join(lines)
+
+
+def _coverage(polylines, shape, line_width, dash=None):
+    """
+    Polyline'ların kapsama haritası (0..1)
+
+    Her segment yarım piksel aralıkla örneklenir; örnekler çizgiye dik yönde
+    line_width boyunca yayılır ve bilineer ağırlıklarla (maksimum) piksellere dağıtılır.
+    """
+    height, width = shape
+    coverage = np.zeros(shape, dtype=np.float32)
+
+    starts, ends, arc_offsets = [], [], []
+    for points in polylines:
+        if len(points) < 2:
+            continue
+        segment_lengths = np.hypot(*(points[1:] - points[:-1]).T)
+        starts.append(points[:-1])
+        ends.append(points[1:])
+        arc_offsets.append(np.concatenate(([0.0], np.cumsum(segment_lengths)[:-1])))
+    if not starts:
+        return coverage
+
+    p0, p1 = np.concatenate(starts), np.concatenate(ends)
+    arc_start = np.concatenate(arc_offsets)
+    delta = p1 - p0
+    lengths = np.hypot(delta[:, 0], delta[:, 1])
+
+    # Segment başına örnek sayısı ve parametreler (vektörel)
+    steps = np.maximum(np.ceil(lengths / 0.5).astype(np.int64), 1)
+    counts = steps + 1
+    segment = np.repeat(np.arange(len(p0)), counts)
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    t = (np.arange(counts.sum()) - first) / np.repeat(steps, counts)
+
+    samples = p0[segment] + delta[segment] * t[:, None]
+    if dash is not None:
+        on, off = dash
+        arc = arc_start[segment] + lengths[segment] * t
+        keep = np.mod(arc, on + off) < on
+        samples, segment = samples[keep], segment[keep]
+
+    # Çizgi kalınlığı: dik yönde kaydırılmış kopyalar
+    normals = np.zeros_like(delta)
+    nonzero = lengths > 0
+    normals[nonzero] = np.column_stack((-delta[nonzero, 1], delta[nonzero, 0])) / lengths[nonzero, None]
+    half = max(line_width - 1.0, 0.0) / 2
+    offsets = np.linspace(-half, half, max(int(np.ceil(line_width * 2)), 1)) if half > 0 else np.zeros(1)
+    samples = (samples[None, :, :] + offsets[:, None, None] * normals[segment][None, :, :]).reshape(-1, 2)
+
+    x, y = samples[:, 0] - 0.5, samples[:, 1] - 0.5
+    x0, y0 = np.floor(x).astype(np.int64), np.floor(y).astype(np.int64)
+    fx, fy = (x - x0).astype(np.float32), (y - y0).astype(np.float32)
+    for dx, dy, weight in (
+        (0, 0, (1 - fx) * (1 - fy)), (1, 0, fx * (1 - fy)),
+        (0, 1, (1 - fx) * fy), (1, 1, fx * fy)
+    ):
+        px, py = x0 + dx, y0 + dy
+        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        np.maximum.at(coverage, (py[inside], px[inside]), weight[inside])
+
+    return np.minimum(coverage * 1.5, 1.0)
@@ -0,0 +1,165 @@
+# services/geometry_jobs.py - Geometry jobs executed inside the worker pool
+#
+# Fonksiyonlar modül seviyesinde tanımlıdır; GeometryWorkerPool onları pickle ile
+# worker sürecine gönderir. Dönüş değerleri yalnızca JSON uyumlu veriler içerir.
+#
+# CadQuery/OCCT ve render yığını fonksiyon içinde import edilir: API süreci bu modülü
+# yalnızca iş referansı için yükler, ağır modüller worker'larda (GEOMETRY_PRELOAD_MODULES)
+# önceden yüklenir.
+from services.analysis_events import report_progress
+from config import Config
+import time
+
+
+def process_step_job(step_path, session_id, stl_analysis_id=None, render=True):
+    """
+    STEP dosyasını bir kez import et; analiz, render ve STL'i aynı şekille üret
+
+    Args:
+        step_path: STEP dosya yolu
+        session_id: Render oturum dizini
+        stl_analysis_id: Verilirse static/stepviews/<id>/model_<id>.stl oluşturulur
+        render: Görünümler oluşturulsun mu
+
+    Returns:
+        Dict: step_analysis, render_result, stl_result, import_time
+    """
+    from services.step_context import StepShapeContext
+    from services.step_analysis import StepGeometryAnalyzer
+    from services.step_renderer import StepRendererEnhanced, ModelExporter
+    from services.compact_mesh import CompactMeshService
+
+    try:
+        context = StepShapeContext.load(step_path)
+    except Exception as e:
+        report_progress("step_import", status="failed", error=str(e))
+        return {"step_analysis": {"error": f"STEP analiz hatası: {str(e)}"}}
+
+    if not context.objects:
+        report_progress("step_import", status="failed", error="STEP dosyasında obje yok")
+        return {"step_analysis": {"error": "STEP dosyasında obje yok"}}
+
+    report_progress("step_import", duration=context.import_time, shape_count=len(context.objects))
+
+    result = {
+        "step_analysis": StepGeometryAnalyzer.analyze(step_path, context=context),
+        "render_result": None,
+        "stl_result": None,
+        "import_time": context.import_time
+    }
+    if result["step_analysis"].get("error"):
+        return result
+
+    if render:
+        # lazy modda yalnızca izometrik; diğer görünümler ilk istendiğinde render_step_job ile
+        lazy = Config.RENDER_MODE == "lazy"
+        renderer = StepRendererEnhanced()
+        result["render_result"] = _shared_render(
+            session_id,
+            lambda views, model_files: renderer.generate_comprehensive_views(
+                step_path,
+                analysis_id=session_id,
+                include_dimensions=True,
+                include_materials=True,
+                high_quality=True,
+                context=context,
+                views=views,
+                model_files=model_files
+            ),
+            views=["isometric"] if lazy else renderer.view_types(True, True),
+            model_files=not lazy
+        )
+
+    if stl_analysis_id:
+        stl_start = time.time()
+        result["stl_result"] = ModelExporter.export_analysis_stl(step_path, stl_analysis_id, context=context)
+        report_progress(
+            "stl", status="completed" if result["stl_result"].get("success") else "failed",
+            duration=time.time() - stl_start,
+            stl_url=result["stl_result"].get("stl_url"),
+            error=result["stl_result"].get("error")
+        )
+
+        # Viewer için quantize edilmiş progressive mesh - aynı tessellation kullanılır
+        mesh_start = time.time()
+        try:
+            manifest = CompactMeshService.ensure(context, stl_analysis_id)
+            report_progress("compact_mesh", duration=time.time() - mesh_start, lod_count=len(manifest["lods"]))
+        except Exception as e:
+            report_progress("compact_mesh", status="failed", error=str(e))
+
+    return result
+
+
+def render_step_job(step_path, session_id, include_dimensions=True, include_materials=True, high_quality=True,
+                    model_files=True):
+    """
+    Görünüm setini render et - /render endpoint'i ve lazy modda ilk görünüm isteği için
+
+    Dizinde eksik olan görünümlerin tamamı tek STEP import'u ile render edilir; lazy
+    modda ilk ortografik istek diğerlerini de üretir (görünüm başına ayrı import yerine).
+
+    Args:
+        model_files: Model dosyaları (STL/OBJ/PLY/GLB ve viewer) da gerekli mi
+    """
+    from services.step_renderer import StepRendererEnhanced
+    renderer = StepRendererEnhanced()
+    return _shared_render(
+        session_id,
+        lambda views, model_files: renderer.generate_comprehensive_views(
+            step_path,
+            analysis_id=session_id,
+            include_dimensions=include_dimensions,
+            include_materials=include_materials,
+            high_quality=high_quality,
+            views=views,
+            model_files=model_files
+        ),
+        views=renderer.view_types(include_dimensions, include_materials),
+        model_files=model_files
+    )
+
+
+def _shared_render(session_id, render, views, model_files=True):
+    """
+    Render dizininde (RenderStore) sonuç varsa yeniden kullan, yoksa render et ve sakla
+
+    Saklanan sonuç istenen görünümlerin tamamını (ve gerekiyorsa model dosyalarını)
+    kapsamıyorsa yalnızca eksikler render edilip sonuca eklenir - lazy modda yalnızca
+    izometrik üretmiş bir dizin tam görünüm setini isteyen işe eksik dönmez.
+    Aynı geometriyi aynı anda işleyen iki iş dizin kilidinde sıraya girer; ikincisi
+    ilkinin ürettiği render'ları alır.
+
+    Args:
+        render: render(views, model_files) -> generate_comprehensive_views sonucu
+        views: İstenen görünümler
+        model_files: Model dosyaları (STL/OBJ/PLY/GLB ve viewer) gerekli mi
+    """
+    from services.render_store import RenderStore
+
+    with RenderStore.lock(session_id):
+        stored = RenderStore.load_renders(session_id)
+        if stored:
+            missing_views, missing_models = RenderStore.missing(stored, views, model_files)
+            if not missing_views and not missing_models:
+                report_progress("render_store", session_id=session_id, view_count=len(stored.get("renders", {})))
+                print(f"[RENDER-STORE] ♻️ Render'lar paylaşılan dizinden alındı: {session_id}")
+                return stored
+            print(f"[RENDER-STORE] ➕ Eksik görünümler render ediliyor: {session_id} "
+                  f"({', '.join(missing_views) or '-'}{' + model dosyaları' if missing_models else ''})")
+            return RenderStore.save_renders(session_id, render(missing_views, missing_models),
+                                            missing_views, missing_models, stored=stored)
+        return RenderStore.save_renders(session_id, render(views, model_files), views, model_files)
+
+
+def export_stl_job(step_path, analysis_id):
+    """Sadece STL export - static/stepviews/<analysis_id>/model_<analysis_id>.stl"""
+    from services.step_renderer import ModelExporter
+    return ModelExporter.export_analysis_stl(step_path, analysis_id)
+
+
+def compact_mesh_job(step_path, analysis_id):
+    """Progressive mesh üret (önbellekte yoksa) ve analize bağla - /mesh endpoint'i için"""
+    from services.step_context import StepShapeContext
+    from services.compact_mesh import CompactMeshService
+    return CompactMeshService.ensure(StepShapeContext.load(step_path), analysis_id)
@@ -0,0 +1,355 @@
+# services/geometry_worker.py - Sandboxed process pool for OCCT geometry jobs
+import os
+import sys
+import time
+import atexit
+import argparse
+import importlib
+import threading
+import subprocess
+import traceback
+from multiprocessing.connection import Connection
+from config import Config
+from services.analysis_events import progress_sink, current_progress_sink
+from services.metrics import registry, collect_stages, record_stage
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class GeometryWorkerError(Exception):
+    """Geometri worker hatalarının temel sınıfı"""
+
+
+class GeometryTimeoutError(GeometryWorkerError):
+    """İş süre sınırını aştı - worker sonlandırıldı"""
+
+
+class GeometryWorkerCrashed(GeometryWorkerError):
+    """Worker süreci beklenmedik şekilde kapandı (segfault, bellek sınırı vb.)"""
+
+
+class GeometryJobError(GeometryWorkerError):
+    """İş fonksiyonu worker içinde exception fırlattı"""
+
+    def __init__(self, message, remote_traceback=None):
+        super().__init__(message)
+        self.remote_traceback = remote_traceback
+
+
+class _WorkerProcess:
+    """
+    Tek bir geometri worker süreci.
+
+    Worker `python -m services.geometry_worker` olarak başlatılır; böylece app.py
+    yeniden import edilmez. İşler ve sonuçlar pipe üzerinden pickle ile taşınır.
+    """
+
+    def __init__(self, memory_limit_mb, preload):
+        parent_read, child_write = os.pipe()
+        child_read, parent_write = os.pipe()
+
+        command = [
+            sys.executable, "-m", "services.geometry_worker",
+            "--read-fd", str(child_read),
+            "--write-fd", str(child_write),
+            "--memory-limit-mb", str(memory_limit_mb)
+        ]
+        for module in preload:
+            command += ["--preload", module]
+
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [BACKEND_DIR, env.get("PYTHONPATH")]))
+
+        self.process = subprocess.Popen(
+            command, cwd=os.getcwd(), env=env, pass_fds=(child_read, child_write), close_fds=True
+        )
+        os.close(child_read)
+        os.close(child_write)
+
+        self._results = Connection(parent_read, writable=False)
+        self._jobs = Connection(parent_write, readable=False)
+        self.jobs_done = 0
+        self.started_at = time.time()
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def execute(self, fn, args, kwargs, timeout, on_progress=None):
+        """İşi worker'a gönder ve sonucu bekle (ara aşama olayları on_progress'e iletilir)"""
+        deadline = time.time() + timeout
+        try:
+            self._jobs.send((fn, args, kwargs))
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self._results.poll(remaining):
+                    raise GeometryTimeoutError(f"Geometri işi {timeout}s içinde tamamlanamadı: {fn.__name__}")
+                status, payload, *extra = self._results.recv()
+                if status != "progress":
+                    break
+                if on_progress is not None:
+                    try:
+                        on_progress(payload)
+                    except Exception as progress_error:
+                        print(f"[GEOMETRY-POOL] ⚠️ İlerleme olayı iletilemedi: {progress_error}")
+        except (EOFError, OSError) as e:
+            try:
+                exit_code = self.process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                exit_code = None
+            raise GeometryWorkerCrashed(f"Geometri worker'ı kapandı (exit code: {exit_code}): {e}")
+
+        self.jobs_done += 1
+        # Worker içinde ölçülen aşama süreleri ana süreçte kaydedilir
+        for stage in (extra[0] if extra else ()):
+            record_stage(stage["stage"], stage["duration"], stage["error"])
+        if status == "error":
+            message, remote_traceback = payload
+            raise GeometryJobError(message, remote_traceback)
+        return payload
+
+    def stop(self, kill=False):
+        """Worker'ı kapat - kill=True ise beklemeden sonlandır"""
+        try:
+            if self.is_alive():
+                if kill:
+                    self.process.kill()
+                else:
+                    self._jobs.send(None)
+                self.process.wait(timeout=5)
+        except Exception:
+            try:
+                self.process.kill()
+            except Exception:
+                pass
+        finally:
+            for connection in (self._jobs, self._results):
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+
+
+class GeometryWorkerPool:
+    """
+    CadQuery/OCCT işleri için sınırlı boyutta worker süreç havuzu.
+
+    - Her iş için wall-clock süre sınırı (aşılırsa worker öldürülür)
+    - Worker başına RLIMIT_AS bellek sınırı
+    - Belirli sayıda işten sonra veya hata durumunda worker yenilenir
+    """
+
+    def __init__(self, max_workers, timeout, memory_limit_mb, max_jobs_per_worker, preload=()):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.preload = tuple(preload)
+
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {"completed": 0, "failed": 0, "timeouts": 0, "crashes": 0, "recycled": 0}
+
+    def run(self, fn, *args, timeout=None, on_progress=None, **kwargs):
+        """
+        fn(*args, **kwargs) çağrısını bir worker'da çalıştır ve sonucu döndür
+
+        fn modül seviyesinde tanımlı (pickle edilebilir) bir fonksiyon olmalıdır.
+        Worker içindeki report_progress olayları on_progress(event) ile iletilir.
+
+        Raises:
+            GeometryTimeoutError, GeometryWorkerCrashed, GeometryJobError
+        """
+        if self._closed:
+            raise GeometryWorkerError("Geometri worker havuzu kapatıldı")
+
+        timeout = timeout or self.timeout
+        with self._slots:
+            worker = self._checkout()
+            start_time = time.time()
+            try:
+                result = worker.execute(fn, args, kwargs, timeout, on_progress)
+            except GeometryTimeoutError:
+                self._count("timeouts")
+                print(f"[GEOMETRY-POOL] ⏱️ {fn.__name__} zaman aşımı ({timeout}s) - worker {worker.pid} sonlandırıldı")
+                worker.stop(kill=True)
+                raise
+            except GeometryWorkerCrashed as e:
+                self._count("crashes")
+                print(f"[GEOMETRY-POOL] 💥 {fn.__name__} sırasında worker {worker.pid} çöktü: {e}")
+                worker.stop(kill=True)
+                raise
+            except GeometryJobError:
+                self._count("failed")
+                self._checkin(worker)
+                raise
+            except BaseException:
+                # Pickle hatası, KeyboardInterrupt vb. - kanal yarım mesajda kalmış olabilir,
+                # worker tekrar kullanılmaz
+                worker.stop(kill=True)
+                raise
+
+            self._count("completed")
+            record_stage(f"geometry_job_{fn.__name__}", time.time() - start_time)
+            print(f"[GEOMETRY-POOL] ✅ {fn.__name__} tamamlandı ({time.time() - start_time:.2f}s, worker {worker.pid})")
+            self._checkin(worker)
+            return result
+
+    def prewarm(self, count):
+        """
+        count adet worker'ı şimdiden başlat (beklemeden döner)
+
+        Worker'lar ağır modülleri kendi süreçlerinde yükler; ilk geometri işi
+        CadQuery import süresini beklemez.
+        """
+        with self._lock:
+            missing = min(count, self.max_workers) - len(self._idle)
+        for _ in range(max(0, missing)):
+            worker = _WorkerProcess(self.memory_limit_mb, self.preload)
+            print(f"[GEOMETRY-POOL] 🔥 Geometri worker'ı önceden başlatıldı (pid {worker.pid})")
+            with self._lock:
+                self._idle.append(worker)
+
+    def shutdown(self):
+        """Tüm boştaki worker'ları kapat"""
+        with self._lock:
+            self._closed = True
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
+
+    def _checkout(self):
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.is_alive():
+                    return worker
+                worker.stop(kill=True)
+        worker = _WorkerProcess(self.memory_limit_mb, self.preload)
+        print(f"[GEOMETRY-POOL] 🚀 Yeni geometri worker'ı başlatıldı (pid {worker.pid})")
+        return worker
+
+    def _checkin(self, worker):
+        if self._closed or not worker.is_alive() or worker.jobs_done >= self.max_jobs_per_worker:
+            if worker.jobs_done >= self.max_jobs_per_worker:
+                self._count("recycled")
+                print(f"[GEOMETRY-POOL] ♻️ Worker {worker.pid} {worker.jobs_done} işten sonra yenileniyor")
+            worker.stop()
+            return
+        with self._lock:
+            self._idle.append(worker)
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+
+# ===== MODÜL SEVİYESİ HAVUZ =====
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_geometry_pool():
+    """Uygulama genelinde paylaşılan geometri havuzu (devre dışıysa None)"""
+    global _pool
+    if not Config.GEOMETRY_WORKERS_ENABLED:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = GeometryWorkerPool(
+                max_workers=Config.GEOMETRY_WORKERS,
+                timeout=Config.GEOMETRY_JOB_TIMEOUT,
+                memory_limit_mb=Config.GEOMETRY_WORKER_MEMORY_MB,
+                max_jobs_per_worker=Config.GEOMETRY_WORKER_MAX_JOBS,
+                preload=Config.GEOMETRY_PRELOAD_MODULES
+            )
+            atexit.register(_pool.shutdown)
+            registry.register_collector(_collect_pool_metrics)
+        return _pool
+
+
+def _collect_pool_metrics(metrics):
+    """/metrics için havuz sayaçları"""
+    if _pool is None:
+        return
+    with _pool._lock:
+        stats = dict(_pool.stats)
+        idle = len(_pool._idle)
+    for outcome, value in stats.items():
+        metrics.set("engteklif_geometry_jobs_total", value, "Geometri worker iş sonuçları", kind="counter", outcome=outcome)
+    metrics.set("engteklif_geometry_workers_idle", idle, "Boşta bekleyen geometri worker'ları")
+    metrics.set("engteklif_geometry_workers_max", _pool.max_workers, "Geometri worker üst sınırı")
+
+
+def run_geometry_job(fn, *args, timeout=None, on_progress=None, **kwargs):
+    """
+    Geometri işini havuzda çalıştır; havuz devre dışıysa aynı süreçte çalıştır
+
+    on_progress verilmezse çağıran thread'in progress sink'i kullanılır.
+    """
+    on_progress = on_progress or current_progress_sink()
+    pool = get_geometry_pool()
+    if pool is None:
+        with progress_sink(on_progress):
+            return fn(*args, **kwargs)
+    return pool.run(fn, *args, timeout=timeout, on_progress=on_progress, **kwargs)
+
+
+# ===== WORKER SÜRECİ =====
+
+def _apply_memory_limit(memory_limit_mb):
+    """Adres alanı sınırı (RLIMIT_AS) - desteklenmeyen platformlarda atlanır"""
+    if not memory_limit_mb or memory_limit_mb <= 0:
+        return
+    try:
+        import resource
+        limit = int(memory_limit_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"[GEOMETRY-WORKER] ⚠️ Bellek sınırı uygulanamadı: {e}", file=sys.stderr)
+
+
+def _worker_main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--read-fd", type=int, required=True)
+    parser.add_argument("--write-fd", type=int, required=True)
+    parser.add_argument("--memory-limit-mb", type=int, default=0)
+    parser.add_argument("--preload", action="append", default=[])
+    options = parser.parse_args()
+
+    jobs = Connection(options.read_fd, writable=False)
+    results = Connection(options.write_fd, readable=False)
+
+    _apply_memory_limit(options.memory_limit_mb)
+    for module in options.preload:
+        importlib.import_module(module)
+
+    while True:
+        try:
+            job = jobs.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        fn, args, kwargs = job
+        with collect_stages() as stages:
+            try:
+                with progress_sink(lambda event: results.send(("progress", event))):
+                    outcome = fn(*args, **kwargs)
+                message = ("ok", outcome)
+            except MemoryError:
+                message = ("error", ("Geometri işi bellek sınırını aştı", traceback.format_exc()))
+            except Exception as e:
+                message = ("error", (f"{type(e).__name__}: {e}", traceback.format_exc()))
+        results.send(message + (stages,))
+
+
+if __name__ == "__main__":
+    _worker_main()
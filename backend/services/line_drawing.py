@@ -0,0 +1,109 @@
+# services/line_drawing.py - Lightweight line drawings with dimension lines (PIL + NumPy)
+#
+# Wireframe ve teknik çizim görünümleri için ortak çizim katmanı: model kenarları
+# (EdgeProjection) NumPy ile anti-aliased çizilir, ölçü çizgileri / başlık / notlar
+# PIL ile eklenir. matplotlib figürü ve 300 dpi savefig gerekmez.
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from services.mesh_raster import fit_transform
+
+DIMENSION_COLOR = (200, 30, 30)
+TEXT_COLOR = (40, 40, 40)
+ARROW_LENGTH = 14
+ARROW_WIDTH = 5
+EXTENSION_GAP = 6           # kenar ile uzatma çizgisi arasındaki boşluk (piksel)
+EXTENSION_OVERSHOOT = 8     # uzatma çizgisinin ölçü çizgisini geçen kısmı (piksel)
+
+
+def load_font(size):
+    """Sistem fontu (yoksa PIL varsayılanı)"""
+    for name in ("arial.ttf", "DejaVuSans.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+class LineDrawing:
+    """Kenar projeksiyonu üzerine ölçülendirilmiş çizim"""
+
+    def __init__(self, edges, size, show_hidden=True, line_width=1.5):
+        self.size = size
+        self.bounds = edges.bounds()
+        self.to_pixels = fit_transform(self.bounds, size)
+        self.image = Image.fromarray(edges.rasterize(size, line_width=line_width, show_hidden=show_hidden,
+                                                     bounds=self.bounds))
+        self.draw = ImageDraw.Draw(self.image)
+        self.font = load_font(max(14, size[1] // 45))
+
+    def _corners(self):
+        """Çizim kutusunun piksel köşeleri: (sol, alt), (sağ, üst)"""
+        (left, bottom), (right, top) = self.to_pixels(np.array(self.bounds, dtype=np.float64))
+        return left, bottom, right, top
+
+    def dimension(self, axis, label, offset=48):
+        """
+        Ölçü çizgisi: axis 0 yatay (çizimin altında), axis 1 dikey (çizimin sağında)
+
+        Uzatma çizgileri, iki yönlü oklar ve ortalanmış etiket çizilir.
+        """
+        left, bottom, right, top = self._corners()
+        if axis == 0:
+            y = bottom + offset
+            for x in (left, right):
+                self.draw.line([(x, bottom + EXTENSION_GAP), (x, y + EXTENSION_OVERSHOOT)], fill=DIMENSION_COLOR, width=1)
+            self.draw.line([(left, y), (right, y)], fill=DIMENSION_COLOR, width=2)
+            self._arrow((left, y), (1, 0))
+            self._arrow((right, y), (-1, 0))
+            text_width, text_height = self._text_size(label)
+            self.draw.text(((left + right - text_width) / 2, y + 6), label, fill=DIMENSION_COLOR, font=self.font)
+        else:
+            x = right + offset
+            for y in (bottom, top):
+                self.draw.line([(right + EXTENSION_GAP, y), (x + EXTENSION_OVERSHOOT, y)], fill=DIMENSION_COLOR, width=1)
+            self.draw.line([(x, bottom), (x, top)], fill=DIMENSION_COLOR, width=2)
+            self._arrow((x, bottom), (0, -1))
+            self._arrow((x, top), (0, 1))
+            self._vertical_text(label, (x + 8, (bottom + top) / 2))
+
+    def title(self, text):
+        self.draw.text((20, 16), text, fill=TEXT_COLOR, font=self.font)
+
+    def notes(self, lines):
+        """Sol alt köşeye not satırları"""
+        line_height = self._text_size("Ag")[1] + 8
+        y = self.size[1] - 16 - line_height * len(lines)
+        for line in lines:
+            self.draw.text((20, y), line, fill=TEXT_COLOR, font=self.font)
+            y += line_height
+
+    def save(self, path):
+        self.image.save(path)
+
+    # ===== YARDIMCI =====
+
+    def _arrow(self, tip, direction):
+        """tip noktasında, direction yönünün tersinden gelen dolu ok ucu"""
+        dx, dy = direction
+        base_x, base_y = tip[0] + dx * ARROW_LENGTH, tip[1] + dy * ARROW_LENGTH
+        self.draw.polygon([
+            tip,
+            (base_x - dy * ARROW_WIDTH, base_y + dx * ARROW_WIDTH),
+            (base_x + dy * ARROW_WIDTH, base_y - dx * ARROW_WIDTH)
+        ], fill=DIMENSION_COLOR)
+
+    def _text_size(self, text):
+        left, top, right, bottom = self.draw.textbbox((0, 0), text, font=self.font)
+        return right - left, bottom - top
+
+    def _vertical_text(self, text, anchor):
+        """90° döndürülmüş etiket; anchor sol-orta noktası"""
+        text_width, text_height = self._text_size(text)
+        label = Image.new("RGBA", (text_width + 4, text_height + 8), (255, 255, 255, 0))
+        ImageDraw.Draw(label).text((2, 0), text, fill=DIMENSION_COLOR + (255,), font=self.font)
+        label = label.rotate(90, expand=True)
+        self.image.paste(label, (int(anchor[0]), int(anchor[1] - label.height / 2)), label)
@@ -2,15 +2,22 @@
 import re
 import os
 import time
-import pytesseract
-import cadquery as cq
-from pdf2image import convert_from_path
 import pikepdf
-from tempfile import NamedTemporaryFile
 from docx import Document
 import subprocess
 from utils.database import db
-from services.step_renderer import StepRendererEnhanced
+from services.analysis_cache import AnalysisCacheService
+from services.render_store import RenderStore
+from services.page_raster import PageRasterCache
+from services.page_ocr import OCRService
+from services.page_orientation import OrientationService
+from services.pdf_text_layer import PDFTextLayer
+from services.title_block import TitleBlockService
+from services.geometry_worker import run_geometry_job
+from services.geometry_jobs import process_step_job
+from services.stock_fitter import StockFitter
+from services.analysis_events import report_progress
+from config import Config
 
 print("[INFO] ✅ Material Analysis Service - Enhanced with PDF STEP Rendering")
 
@@ -18,11 +25,14 @@ class MaterialAnalysisService:
     def __init__(self):
         self.database = db.get_db()
         self._ensure_materials_exist()
-        # Initialize STEP renderer
-        self.step_renderer = StepRendererEnhanced()
     
-    def analyze_document_comprehensive(self, file_path, file_type, user_id):
-        """Ana analiz fonksiyonu - TÜM MALZEME HESAPLAMALARI İLE + ENHANCED PDF STEP RENDERING"""
+    def analyze_document_comprehensive(self, file_path, file_type, user_id, analysis_id=None, stock_method=None):
+        """Ana analiz fonksiyonu - TÜM MALZEME HESAPLAMALARI İLE + ENHANCED PDF STEP RENDERING
+
+        analysis_id verilirse aynı STEP geometrisinin önceki sonuçları önbellekten kopyalanır.
+        stock_method malzeme maliyetindeki stok hacmini seçer: "aabb", "obb", "cylinder" veya "min"
+        (varsayılan Config.STOCK_FIT_METHOD).
+        """
         result = {
             "material_matches": [],
             "step_analysis": {},
@@ -41,20 +51,31 @@ class MaterialAnalysisService:
             print(f"[DEBUG] Analiz başlatılıyor: {file_path} ({file_type})")
             
             if file_type == 'pdf':
-                result = self._analyze_pdf_with_step_rendering(file_path, result)
+                result = self._analyze_pdf_with_step_rendering(file_path, result, analysis_id)
             elif file_type in ['step', 'stp']:
-                result["step_analysis"] = self.analyze_step_file(file_path)
-                result["processing_log"].append("🔧 STEP analizi tamamlandı")
+                result["step_file_hash"] = AnalysisCacheService.compute_file_hash(file_path)
+                # ✅ Render'lar geometri hash'ine göre paylaşılan dizine yazılır
+                session_id = RenderStore.session_id(result["step_file_hash"]) or f"step_{int(time.time())}"
+                RenderStore.reserve(analysis_id, session_id)
                 
-                # ✅ STEP dosyası için rendering
-                render_result = self._render_step_file(file_path, f"step_{int(time.time())}")
-                if render_result["success"]:
-                    result["enhanced_renders"] = render_result["renders"]
-                    result["isometric_view"] = render_result.get("main_render")
-                    result["isometric_view_clean"] = render_result.get("excel_render")
-                    result["processing_log"].append(f"🎨 {len(render_result['renders'])} render oluşturuldu")
+                # ✅ Aynı geometri daha önce analiz edildiyse önbellekten kopyala
+                cached = AnalysisCacheService.load_cached_geometry(result["step_file_hash"], session_id, analysis_id)
+                if cached:
+                    result.update(cached)
+                    result["processing_log"].append(f"♻️ STEP geometrisi önbellekten alındı ({cached['geometry_cache_source']})")
+                    report_progress("geometry_cache", source=cached['geometry_cache_source'], step_analysis=cached.get("step_analysis"))
                 else:
-                    result["processing_log"].append(f"⚠️ Render hatası: {render_result.get('message')}")
+                    # ✅ Analiz, render ve STL geometri worker'ında tek STEP import'u ile üretilir
+                    render_result = self._run_step_geometry(file_path, session_id, analysis_id, result)
+                    if render_result is not None:
+                        if render_result["success"]:
+                            result["enhanced_renders"] = render_result["renders"]
+                            result["isometric_view"] = render_result.get("main_render")
+                            result["isometric_view_clean"] = render_result.get("excel_render")
+                            result["render_session_id"] = render_result.get("session_id")
+                            result["processing_log"].append(f"🎨 {len(render_result['renders'])} render oluşturuldu")
+                        else:
+                            result["processing_log"].append(f"⚠️ Render hatası: {render_result.get('message')}")
                 
                 if not result.get("material_matches"):
                     result["material_matches"] = ["6061-T6 (%default)"]
@@ -63,11 +84,15 @@ class MaterialAnalysisService:
                 result = self._analyze_document(file_path, result)
             
             # ✅ MALZEME HESAPLAMA - STEP analizi varsa
+            stage_start = time.time()
             step_analysis = result.get("step_analysis", {})
-            prizma_hacim = step_analysis.get("Prizma Hacmi (mm³)")
+            prizma_hacim, stock_method = StockFitter.select_stock_volume(
+                step_analysis, stock_method or Config.STOCK_FIT_METHOD
+            )
+            result["stock_method"] = stock_method
             
             if prizma_hacim and prizma_hacim > 0:
-                print(f"[DEBUG] Prizma hacim bulundu: {prizma_hacim} mm³")
+                print(f"[DEBUG] Prizma hacim bulundu ({stock_method}): {prizma_hacim} mm³")
                 
                 # Bulunan malzemeler için detaylı hesaplama
                 if result.get("material_matches"):
@@ -80,15 +105,24 @@ class MaterialAnalysisService:
                 result["material_options"] = self._calculate_all_materials(prizma_hacim)
                 result["processing_log"].append(f"📊 {len(result['material_options'])} malzeme seçeneği hesaplandı")
                 
+                report_progress(
+                    "material_calculation", duration=time.time() - stage_start,
+                    stock_method=stock_method, stock_volume=prizma_hacim,
+                    all_material_calculations=result.get("all_material_calculations", []),
+                    material_options=result["material_options"]
+                )
             else:
                 result["processing_log"].append("⚠️ Hacim bilgisi yok, malzeme hesaplaması yapılamadı")
+                report_progress("material_calculation", status="skipped")
             
             # Maliyet hesaplama
+            stage_start = time.time()
             if result.get("step_analysis") and not result["step_analysis"].get("error"):
                 cost_service = CostEstimationService()
                 result["cost_estimation"] = cost_service.calculate_cost(
                     result["step_analysis"], 
-                    result.get("material_matches", ["6061-T6 (%default)"])
+                    result.get("material_matches", ["6061-T6 (%default)"]),
+                    stock_method=stock_method
                 )
                 result["processing_log"].append("💰 Maliyet hesaplandı")
             
@@ -99,6 +133,11 @@ class MaterialAnalysisService:
                     result.get("all_material_calculations", [])
                 )
                 result["processing_log"].append("🤖 AI fiyat tahmini")
+                report_progress(
+                    "cost_estimation", duration=time.time() - stage_start,
+                    cost_estimation=result.get("cost_estimation"),
+                    ai_price_prediction=result.get("ai_price_prediction")
+                )
             
             print(f"[SUCCESS] Analiz tamamlandı - {len(result.get('material_options', []))} malzeme seçeneği")
             return result
@@ -112,12 +151,14 @@ class MaterialAnalysisService:
             result["processing_log"].append(f"❌ HATA: {error_msg}")
             return result
     
-    def _analyze_pdf_with_step_rendering(self, file_path, result):
+    def _analyze_pdf_with_step_rendering(self, file_path, result, analysis_id=None):
         """✅ PDF analizi - ENHANCED WITH STEP RENDERING"""
         result["processing_log"].append("📄 PDF analizi başlatıldı")
         
         # ✅ STEP çıkarma - Enhanced
+        stage_start = time.time()
         step_paths = self._extract_step_from_pdf(file_path)
+        report_progress("step_extraction", duration=time.time() - stage_start, step_count=len(step_paths or []))
         extracted_step_path = None
         permanent_step_path = None  # ✅ Kalıcı STEP dosya yolu
         
@@ -127,17 +168,17 @@ class MaterialAnalysisService:
             result["processing_log"].append(f"📎 STEP çıkarıldı: {step_filename}")
             
             # ✅ STEP dosyasını kalıcı olarak sakla
-            # Analysis ID'yi file path'den türet
+            # PDF oturum ID'sini file path'den türet
             import hashlib
             file_hash = hashlib.md5(file_path.encode()).hexdigest()[:8]
-            analysis_id = f"pdf_{int(time.time())}_{file_hash}"
+            pdf_analysis_id = f"pdf_{int(time.time())}_{file_hash}"
             
             # Kalıcı dizin oluştur
-            permanent_dir = os.path.join("static", "stepviews", analysis_id)
+            permanent_dir = os.path.join("static", "stepviews", pdf_analysis_id)
             os.makedirs(permanent_dir, exist_ok=True)
             
             # STEP dosyasını kopyala
-            permanent_step_filename = f"extracted_{analysis_id}.step"
+            permanent_step_filename = f"extracted_{pdf_analysis_id}.step"
             permanent_step_path = os.path.join(permanent_dir, permanent_step_filename)
             
             import shutil
@@ -146,56 +187,37 @@ class MaterialAnalysisService:
             
             # Result'a kalıcı STEP path'i ekle
             result["extracted_step_path"] = permanent_step_path
-            result["pdf_analysis_id"] = analysis_id
-            
-            # ✅ STEP ANALİZİ
-            result["step_analysis"] = self.analyze_step_file(permanent_step_path)  # ✅ Kalıcı dosyayı kullan
-            result["processing_log"].append("🔧 STEP analizi tamamlandı")
-            
-            # ✅ STEP RENDERING - PDF'den çıkarılan dosya için
-            if not result["step_analysis"].get("error"):
-                print(f"[PDF-RENDER] 🎨 PDF'den çıkarılan STEP rendering başlıyor: {step_filename}")
-                
-                render_result = self._render_step_file(permanent_step_path, analysis_id)  # ✅ Kalıcı dosyayı kullan
+            result["pdf_analysis_id"] = pdf_analysis_id
+            result["step_file_hash"] = AnalysisCacheService.compute_file_hash(permanent_step_path)
+            
+            # ✅ Aynı geometri daha önce analiz edildiyse önbellekten kopyala
+            render_session_id = RenderStore.session_id(result["step_file_hash"]) or pdf_analysis_id
+            RenderStore.reserve(analysis_id, render_session_id)
+            cached = AnalysisCacheService.load_cached_geometry(result["step_file_hash"], render_session_id, analysis_id)
+            if cached:
+                result.update(cached)
+                result["processing_log"].append(f"♻️ PDF STEP geometrisi önbellekten alındı ({cached['geometry_cache_source']})")
+                report_progress("geometry_cache", source=cached['geometry_cache_source'], step_analysis=cached.get("step_analysis"))
+                print(f"[PDF-RENDER] ♻️ Render'lar önbellekten kopyalandı: {step_filename}")
+            else:
+                # ✅ STEP ANALİZİ + RENDERING + STL - kalıcı dosya worker'da bir kez import edilir
+                print(f"[PDF-RENDER] 🎨 PDF'den çıkarılan STEP analizi ve rendering başlıyor: {step_filename}")
+                render_result = self._run_step_geometry(
+                    permanent_step_path, render_session_id, analysis_id or pdf_analysis_id, result
+                )
                 
-                if render_result["success"]:
+                if render_result is None:
+                    result["processing_log"].append("⚠️ STEP analizi başarısız, render yapılamadı")
+                elif render_result["success"]:
                     result["enhanced_renders"] = render_result["renders"]
                     result["isometric_view"] = render_result.get("main_render")
                     result["isometric_view_clean"] = render_result.get("excel_render")
-                    result["step_file_hash"] = self._calculate_file_hash(permanent_step_path)
+                    result["render_session_id"] = render_result.get("session_id")
                     result["processing_log"].append(f"🎨 PDF STEP render tamamlandı - {len(render_result['renders'])} görünüm")
                     print(f"[PDF-RENDER] ✅ Rendering başarılı - {len(render_result['renders'])} görünüm oluşturuldu")
-                    
-                    # ✅ STL OLUŞTUR
-                    try:
-                        import cadquery as cq
-                        from cadquery import exporters
-                        
-                        stl_filename = f"model_{analysis_id}.stl"
-                        stl_path = os.path.join(permanent_dir, stl_filename)
-                        
-                        # STEP'ten STL oluştur
-                        assembly = cq.importers.importStep(permanent_step_path)
-                        shape = assembly.val()
-                        exporters.export(shape, stl_path)
-                        
-                        if os.path.exists(stl_path):
-                            stl_relative = f"/static/stepviews/{analysis_id}/{stl_filename}"
-                            result["stl_generated"] = True
-                            result["stl_path"] = stl_relative
-                            result["stl_file_size"] = os.path.getsize(stl_path)
-                            result["processing_log"].append(f"🎯 STL oluşturuldu: {stl_filename}")
-                            print(f"[PDF-STL] ✅ STL oluşturuldu: {stl_path}")
-                            
-                    except Exception as stl_error:
-                        print(f"[PDF-STL] ⚠️ STL oluşturma hatası: {stl_error}")
-                        result["processing_log"].append(f"⚠️ STL oluşturulamadı: {str(stl_error)}")
-                        
                 else:
                     result["processing_log"].append(f"⚠️ PDF STEP render hatası: {render_result.get('message')}")
                     print(f"[PDF-RENDER] ❌ Rendering başarısız: {render_result.get('message')}")
-            else:
-                result["processing_log"].append("⚠️ STEP analizi başarısız, render yapılamadı")
                 
         else:
             result["processing_log"].append("⚠️ PDF'de STEP bulunamadı, varsayılan boyutlar kullanılacak")
@@ -217,25 +239,43 @@ class MaterialAnalysisService:
                 "method": "estimated_from_pdf"
             }
         
-        # Malzeme arama (4 kez döndürme ile)
-        working_file = file_path
-        for attempt in range(4):
-            text = self._extract_text_from_pdf(working_file)
-            materials = self._find_materials_in_text(text)
-            
+        # Malzeme arama - önce gömülü metin katmanı (vektörel CAD çıktıları OCR gerektirmez)
+        stage_start = time.time()
+        native_text, ocr_pages = PDFTextLayer.split(file_path)
+        if native_text:
+            materials = self._find_materials_in_text(native_text)
             if materials:
                 result["material_matches"] = materials
-                result["processing_log"].append(f"🔍 {len(materials)} malzeme bulundu")
-                break
-            
-            if attempt < 3:
-                working_file = self._rotate_pdf(working_file)
-                result["processing_log"].append(f"🔄 PDF döndürüldü ({attempt + 1})")
+                result["processing_log"].append(f"📝 {len(materials)} malzeme PDF metin katmanında bulundu")
+        
+        # Metni olmayan sayfalar: yön önce tespit edilir, OCR yalnızca aday yönlerde yapılır
+        if not result.get("material_matches") and ocr_pages != []:
+            orientation = OrientationService.detect(file_path, page=ocr_pages[0] if ocr_pages else 1)
+            result["processing_log"].append(f"🧭 Sayfa yönü: {orientation['rotation']}° ({orientation['method']})")
+            for rotation in orientation["candidates"]:
+                # Önce yalnızca antet bölgesi; malzeme bulunamazsa tam sayfa
+                title_text = TitleBlockService.text(file_path, ocr_pages, rotation=rotation)
+                materials = self._find_materials_in_text(title_text) if title_text else []
+                if not materials:
+                    text = self._extract_text_from_pdf(file_path, rotation=rotation, page_numbers=ocr_pages)
+                    materials = self._find_materials_in_text(text)
+                
+                if materials:
+                    result["material_matches"] = materials
+                    result["processing_log"].append(f"🔍 {len(materials)} malzeme bulundu")
+                    break
+                
+                result["processing_log"].append(f"🔄 {rotation}° yönünde malzeme bulunamadı")
+                # Sayfa bu yönde okunabiliyorsa malzeme bilgisi yoktur - ters yön denenmez
+                if self._is_readable(file_path, rotation=rotation, page_numbers=ocr_pages):
+                    result["processing_log"].append(f"📖 Sayfa {rotation}° yönünde okunabilir, diğer yön atlandı")
+                    break
         
         # Malzeme bulunamazsa varsayılan
         if not result.get("material_matches"):
             result["material_matches"] = ["6061-T6 (%estimated)"]
             result["processing_log"].append("⚠️ Malzeme tespit edilemedi, varsayılan kullanıldı")
+        report_progress("material_search", duration=time.time() - stage_start, material_matches=result["material_matches"])
         
         # ✅ GEÇİCİ STEP dosyasını temizle AMA KALICI OLANINI SAKLA
         if extracted_step_path and extracted_step_path != permanent_step_path and os.path.exists(extracted_step_path):
@@ -247,73 +287,77 @@ class MaterialAnalysisService:
         
         return result
     
-    def _render_step_file(self, step_path, analysis_id):
-        """✅ STEP dosyası rendering wrapper"""
+    def _run_step_geometry(self, step_path, session_id, stl_analysis_id, result):
+        """
+        STEP analizi, render ve STL'i geometri worker havuzunda çalıştır
+
+        Returns:
+            Render özeti (_summarize_render_result) veya analiz başarısızsa None
+        """
         try:
-            print(f"[STEP-RENDER] 🎨 Rendering başlıyor: {os.path.basename(step_path)}")
-            
-            # StepRendererEnhanced kullan
-            render_result = self.step_renderer.generate_comprehensive_views(
-                step_path=step_path,
-                analysis_id=analysis_id,
-                include_dimensions=True,
-                include_materials=True,
-                high_quality=True
-            )
-            
-            if render_result["success"]:
-                # Ana render dosyasını belirle (isometric öncelikli)
-                main_render = None
-                excel_render = None
-                
-                if "isometric" in render_result["renders"]:
-                    isometric_data = render_result["renders"]["isometric"]
-                    if isometric_data.get("success"):
-                        main_render = isometric_data.get("file_path")
-                        excel_render = isometric_data.get("excel_path")
-                
-                # Ana render bulunamazsa ilk başarılı render'ı kullan
-                if not main_render:
-                    for view_name, view_data in render_result["renders"].items():
-                        if view_data.get("success") and view_data.get("file_path"):
-                            main_render = view_data["file_path"]
-                            break
-                
-                return {
-                    "success": True,
-                    "renders": render_result["renders"],
-                    "main_render": main_render,
-                    "excel_render": excel_render,
-                    "session_id": render_result.get("session_id"),
-                    "total_views": len(render_result["renders"])
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": render_result.get("message", "Rendering başarısız"),
-                    "renders": {}
-                }
-                
+            job = run_geometry_job(process_step_job, step_path, session_id, stl_analysis_id)
         except Exception as e:
-            import traceback
-            print(f"[STEP-RENDER] ❌ Rendering hatası: {str(e)}")
-            print(f"[STEP-RENDER] 📋 Traceback: {traceback.format_exc()}")
+            print(f"[ERROR] Geometri işi başarısız: {str(e)}")
+            result["step_analysis"] = {"error": f"STEP analiz hatası: {str(e)}"}
+            result["processing_log"].append(f"❌ Geometri işi başarısız: {str(e)}")
+            return None
+        
+        result["step_analysis"] = job["step_analysis"]
+        if result["step_analysis"].get("error"):
+            result["processing_log"].append(f"❌ {result['step_analysis']['error']}")
+            return None
+        result["processing_log"].append("🔧 STEP analizi tamamlandı")
+        
+        if job.get("stl_result"):
+            self._apply_stl_result(job["stl_result"], result)
+        
+        return self._summarize_render_result(job.get("render_result"))
+    
+    def _apply_stl_result(self, stl_result, result):
+        """Worker'da oluşturulan 3D viewer STL'ini sonuca ekle"""
+        if stl_result["success"]:
+            result["stl_generated"] = True
+            result["stl_path"] = stl_result["stl_path"]
+            result["stl_url"] = stl_result["stl_url"]
+            result["stl_file_size"] = stl_result["file_size"]
+            result["processing_log"].append(f"🎯 STL oluşturuldu: {os.path.basename(stl_result['stl_path'])}")
+        else:
+            result["processing_log"].append(f"⚠️ STL oluşturulamadı: {stl_result.get('error')}")
+    
+    def _summarize_render_result(self, render_result):
+        """✅ Render sonucundan ana (isometric) ve Excel render'larını belirle"""
+        if not render_result or not render_result.get("success"):
             return {
                 "success": False,
-                "message": f"Rendering hatası: {str(e)}",
-                "error": str(e)
+                "message": (render_result or {}).get("message", "Rendering başarısız"),
+                "renders": {}
             }
-    
-    def _calculate_file_hash(self, file_path):
-        """Dosya hash'i hesapla"""
-        try:
-            import hashlib
-            with open(file_path, 'rb') as f:
-                file_hash = hashlib.md5(f.read()).hexdigest()
-            return file_hash
-        except Exception as e:
-            print(f"[HASH] ⚠️ Hash hesaplama hatası: {e}")
-            return None
+        
+        # Ana render dosyasını belirle (isometric öncelikli)
+        main_render = None
+        excel_render = None
+        
+        if "isometric" in render_result["renders"]:
+            isometric_data = render_result["renders"]["isometric"]
+            if isometric_data.get("success"):
+                main_render = isometric_data.get("file_path")
+                excel_render = isometric_data.get("excel_path")
+        
+        # Ana render bulunamazsa ilk başarılı render'ı kullan
+        if not main_render:
+            for view_name, view_data in render_result["renders"].items():
+                if view_data.get("success") and view_data.get("file_path"):
+                    main_render = view_data["file_path"]
+                    break
+        
+        return {
+            "success": True,
+            "renders": render_result["renders"],
+            "main_render": main_render,
+            "excel_render": excel_render,
+            "session_id": render_result.get("session_id"),
+            "total_views": len(render_result["renders"])
+        }
     
     def _analyze_document(self, file_path, result):
         """DOC/DOCX analizi"""
@@ -357,107 +401,13 @@ class MaterialAnalysisService:
             
         return result
     
-    def analyze_step_file(self, step_path):
-        """STEP dosyası analizi - app.py referansıyla"""
-        try:
-            print(f"[DEBUG] STEP analizi başlıyor: {step_path}")
-            
-            assembly = cq.importers.importStep(step_path)
-            if not assembly.objects:
-                return {"error": "STEP dosyasında obje yok"}
-            
-            # Ana şekil ve bounding box
-            shapes = assembly.objects
-            sorted_shapes = sorted(shapes, key=lambda s: s.Volume(), reverse=True)
-            main_shape = sorted_shapes[0]
-            main_bbox = main_shape.BoundingBox()
-            
-            # İlgili şekilleri bul
-            relevant_shapes = [main_shape]
-            for shape in sorted_shapes[1:]:
-                bb = shape.BoundingBox()
-                intersects = (
-                    bb.xmax > main_bbox.xmin and bb.xmin < main_bbox.xmax and
-                    bb.ymax > main_bbox.ymin and bb.ymin < main_bbox.ymax and
-                    bb.zmax > main_bbox.zmin and bb.zmin < main_bbox.zmax
-                )
-                if intersects:
-                    relevant_shapes.append(shape)
-            
-            # Compound oluştur
-            part = cq.Compound.makeCompound(relevant_shapes)
-            
-            # Optimal yönlendirme bulma
-            min_volume = None
-            best_dims = (0, 0, 0)
-            
-            print(f"[DEBUG] Optimal yönlendirme hesaplanıyor...")
-            
-            for rx in [0, 90, 180, 270]:
-                for ry in [0, 90, 180, 270]:
-                    for rz in [0, 90, 180, 270]:
-                        try:
-                            rotated = part.rotate((0, 0, 0), (1, 0, 0), rx)\
-                                         .rotate((0, 0, 0), (0, 1, 0), ry)\
-                                         .rotate((0, 0, 0), (0, 0, 1), rz)
-                            bbox = rotated.BoundingBox()
-                            volume = bbox.xlen * bbox.ylen * bbox.zlen
-                            
-                            if (min_volume is None) or (volume < min_volume):
-                                min_volume = volume
-                                best_dims = (bbox.xlen, bbox.ylen, bbox.zlen)
-                        except Exception as rot_error:
-                            continue
-            
-            # Boyutları al
-            x, y, z = best_dims
-            
-            # Padding ekleme
-            def always_round_up(value):
-                return int(value) if abs(value - int(value)) < 0.01 else int(value) + 1
-            
-            x_pad = always_round_up(x + 10.0)
-            y_pad = always_round_up(y + 10.0)
-            z_pad = always_round_up(z + 10.0)
-            
-            # Hacim hesaplamaları
-            volume_padded = x_pad * y_pad * z_pad
-            product_volume = part.Volume()
-            waste_volume = volume_padded - product_volume
-            waste_ratio = (waste_volume / volume_padded * 100) if volume_padded > 0 else 0.0
-            total_surface_area = part.Area()
-            
-            # Silindirik boyutlar
-            cylindrical_diameter = max(x, y)
-            cylindrical_height = z
-            
-            print(f"[SUCCESS] STEP analizi tamamlandı - X:{x:.1f}, Y:{y:.1f}, Z:{z:.1f}")
-            
-            return {
-                "X (mm)": round(x, 3),
-                "Y (mm)": round(y, 3),
-                "Z (mm)": round(z, 3),
-                "Silindirik Çap (mm)": round(cylindrical_diameter, 3),
-                "Silindirik Yükseklik (mm)": round(cylindrical_height, 3),
-                "X+Pad (mm)": round(x_pad, 3),
-                "Y+Pad (mm)": round(y_pad, 3),
-                "Z+Pad (mm)": round(z_pad, 3),
-                "Prizma Hacmi (mm³)": round(volume_padded, 3),
-                "Ürün Hacmi (mm³)": round(product_volume, 3),
-                "Talaş Hacmi (mm³)": round(waste_volume, 3),
-                "Talaş Oranı (%)": round(waste_ratio, 2),
-                "Toplam Yüzey Alanı (mm²)": round(total_surface_area, 3),
-                "shape_count": len(shapes),
-                "relevant_shape_count": len(relevant_shapes),
-                "optimization_iterations": 64,
-                "method": "cadquery_analysis"
-            }
-            
-        except Exception as e:
-            import traceback
-            print(f"[ERROR] STEP analizi hatası: {str(e)}")
-            print(f"[TRACEBACK] {traceback.format_exc()}")
-            return {"error": f"STEP analiz hatası: {str(e)}"}
+    def analyze_step_file(self, step_path, context=None):
+        """STEP dosyası analizi - app.py referansıyla
+
+        context verilirse önceden import edilmiş şekil kullanılır.
+        """
+        from services.step_analysis import StepGeometryAnalyzer
+        return StepGeometryAnalyzer.analyze(step_path, context=context)
     
     def _calculate_found_materials(self, prizma_hacim_mm3, found_materials):
         """✅ BULUNAN MALZEMELER İÇİN DETAYLI HESAPLAMA - MongoDB'den veri alarak"""
@@ -780,18 +730,25 @@ class MaterialAnalysisService:
         
         return list(set(materials))[:5]
     
-    def _extract_text_from_pdf(self, pdf_path):
-        """PDF'den metin çıkarma"""
+    def _extract_text_from_pdf(self, pdf_path, rotation=0, page_numbers=None):
+        """PDF'den OCR ile metin çıkarma (ilk 2 sayfa veya page_numbers, paylaşılan raster önbelleğinden)"""
         try:
-            pages = convert_from_path(pdf_path, dpi=300)
-            text = ""
-            for page in pages[:2]:  # İlk 2 sayfa
-                text += pytesseract.image_to_string(page, lang='tur+eng')
+            pages = PageRasterCache.pages(pdf_path, dpi=300, last_page=2, rotation=rotation, page_numbers=page_numbers)
+            text = OCRService.text(pages)
             return text
         except Exception as e:
             print(f"[ERROR] PDF metin çıkarma: {e}")
             return ""
     
+    def _is_readable(self, pdf_path, rotation=0, page_numbers=None):
+        """Tam sayfa OCR sonucu bu yönde okunabilir mi (OCR önbelleğinden)"""
+        try:
+            pages = PageRasterCache.pages(pdf_path, dpi=300, last_page=2, rotation=rotation, page_numbers=page_numbers)
+            return OCRService.readable(pages)
+        except Exception as e:
+            print(f"[ERROR] OCR okunabilirlik kontrolü: {e}")
+            return False
+    
     def _extract_text_from_docx(self, file_path):
         """DOCX'den metin çıkarma"""
         try:
@@ -886,21 +843,6 @@ class MaterialAnalysisService:
         print(f"[PDF-STEP] 📊 Toplam {len(extracted)} STEP dosyası çıkarıldı")
         return extracted
     
-    def _rotate_pdf(self, input_path):
-        """PDF döndürme"""
-        try:
-            temp_file = NamedTemporaryFile(delete=False, suffix=".pdf")
-            temp_file.close()
-            
-            with pikepdf.open(input_path) as pdf:
-                for page in pdf.pages:
-                    page.Rotate = (page.Rotate + 90) % 360
-                pdf.save(temp_file.name)
-            
-            return temp_file.name
-        except:
-            return input_path
-    
     def _calculate_ai_price(self, step_analysis, material_calculations=None):
         """AI fiyat tahmini"""
         try:
@@ -943,8 +885,8 @@ class CostEstimationService:
     def __init__(self):
         self.database = db.get_db()
     
-    def calculate_cost(self, step_analysis, material_matches):
-        """Maliyet hesaplama"""
+    def calculate_cost(self, step_analysis, material_matches, stock_method="aabb"):
+        """Maliyet hesaplama - stock_method ile alternatif stok hacmi seçilebilir"""
         try:
             if not step_analysis or step_analysis.get("error"):
                 return {"error": "STEP analizi gerekli"}
@@ -956,7 +898,8 @@ class CostEstimationService:
             material_name = material_matches[0].split("(")[0].strip()
             
             # Hacimler
-            volume = step_analysis.get("Prizma Hacmi (mm³)", 100000)
+            volume, stock_method = StockFitter.select_stock_volume(step_analysis, stock_method)
+            volume = volume or 100000
             waste = step_analysis.get("Talaş Hacmi (mm³)", 25000)
             surface = step_analysis.get("Toplam Yüzey Alanı (mm²)", 10000)
             
@@ -989,6 +932,7 @@ class CostEstimationService:
                     "y_mm": y,
                     "z_mm": z,
                     "volume_mm3": volume,
+                    "stock_method": stock_method,
                     "waste_mm3": waste,
                     "surface_mm2": surface
                 },
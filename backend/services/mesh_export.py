@@ -0,0 +1,170 @@
+# services/mesh_export.py - Mesh file writers from shared tessellation buffers
+#
+# Şekil bir kez üçgenlenir (StepShapeContext.tessellate); STL, OBJ, PLY ve GLB
+# aynı NumPy vertex / üçgen dizilerinden yazılır. trimesh veya CadQuery exporter
+# gerekmez ve B-rep tekrar üçgenlenmez.
+import json
+import struct
+import numpy as np
+
+GLB_MAGIC = 0x46546C67        # "glTF"
+GLB_CHUNK_JSON = 0x4E4F534A
+GLB_CHUNK_BIN = 0x004E4942
+GL_FLOAT = 5126
+GL_UNSIGNED_INT = 5125
+GL_ARRAY_BUFFER = 34962
+GL_ELEMENT_ARRAY_BUFFER = 34963
+
+
+class MeshBuffers:
+    """Üçgen mesh: float32 vertex (N, 3) + uint32 üçgen (M, 3) dizileri"""
+
+    def __init__(self, vertices, faces):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, 3)
+        self.faces = np.ascontiguousarray(faces, dtype=np.uint32).reshape(-1, 3)
+        self._face_normals = None
+        self._vertex_normals = None
+
+    @classmethod
+    def from_context(cls, context, lod="viewer_high"):
+        """Context'in tüm modelini (LOD başına bir kez) üçgenle"""
+        vertices, faces = context.tessellate(lod=lod, target="render")
+        return cls(vertices, faces)
+
+    @property
+    def vertex_count(self):
+        return len(self.vertices)
+
+    @property
+    def face_count(self):
+        return len(self.faces)
+
+    @property
+    def face_normals(self):
+        """Birim üçgen normalleri (M, 3)"""
+        if self._face_normals is None:
+            triangles = self.vertices[self.faces]
+            normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+            lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+            self._face_normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+        return self._face_normals
+
+    @property
+    def vertex_normals(self):
+        """
+        Alan ağırlıklı vertex normalleri (N, 3)
+
+        OCCT üçgenlemesi vertex'leri yüzey bazında tuttuğu için yüzey içinde yumuşak,
+        yüzeyler arasında keskin geçişli normaller elde edilir.
+        """
+        if self._vertex_normals is None:
+            triangles = self.vertices[self.faces]
+            weighted = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+            normals = np.zeros_like(self.vertices)
+            for corner in range(3):
+                np.add.at(normals, self.faces[:, corner], weighted)
+            lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+            self._vertex_normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+        return self._vertex_normals
+
+    # ===== DOSYA FORMATLARI =====
+
+    def write_stl(self, path):
+        """Binary STL"""
+        record = np.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")])
+        data = np.zeros(self.face_count, dtype=record)
+        data["normal"] = self.face_normals
+        data["vertices"] = self.vertices[self.faces]
+        with open(path, "wb") as f:
+            f.write(b"EngTeklif binary STL".ljust(80, b" "))
+            f.write(struct.pack("<I", self.face_count))
+            data.tofile(f)
+
+    def write_obj(self, path):
+        """Wavefront OBJ (vertex + normal + yüz)"""
+        indices = self.faces.astype(np.int64) + 1
+        with open(path, "w") as f:
+            f.write("# EngTeklif OBJ export\n")
+            np.savetxt(f, self.vertices, fmt="v %.6f %.6f %.6f")
+            np.savetxt(f, self.vertex_normals, fmt="vn %.5f %.5f %.5f")
+            np.savetxt(f, np.repeat(indices, 2, axis=1), fmt="f %d//%d %d//%d %d//%d")
+
+    def write_ply(self, path):
+        """Binary little-endian PLY (vertex + normal + yüz)"""
+        vertex_record = np.dtype([("position", "<f4", (3,)), ("normal", "<f4", (3,))])
+        vertices = np.empty(self.vertex_count, dtype=vertex_record)
+        vertices["position"] = self.vertices
+        vertices["normal"] = self.vertex_normals
+
+        face_record = np.dtype([("count", "u1"), ("indices", "<i4", (3,))])
+        faces = np.empty(self.face_count, dtype=face_record)
+        faces["count"] = 3
+        faces["indices"] = self.faces
+
+        header = "\n".join([
+            "ply",
+            "format binary_little_endian 1.0",
+            "comment EngTeklif PLY export",
+            f"element vertex {self.vertex_count}",
+            "property float x", "property float y", "property float z",
+            "property float nx", "property float ny", "property float nz",
+            f"element face {self.face_count}",
+            "property list uchar int vertex_indices",
+            "end_header"
+        ]) + "\n"
+        with open(path, "wb") as f:
+            f.write(header.encode("ascii"))
+            vertices.tofile(f)
+            faces.tofile(f)
+
+    def write_glb(self, path):
+        """glTF 2.0 binary (tarayıcı görüntüleyici için) - POSITION, NORMAL, uint32 indeks"""
+        positions = self.vertices.tobytes()
+        normals = self.vertex_normals.astype(np.float32).tobytes()
+        indices = self.faces.tobytes()
+        binary = positions + normals + indices
+
+        low = self.vertices.min(axis=0) if self.vertex_count else np.zeros(3)
+        high = self.vertices.max(axis=0) if self.vertex_count else np.zeros(3)
+        gltf = {
+            "asset": {"version": "2.0", "generator": "EngTeklif"},
+            "scene": 0,
+            "scenes": [{"nodes": [0]}],
+            "nodes": [{"mesh": 0}],
+            "meshes": [{"primitives": [{"attributes": {"POSITION": 0, "NORMAL": 1}, "indices": 2, "mode": 4}]}],
+            "buffers": [{"byteLength": len(binary)}],
+            "bufferViews": [
+                {"buffer": 0, "byteOffset": 0, "byteLength": len(positions), "target": GL_ARRAY_BUFFER},
+                {"buffer": 0, "byteOffset": len(positions), "byteLength": len(normals), "target": GL_ARRAY_BUFFER},
+                {"buffer": 0, "byteOffset": len(positions) + len(normals), "byteLength": len(indices),
+                 "target": GL_ELEMENT_ARRAY_BUFFER}
+            ],
+            "accessors": [
+                {"bufferView": 0, "componentType": GL_FLOAT, "count": self.vertex_count, "type": "VEC3",
+                 "min": [float(v) for v in low], "max": [float(v) for v in high]},
+                {"bufferView": 1, "componentType": GL_FLOAT, "count": self.vertex_count, "type": "VEC3"},
+                {"bufferView": 2, "componentType": GL_UNSIGNED_INT, "count": self.face_count * 3, "type": "SCALAR"}
+            ]
+        }
+        write_glb(path, gltf, binary)
+
+    def write(self, path, file_format):
+        """Formata göre yaz: stl, obj, ply, glb"""
+        writers = {"stl": self.write_stl, "obj": self.write_obj, "ply": self.write_ply, "glb": self.write_glb}
+        if file_format not in writers:
+            raise ValueError(f"Desteklenmeyen mesh formatı: {file_format}")
+        writers[file_format](path)
+
+
+def write_glb(path, gltf, binary):
+    """glTF JSON + binary buffer'ı GLB konteynerine yaz (4 byte hizalı chunk'lar)"""
+    json_chunk = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+    json_chunk += b" " * (-len(json_chunk) % 4)
+    binary += b"\x00" * (-len(binary) % 4)
+    total_length = 12 + 8 + len(json_chunk) + 8 + len(binary)
+    with open(path, "wb") as f:
+        f.write(struct.pack("<III", GLB_MAGIC, 2, total_length))
+        f.write(struct.pack("<II", len(json_chunk), GLB_CHUNK_JSON))
+        f.write(json_chunk)
+        f.write(struct.pack("<II", len(binary), GLB_CHUNK_BIN))
+        f.write(binary)
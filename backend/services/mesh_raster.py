@@ -0,0 +1,230 @@
+# services/mesh_raster.py - Software z-buffer triangle rasterizer (pure NumPy)
+#
+# Tessellation (MeshBuffers) ortografik olarak projekte edilir ve derinlik tamponu ile
+# flat / Gouraud gölgeli çizilir. OpenGL, X sunucusu (Xvfb) veya matplotlib gerekmez;
+# geometri worker'larında ve fork edilen render süreçlerinde çalışır.
+#
+# Üçgenler toplu işlenir (scanline): her (üçgen, satır) çifti için kenar kesişimlerinden
+# piksel aralığı bulunur; derinlik ve gölge üçgen düzlemi boyunca adım adım ilerletilir
+# ve piksel başına en yakın örnek z-buffer'a yazılır. Bellek, satırlar piksel sayısına
+# göre parçalara bölünerek sınırlanır.
+import numpy as np
+
+FILL_RATIO = 0.75                       # çizim alanının görüntüye oranı (kenar çizimi de aynı sığdırmayı kullanır)
+BACKGROUND_COLOR = (255, 255, 255)
+BASE_COLOR = (176, 190, 197)            # viewer ile aynı gri-mavi (0xb0bec5)
+AMBIENT = 0.28
+# Görüş uzayında (x sağ, y yukarı, z izleyiciye doğru) ışık yönleri ve ağırlıkları
+LIGHTS = (((0.35, 0.55, 1.0), 0.62), ((-0.6, 0.2, 0.5), 0.22))
+CHUNK_PIXELS = 1 << 22                  # parça başına en fazla piksel örneği
+
+
+def view_basis(direction, up=(0.0, 1.0, 0.0)):
+    """
+    Görüş yönü için (sağ, yukarı, izleyici) birim vektörleri
+
+    direction izleyiciye doğru bakar (HLR projektörü ile aynı). Y ekseni yukarıdır;
+    üst / alt görünümlerde yukarı yön -Z alınır.
+    """
+    toward = np.asarray(direction, dtype=np.float64)
+    toward = toward / np.linalg.norm(toward)
+    up = np.asarray(up, dtype=np.float64)
+    if abs(np.dot(up, toward)) > 0.999:
+        up = np.array([0.0, 0.0, -1.0])
+    right = np.cross(up, toward)
+    right /= np.linalg.norm(right)
+    return right, np.cross(toward, right), toward
+
+
+def fit_transform(bounds, size):
+    """Projeksiyon koordinatı -> piksel: (low, high) kutusunu ortala ve FILL_RATIO ile sığdır"""
+    width, height = size
+    low, high = (np.asarray(b, dtype=np.float64) for b in bounds)
+    extent = np.maximum(high - low, 1e-9)
+    scale = FILL_RATIO * min(width / extent[0], height / extent[1])
+    center = (low + high) / 2
+
+    def to_pixels(points):
+        return np.column_stack((
+            (points[:, 0] - center[0]) * scale + width / 2,
+            height / 2 - (points[:, 1] - center[1]) * scale
+        ))
+    return to_pixels
+
+
+class ShadedMesh:
+    """Bir mesh'in belirli yönden z-buffer'lı gölgeli görüntüsü"""
+
+    def __init__(self, vertices, faces, vertex_normals=None):
+        self.vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        self.faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+        self.vertex_normals = None if vertex_normals is None else np.asarray(vertex_normals, dtype=np.float64)
+
+    @classmethod
+    def from_buffers(cls, mesh):
+        """MeshBuffers'tan (alan ağırlıklı vertex normalleri ile)"""
+        return cls(mesh.vertices, mesh.faces, mesh.vertex_normals)
+
+    def project(self, direction):
+        """Görüş uzayı koordinatları (N, 3): x sağ, y yukarı, z izleyiciye doğru"""
+        basis = np.stack(view_basis(direction))
+        return self.vertices @ basis.T, basis
+
+    def bounds(self, direction):
+        """Projeksiyon düzlemindeki (low, high) kutusu - kenar çizimi ile ortak sığdırma için"""
+        projected, _ = self.project(direction)
+        if not len(projected):
+            return np.zeros(2), np.zeros(2)
+        return projected[:, :2].min(axis=0), projected[:, :2].max(axis=0)
+
+    def rasterize(self, direction, size, shading="gouraud", supersample=2, bounds=None):
+        """
+        Gölgeli RGB görüntü
+
+        Args:
+            direction: İzleyiciye doğru görüş yönü
+            size: (width, height)
+            shading: "gouraud" (vertex normalleri interpolasyonu) veya "flat" (üçgen normali)
+            supersample: Kenar yumuşatma için örnekleme katsayısı
+            bounds: Ortak sığdırma kutusu (None = mesh'in kendi kutusu)
+
+        Returns:
+            (height, width, 3) uint8 dizi
+        """
+        width, height = size
+        image = np.empty((height, width, 3), dtype=np.float32)
+        image[:] = BACKGROUND_COLOR
+        if not len(self.faces):
+            return image.astype(np.uint8)
+
+        projected, basis = self.project(direction)
+        to_pixels = fit_transform(bounds if bounds is not None else self.bounds(direction),
+                                  (width * supersample, height * supersample))
+        screen = to_pixels(projected[:, :2])
+        depth = projected[:, 2]
+
+        intensity = self._intensities(basis, shading)
+        pixel_shape = (height * supersample, width * supersample)
+        zbuffer, shade = _rasterize_triangles(screen, depth, self.faces, intensity, pixel_shape)
+
+        # Box filtre ile çıktı çözünürlüğüne indir (kapsama = alfa)
+        covered = np.isfinite(zbuffer)
+        coverage = covered.reshape(height, supersample, width, supersample).mean(axis=(1, 3))
+        shade_sum = np.where(covered, shade, 0.0).reshape(height, supersample, width, supersample).sum(axis=(1, 3))
+        mean_shade = np.divide(shade_sum, coverage * supersample * supersample,
+                               out=np.zeros_like(shade_sum), where=coverage > 0)
+
+        color = mean_shade[..., None] * np.asarray(BASE_COLOR, dtype=np.float32)
+        alpha = coverage[..., None].astype(np.float32)
+        image = image * (1.0 - alpha) + color * alpha
+        return np.clip(image + 0.5, 0, 255).astype(np.uint8)
+
+    def _intensities(self, basis, shading):
+        """Vertex (gouraud) veya üçgen (flat) başına ışık yoğunluğu - çift taraflı Lambert"""
+        if shading == "flat" or self.vertex_normals is None:
+            triangles = self.vertices[self.faces]
+            normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        else:
+            normals = self.vertex_normals
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+        view_normals = normals @ basis.T
+
+        intensity = np.full(len(view_normals), AMBIENT)
+        for light, weight in LIGHTS:
+            light = np.asarray(light) / np.linalg.norm(light)
+            intensity += weight * np.abs(view_normals @ light)
+        intensity = np.minimum(intensity, 1.0)
+
+        if shading == "flat" or self.vertex_normals is None:
+            return np.repeat(intensity[:, None], 3, axis=1)      # (M, 3) - köşe başına aynı değer
+        return intensity[self.faces]                              # (M, 3)
+
+
+def _rasterize_triangles(screen, depth, faces, intensity, shape):
+    """
+    Üçgenleri z-buffer'a çiz
+
+    Args:
+        screen: (N, 2) piksel koordinatları
+        depth: (N,) izleyiciye uzaklık (büyük = yakın)
+        faces: (M, 3) indeksler
+        intensity: (M, 3) köşe yoğunlukları
+        shape: (height, width)
+
+    Returns:
+        (zbuffer, shade) - örtülmeyen piksellerde zbuffer -inf
+    """
+    height, width = shape
+    zbuffer = np.full(height * width, -np.inf)
+    shade = np.zeros(height * width, dtype=np.float32)
+
+    corners = screen[faces]                                    # (M, 3, 2)
+    x, y = corners[..., 0], corners[..., 1]
+    area = (x[:, 1] - x[:, 0]) * (y[:, 2] - y[:, 0]) - (x[:, 2] - x[:, 0]) * (y[:, 1] - y[:, 0])
+    valid = np.abs(area) > 1e-12
+    x, y, area = x[valid], y[valid], area[valid]
+    z, value = depth[faces[valid]], intensity[valid]
+
+    # Düzlem katsayıları: f(px, py) = f0 + dx * (px - x0) + dy * (py - y0)
+    def plane(f):
+        dx = ((f[:, 1] - f[:, 0]) * (y[:, 2] - y[:, 0]) - (f[:, 2] - f[:, 0]) * (y[:, 1] - y[:, 0])) / area
+        dy = ((f[:, 2] - f[:, 0]) * (x[:, 1] - x[:, 0]) - (f[:, 1] - f[:, 0]) * (x[:, 2] - x[:, 0])) / area
+        return f[:, 0], dx, dy
+    z_plane, value_plane = plane(z), plane(value)
+
+    # Satırlar: piksel merkezi (py + 0.5) üçgenin y aralığında
+    row_low = np.maximum(np.ceil(y.min(axis=1) - 0.5), 0).astype(np.int64)
+    row_high = np.minimum(np.floor(y.max(axis=1) - 0.5), height - 1).astype(np.int64)
+    row_counts = np.maximum(row_high - row_low + 1, 0)
+    triangle = np.repeat(np.arange(len(x)), row_counts)
+    if not len(triangle):
+        return zbuffer.reshape(shape), shade.reshape(shape)
+    row = row_low[triangle] + np.arange(len(triangle)) - np.repeat(np.cumsum(row_counts) - row_counts, row_counts)
+    center_y = row + 0.5
+
+    # Satırın üç kenarla kesişimleri -> [x_left, x_right]
+    x_left = np.full(len(triangle), np.inf)
+    x_right = np.full(len(triangle), -np.inf)
+    for a, b in ((0, 1), (1, 2), (2, 0)):
+        xa, ya, xb, yb = x[triangle, a], y[triangle, a], x[triangle, b], y[triangle, b]
+        crosses = (np.minimum(ya, yb) <= center_y) & (center_y <= np.maximum(ya, yb)) & (ya != yb)
+        t = np.divide(center_y - ya, yb - ya, out=np.zeros_like(ya), where=crosses)
+        at = xa + t * (xb - xa)
+        x_left = np.where(crosses, np.minimum(x_left, at), x_left)
+        x_right = np.where(crosses, np.maximum(x_right, at), x_right)
+
+    column_low = np.maximum(np.ceil(x_left - 0.5), 0)
+    column_high = np.minimum(np.floor(x_right - 0.5), width - 1)
+    keep = np.isfinite(x_left) & (column_high >= column_low)
+    triangle, row, center_y = triangle[keep], row[keep], center_y[keep]
+    column_low = column_low[keep].astype(np.int64)
+    spans = column_high[keep].astype(np.int64) - column_low + 1
+
+    # Satır başındaki düzlem değerleri ve x yönündeki adım
+    start_x = column_low + 0.5
+    def at_row_start(coefficients):
+        f0, dx, dy = (c[triangle] for c in coefficients)
+        return f0 + dx * (start_x - x[triangle, 0]) + dy * (center_y - y[triangle, 0]), dx
+    z_start, z_step = at_row_start(z_plane)
+    value_start, value_step = at_row_start(value_plane)
+    pixel_start = row * width + column_low
+
+    # Piksel örneklerini parçalar halinde üret
+    cumulative = np.cumsum(spans)
+    boundaries = np.unique(np.searchsorted(cumulative, np.arange(CHUNK_PIXELS, cumulative[-1], CHUNK_PIXELS)) + 1)
+    for rows in np.split(np.arange(len(spans)), boundaries):
+        if not len(rows):
+            continue
+        counts = spans[rows]
+        index = np.repeat(rows, counts)
+        step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        pixel = pixel_start[index] + step
+        sample_z = z_start[index] + z_step[index] * step
+
+        # Önce derinlik (piksel başına maksimum), ardından yalnızca kazanan örneklerin gölgesi
+        np.maximum.at(zbuffer, pixel, sample_z)
+        winners = sample_z >= zbuffer[pixel]
+        shade[pixel[winners]] = (value_start[index] + value_step[index] * step)[winners]
+
+    return zbuffer.reshape(shape), shade.reshape(shape)
@@ -0,0 +1,177 @@
+# services/metrics.py - Stage timing instrumentation and Prometheus text exposition
+#
+# stage_timer() / timed() hot path'leri sarar: süre histogramı ve hata sayacı
+# kaydedilir, aktif bir collect_stages() bloğu varsa süre analiz bazında da
+# toplanır. Geometri worker süreçlerinde toplanan süreler iş sonucu ile ana
+# sürece taşınır ve burada record_stage() ile tekrar kaydedilir.
+import time
+import threading
+import functools
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class MetricsRegistry:
+    """Thread-safe counter / gauge / histogram kaydı (prometheus_client bağımlılığı olmadan)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}      # name -> {"type", "help", "series": {labels: value}}
+        self._collectors = []   # scrape anında gauge güncelleyen fonksiyonlar
+
+    def _series(self, name, kind, help_text, labels):
+        metric = self._metrics.setdefault(name, {"type": kind, "help": help_text, "series": {}})
+        return metric["series"], tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1.0, help_text="", **labels):
+        with self._lock:
+            series, key = self._series(name, "counter", help_text, labels)
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name, value, help_text="", kind="gauge", **labels):
+        """Değeri doğrudan yaz (kind="counter": başka yerde sayılan toplamları yayınlamak için)"""
+        with self._lock:
+            series, key = self._series(name, kind, help_text, labels)
+            series[key] = float(value)
+
+    def observe(self, name, value, help_text="", buckets=DEFAULT_BUCKETS, **labels):
+        with self._lock:
+            series, key = self._series(name, "histogram", help_text, labels)
+            if key not in series:
+                series[key] = _Histogram(buckets)
+            series[key].observe(value)
+
+    def register_collector(self, collector):
+        """collector(registry) her /metrics isteğinde çağrılır"""
+        self._collectors.append(collector)
+
+    def render(self):
+        """Prometheus text exposition formatı (0.0.4)"""
+        for collector in list(self._collectors):
+            try:
+                collector(self)
+            except Exception as e:
+                print(f"[METRICS] ⚠️ Collector hatası: {e}")
+
+        lines = []
+        with self._lock:
+            for name in sorted(self._metrics):
+                metric = self._metrics[name]
+                if metric["help"]:
+                    lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} {metric['type']}")
+                for key, value in sorted(metric["series"].items()):
+                    if metric["type"] == "histogram":
+                        # observe() kümülatif sayar: counts[i] = değeri <= buckets[i] olan gözlemler
+                        for bound, count in zip(value.buckets, value.counts):
+                            lines.append(f"{name}_bucket{_labels(key, le=_number(bound))} {count}")
+                        lines.append(f"{name}_bucket{_labels(key, le='+Inf')} {value.count}")
+                        lines.append(f"{name}_sum{_labels(key)} {_number(value.sum)}")
+                        lines.append(f"{name}_count{_labels(key)} {value.count}")
+                    else:
+                        lines.append(f"{name}{_labels(key)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _labels(key, **extra):
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+registry = MetricsRegistry()
+
+STAGE_DURATION = "engteklif_stage_duration_seconds"
+STAGE_ERRORS = "engteklif_stage_errors_total"
+
+_local = threading.local()
+
+
+# ===== AŞAMA SÜRELERİ =====
+
+@contextmanager
+def collect_stages():
+    """Blok içindeki (bu thread'deki) tüm aşama sürelerini listede topla"""
+    stack = getattr(_local, "collectors", None)
+    if stack is None:
+        stack = _local.collectors = []
+    collected = []
+    stack.append(collected)
+    try:
+        yield collected
+    finally:
+        stack.remove(collected)
+
+
+def record_stage(stage, duration, error=False):
+    """Aşama süresini histograma ve aktif toplayıcılara yaz"""
+    registry.observe(STAGE_DURATION, duration, "Pipeline aşama süreleri", stage=stage)
+    if error:
+        registry.inc(STAGE_ERRORS, 1, "Hata ile biten pipeline aşamaları", stage=stage)
+    for collected in getattr(_local, "collectors", None) or ():
+        collected.append({"stage": stage, "duration": round(duration, 4), "error": bool(error)})
+
+
+@contextmanager
+def stage_timer(stage):
+    """with stage_timer("step_import"): ... - süreyi ve hatayı kaydet"""
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - start, error)
+
+
+def timed(stage):
+    """Fonksiyon dekoratörü - her çağrıyı stage_timer ile sarar"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def summarize_stages(stages):
+    """
+    Analiz kaydına yazılacak özet: aşama -> {count, total_seconds, max_seconds, errors}
+    """
+    summary = {}
+    for item in stages:
+        entry = summary.setdefault(item["stage"], {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "errors": 0})
+        entry["count"] += 1
+        entry["total_seconds"] = round(entry["total_seconds"] + item["duration"], 4)
+        entry["max_seconds"] = max(entry["max_seconds"], item["duration"])
+        entry["errors"] += int(item.get("error", False))
+    return summary
+
@@ -0,0 +1,95 @@
+# services/orientation_engine.py - Axis-aligned orientation search on the exact bounding box
+import numpy as np
+
+
+class OrientationEngine:
+    """
+    Parçanın eksenlere hizalı 24 farklı yönelimini tek seferde değerlendirir.
+
+    Eski yöntem compound'u 4×4×4 Euler kombinasyonuyla döndürüp her seferinde
+    BoundingBox() hesaplıyordu; bu 64 kombinasyonun yalnızca 24'ü birbirinden farklıdır.
+    Eksenlere hizalı rotasyonlar X/Y/Z boyutlarını yalnızca yer değiştirir: 24 yönelimin
+    boyutları OCCT'nin kesin bounding box'ının permütasyonlarıdır, geometri döndürülmez
+    ve tessellation gerekmez. (Eksene hizalı olmayan en küçük stok için bkz. StockFitter.)
+    """
+
+    ROTATION_ANGLES = (0, 90, 180, 270)
+    TIE_TOLERANCE = 1e-9        # Eşit hacimlerde ilk (kimlik) yönelim tercih edilir
+
+    _rotations = None
+
+    @staticmethod
+    def _axis_rotation(axis, degrees):
+        """Tek eksen etrafında 90° katı rotasyon matrisi (tam sayı)"""
+        quarter_turns = (degrees // 90) % 4
+        c = (1, 0, -1, 0)[quarter_turns]
+        s = (0, 1, 0, -1)[quarter_turns]
+        if axis == 0:
+            return np.array([[1, 0, 0], [0, c, -s], [0, s, c]])
+        if axis == 1:
+            return np.array([[c, 0, s], [0, 1, 0], [-s, 0, c]])
+        return np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+
+    @classmethod
+    def distinct_rotations(cls):
+        """
+        rx, ry, rz döngüsüyle aynı sırada üretilen 24 farklı rotasyon matrisi
+
+        Returns:
+            (24, 3, 3) int dizisi - önce X, sonra Y, sonra Z döndürmesi (R = Rz·Ry·Rx)
+        """
+        if cls._rotations is None:
+            rotations = []
+            seen = set()
+            for rx in cls.ROTATION_ANGLES:
+                for ry in cls.ROTATION_ANGLES:
+                    for rz in cls.ROTATION_ANGLES:
+                        matrix = (cls._axis_rotation(2, rz) @
+                                  cls._axis_rotation(1, ry) @
+                                  cls._axis_rotation(0, rx))
+                        key = matrix.tobytes()
+                        if key not in seen:
+                            seen.add(key)
+                            rotations.append(matrix)
+            cls._rotations = np.stack(rotations)
+        return cls._rotations
+
+    @classmethod
+    def rotated_extents(cls, extents):
+        """
+        Tüm yönelimler için eksen boyutları
+
+        Args:
+            extents: Döndürülmemiş parçanın (xlen, ylen, zlen) boyutları
+
+        Returns:
+            (24, 3) dizi - her rotasyon için X/Y/Z uzunlukları
+        """
+        return np.abs(cls.distinct_rotations()) @ np.asarray(extents, dtype=np.float64)
+
+    @classmethod
+    def find_best_orientation(cls, exact_extents):
+        """
+        En küçük bounding box hacmini veren yönelimi bul
+
+        Boyutlar permütasyon olduğundan hacimler eşittir ve eşitlikte ilk (kimlik) yönelim
+        seçilir - X/Y/Z değerleri eski BoundingBox() döngüsüyle aynı kalır.
+
+        Args:
+            exact_extents: Döndürülmemiş parçanın (xlen, ylen, zlen) kesin boyutları
+
+        Returns:
+            Dict: dimensions (x, y, z), rotation (3x3), volume, evaluated_orientations
+        """
+        rotations = cls.distinct_rotations()
+        extents = cls.rotated_extents(exact_extents)
+        volumes = np.prod(extents, axis=1)
+        best_index = int(np.argmax(volumes <= volumes.min() * (1 + cls.TIE_TOLERANCE)))
+
+        x, y, z = (float(d) for d in extents[best_index])
+        return {
+            "dimensions": (x, y, z),
+            "rotation": rotations[best_index].tolist(),
+            "volume": x * y * z,
+            "evaluated_orientations": len(rotations)
+        }
@@ -0,0 +1,179 @@
+# services/page_ocr.py - One structured Tesseract pass per page raster
+#
+# Her sayfa raster'ı için tek bir image_to_data çağrısı yapılır: kelimeler (metin,
+# güven, kutu) ve satırlar çıkarılır, sonuç diske yazılır. PageRasterCache'ten açılan
+# sayfalar raster anahtarıyla (PDF hash'i, sayfa, dpi, döndürme) saklanır; pikseller
+# yalnızca önbellek dışı görüntülerde hash'lenir.
+# Metin çıkarıcılar (malzeme araması), OCR işaretli görünüm ve malzeme tespit görünümü
+# aynı sonucu kullanır; aynı sayfa için Tesseract ikinci kez çalışmaz.
+import os
+import json
+import hashlib
+import tempfile
+from typing import Any, Dict, List, Optional
+import pytesseract
+from config import Config
+from services.metrics import stage_timer
+from services.page_raster import PageRasterCache
+
+OCR_LANG = 'tur+eng'
+CACHE_VERSION = 1
+
+
+class PageOCR:
+    """Bir sayfanın OCR sonucu: kelimeler, satırlar ve düz metin"""
+
+    def __init__(self, words: List[Dict[str, Any]]):
+        self.words = words
+
+    @classmethod
+    def from_tesseract(cls, data: Dict[str, list]) -> "PageOCR":
+        """image_to_data (Output.DICT) çıktısından - yalnızca boş olmayan kelimeler"""
+        words = []
+        for i in range(len(data['level'])):
+            text = str(data['text'][i]).strip()
+            confidence = float(data['conf'][i])
+            if not text or confidence < 0:
+                continue
+            words.append({
+                "text": text,
+                "conf": int(round(confidence)),
+                "left": int(data['left'][i]),
+                "top": int(data['top'][i]),
+                "width": int(data['width'][i]),
+                "height": int(data['height'][i]),
+                "line": (int(data['block_num'][i]), int(data['par_num'][i]), int(data['line_num'][i]))
+            })
+        return cls(words)
+
+    @property
+    def lines(self) -> List[Dict[str, Any]]:
+        """Okuma sırasıyla satırlar: metin, ortalama güven, kapsayan kutu, blok numarası"""
+        grouped = {}
+        for word in self.words:
+            grouped.setdefault(tuple(word["line"]), []).append(word)
+
+        lines = []
+        for key in sorted(grouped):
+            words = grouped[key]
+            left = min(w["left"] for w in words)
+            top = min(w["top"] for w in words)
+            lines.append({
+                "text": " ".join(w["text"] for w in words),
+                "conf": sum(w["conf"] for w in words) / len(words),
+                "box": (left, top,
+                        max(w["left"] + w["width"] for w in words) - left,
+                        max(w["top"] + w["height"] for w in words) - top),
+                "block": key[0]
+            })
+        return lines
+
+    @property
+    def mean_confidence(self) -> float:
+        """Kelimelerin ortalama Tesseract güveni (kelime yoksa 0)"""
+        return sum(w["conf"] for w in self.words) / len(self.words) if self.words else 0.0
+
+    @property
+    def text(self) -> str:
+        """image_to_string benzeri düz metin: satırlar alt alta, bloklar arasında boş satır"""
+        parts = []
+        previous_block = None
+        for line in self.lines:
+            if previous_block is not None and line["block"] != previous_block:
+                parts.append("")
+            parts.append(line["text"])
+            previous_block = line["block"]
+        return "\n".join(parts) + "\n" if parts else ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": CACHE_VERSION, "words": self.words}
+
+
+class OCRService:
+    """Raster anahtarı ile önbelleklenen sayfa OCR'ı"""
+
+    @classmethod
+    def raster_key(cls, image) -> str:
+        """
+        OCR önbellek anahtarı - sayfa raster önbelleğinden açılan görüntüde dosyanın
+        anahtarı (piksel okunmaz), diğerlerinde raster içeriğinin hash'i
+        """
+        path = getattr(image, "filename", None)
+        key = PageRasterCache.raster_key(path) if path else None
+        return key or cls.raster_hash(image)
+
+    @staticmethod
+    def raster_hash(image) -> str:
+        """Raster içeriğinin hash'i (mod, boyut ve pikseller)"""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}".encode("ascii"))
+        digest.update(image.tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def page(cls, image, lang: str = OCR_LANG, key: Optional[str] = None) -> PageOCR:
+        """
+        Sayfanın yapılandırılmış OCR sonucu (önbellekte yoksa Tesseract çalışır)
+
+        Args:
+            image: PIL sayfa görüntüsü
+            lang: Tesseract dil(ler)i
+            key: Önbellek anahtarı (None = raster_key)
+        """
+        cache_path = cls._cache_path(key or cls.raster_key(image), lang)
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("version") == CACHE_VERSION:
+                return PageOCR(cached["words"])
+        except (OSError, ValueError):
+            pass
+
+        with stage_timer("tesseract"):
+            data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+        result = PageOCR.from_tesseract(data)
+
+        cls._write_cache(cache_path, result)
+        return result
+
+    @classmethod
+    def text(cls, pages, lang: str = OCR_LANG) -> str:
+        """Sayfaların birleştirilmiş düz metni"""
+        return "".join(cls.page(page, lang).text for page in pages)
+
+    @classmethod
+    def readable(cls, pages, lang: str = OCR_LANG) -> bool:
+        """
+        Sayfalar bu yönde okunabilir mi - yeterli kelime ve ortalama güven eşiğin üstünde
+
+        Okunabilir bir yönde malzeme bulunamadıysa diğer yönleri OCR'lamak sonuç vermez.
+        """
+        words = [word for page in pages for word in cls.page(page, lang).words]
+        if len(words) < Config.OCR_READABLE_MIN_WORDS:
+            return False
+        return sum(word["conf"] for word in words) / len(words) >= Config.OCR_READABLE_CONFIDENCE
+
+    @staticmethod
+    def _write_cache(cache_path, result):
+        """
+        Sonucu önbelleğe yaz - tekil geçici dosya (aynı sayfayı OCR'layan thread'ler
+        çakışmaz); yazılamazsa yalnızca uyarı, sonuç zaten bellekte
+        """
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result.to_dict(), f, ensure_ascii=False)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(f"[OCR] ⚠️ OCR önbelleğe yazılamadı: {e}")
+            if temp_path:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _cache_path(key, lang):
+        return os.path.join(Config.OCR_CACHE_DIR, key[:2], f"{key}_{lang.replace('+', '-')}.json")
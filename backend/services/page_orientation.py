@@ -0,0 +1,116 @@
+# services/page_orientation.py - Page orientation detection on a low-dpi raster
+#
+# Malzeme araması sayfayı körlemesine 4 yönde OCR'lamak yerine yönü önce belirler:
+#   1) Tesseract OSD (osd.traineddata) - yön ve güven değeri
+#   2) OSD yoksa / güvensizse: metin satırı ekseni tahmini (OpenCV). Çerçeve ve geometri
+#      çizgileri ayıklanır; karakter boyutundaki bileşenlerin en yakın komşusu çoğunlukla
+#      aynı satırdadır, bu yüzden baskın komşu yönü metin eksenini verir.
+#      0°/180° (veya 90°/270°) ayrımı yapılamaz, bu yüzden eksen yönü ve 180° tersi
+#      aday olarak döner (dik eksen denenmez - eksen tahmini ayrımı net yapar).
+#
+# Döndürme değerleri saat yönündedir (PageRasterCache ile aynı). Raster bellekte
+# döndürülür; PDF yeniden yazılmaz.
+from typing import Any, Dict, List
+import cv2
+import numpy as np
+import pytesseract
+from scipy.spatial import cKDTree
+from config import Config
+from services.metrics import stage_timer
+from services.page_raster import PageRasterCache
+
+ROTATIONS = (0, 90, 180, 270)
+
+
+class OrientationService:
+    """Sayfa yönü tespiti ve OCR için döndürme adayları"""
+
+    @classmethod
+    def detect(cls, pdf_path: str, page: int = 1) -> Dict[str, Any]:
+        """
+        Sayfanın okunabilir olması için gereken saat yönü döndürmeyi tahmin et
+
+        Returns:
+            {"rotation", "confidence", "method": osd/text_lines/default,
+             "candidates": OCR deneme sırası}
+        """
+        with stage_timer("orientation"):
+            try:
+                image = PageRasterCache.pages(pdf_path, dpi=Config.ORIENTATION_DPI,
+                                              first_page=page, last_page=page)[0]
+            except Exception as e:
+                print(f"[ORIENTATION] ⚠️ Raster alınamadı: {e}")
+                return {"rotation": 0, "confidence": 0.0, "method": "default", "candidates": list(ROTATIONS)}
+
+            osd = cls._osd(image)
+            if osd and osd["confidence"] >= Config.ORIENTATION_MIN_CONFIDENCE:
+                # OSD yönü + 180° tersi (OSD'nin en sık hatası ters sayfadır)
+                osd["candidates"] = [osd["rotation"], (osd["rotation"] + 180) % 360]
+                print(f"[ORIENTATION] 🧭 OSD: {osd['rotation']}° (güven {osd['confidence']:.1f})")
+                return osd
+
+            rotation, confidence = cls._text_line_axis(image)
+            if osd and osd["rotation"] % 180 == rotation:
+                # OSD zayıf ama eksen tahmini ile uyumlu - OSD'nin yönünü öne al
+                rotation = osd["rotation"]
+            candidates = [rotation, (rotation + 180) % 360]
+            print(f"[ORIENTATION] 🧭 Metin satırı ekseni: {rotation}° (oran {confidence:.2f})")
+            return {"rotation": rotation, "confidence": confidence, "method": "text_lines", "candidates": candidates}
+
+    @classmethod
+    def candidates(cls, pdf_path: str, page: int = 1) -> List[int]:
+        """OCR'ın deneneceği döndürmeler - tespit edilen yön ve 180° tersi"""
+        return cls.detect(pdf_path, page)["candidates"]
+
+    @staticmethod
+    def _osd(image):
+        """Tesseract OSD - osd.traineddata yoksa veya metin azsa None"""
+        try:
+            osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+        except Exception as e:
+            print(f"[ORIENTATION] ⚠️ OSD kullanılamadı: {str(e).splitlines()[0] if str(e) else e}")
+            return None
+        # 'rotate' sayfayı düzeltmek için gereken saat yönü döndürmedir (PageRasterCache ile aynı yön)
+        return {
+            "rotation": int(osd.get("rotate", 0)) % 360,
+            "confidence": float(osd.get("orientation_conf", 0.0)),
+            "method": "osd"
+        }
+
+    @staticmethod
+    def _text_line_axis(image):
+        """
+        Metin satırları yatay mı dikey mi akıyor
+
+        Bir kelimedeki karakterler arası mesafe satır aralığından küçüktür: karakter
+        boyutundaki bileşenlerin en yakın komşusu çoğunlukla satır yönündedir.
+
+        Returns:
+            (0 veya 90, baskın yönün diğerine oranı)
+        """
+        gray = np.asarray(image.convert("L"))
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+        # Çerçeve, tablo ve geometri çizgilerini çıkar
+        line_length = max(binary.shape) // 40
+        horizontal = cv2.morphologyEx(binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (line_length, 1)))
+        vertical = cv2.morphologyEx(binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, line_length)))
+        glyphs = cv2.subtract(binary, cv2.bitwise_or(horizontal, vertical))
+
+        # Karakter boyutundaki bileşenler
+        _, _, stats, centroids = cv2.connectedComponentsWithStats(glyphs, connectivity=8)
+        size = np.maximum(stats[1:, cv2.CC_STAT_WIDTH], stats[1:, cv2.CC_STAT_HEIGHT])
+        keep = (size >= 3) & (size <= max(8, Config.ORIENTATION_DPI // 4))
+        points = centroids[1:][keep]
+        if len(points) < 10:
+            return 0, 0.0
+
+        # En yakın komşu yönleri (aynı karakterin parçaları - i noktası vb. - hariç)
+        distances, neighbors = cKDTree(points).query(points, k=2)
+        offsets = np.abs(points[neighbors[:, 1]] - points)
+        valid = distances[:, 1] >= np.median(size[keep]) * 0.3
+        horizontal_votes = int(np.count_nonzero(valid & (offsets[:, 0] > offsets[:, 1])))
+        vertical_votes = int(np.count_nonzero(valid & (offsets[:, 1] > offsets[:, 0])))
+        if vertical_votes > horizontal_votes:
+            return 90, vertical_votes / max(horizontal_votes, 1)
+        return 0, horizontal_votes / max(vertical_votes, 1)
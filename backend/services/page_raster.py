@@ -0,0 +1,227 @@
+# services/page_raster.py - Disk cache of rasterized PDF pages
+#
+# PDF sayfaları (PDF hash'i, sayfa, dpi, döndürme) anahtarı başına bir kez poppler ile
+# rasterize edilir ve PPM olarak diske yazılır. OCR, PDF render'ları ve malzeme araması
+# aynı dosyaları kullanır. PIL, sıkıştırılmamış PPM'i mmap ile açar; sayfalar bellekte
+# PIL listesi olarak tutulmaz, her erişimde dosyadan açılır.
+#
+# Döndürülmüş raster, 0° raster'ından bellekte döndürülerek türetilir - PDF yeniden
+# yazılmaz ve poppler tekrar çalışmaz. Önbellek boyutu PAGE_RASTER_CACHE_MB ile sınırlıdır
+# (en eski erişilen dosyalar silinir).
+import os
+import shutil
+import hashlib
+import tempfile
+from typing import List, Optional
+from PIL import Image
+from pdf2image import convert_from_path, pdfinfo_from_path
+from config import Config
+from services.metrics import stage_timer
+
+
+class RasterPages:
+    """Sayfa raster dosyalarının tembel dizisi - her erişimde dosya açılır"""
+
+    def __init__(self, paths: List[str]):
+        self.paths = list(paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RasterPages(self.paths[index])
+        return Image.open(self.paths[index])
+
+    def __iter__(self):
+        for path in self.paths:
+            yield Image.open(path)
+
+
+class PageRasterCache:
+    """(PDF hash, sayfa, dpi, döndürme) anahtarlı sayfa raster önbelleği"""
+
+    @staticmethod
+    def pdf_hash(pdf_path: str) -> str:
+        """PDF içeriğinin SHA-256 hash'i (aynı PDF farklı yollardan yüklense de aynı anahtar)"""
+        digest = hashlib.sha256()
+        with open(pdf_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @classmethod
+    def page_count(cls, pdf_path: str, pdf_hash: Optional[str] = None) -> int:
+        """Sayfa sayısı (pdfinfo sonucu PDF dizininde saklanır)"""
+        directory = cls._directory(pdf_hash or cls.pdf_hash(pdf_path))
+        count_path = os.path.join(directory, "pages.txt")
+        try:
+            with open(count_path, "r") as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            pass
+        count = int(pdfinfo_from_path(pdf_path)["Pages"])
+        os.makedirs(directory, exist_ok=True)
+        def write(path):
+            with open(path, "w") as f:
+                f.write(str(count))
+        cls._write_atomic(count_path, write)
+        return count
+
+    @classmethod
+    def pages(cls, pdf_path: str, dpi: int = 300, first_page: int = 1, last_page: Optional[int] = None,
+              rotation: int = 0, page_numbers: Optional[List[int]] = None) -> RasterPages:
+        """Sayfa görüntüleri (tembel) - bkz. page_paths"""
+        return RasterPages(cls.page_paths(pdf_path, dpi, first_page, last_page, rotation, page_numbers))
+
+    @classmethod
+    def page_paths(cls, pdf_path: str, dpi: int = 300, first_page: int = 1, last_page: Optional[int] = None,
+                   rotation: int = 0, page_numbers: Optional[List[int]] = None) -> List[str]:
+        """
+        Sayfa raster dosya yolları; önbellekte olmayanlar rasterize edilir
+
+        Args:
+            pdf_path: PDF dosya yolu
+            dpi: Çözünürlük
+            first_page, last_page: 1 tabanlı sayfa aralığı (last_page None = son sayfa)
+            rotation: Saat yönünde döndürme (90'ın katı)
+            page_numbers: Verilirse aralık yerine yalnızca bu sayfalar
+
+        Returns:
+            Sayfa sırasıyla PPM dosya yolları
+        """
+        rotation = int(rotation) % 360
+        if rotation % 90:
+            raise ValueError(f"Döndürme 90'ın katı olmalı: {rotation}")
+
+        pdf_hash = cls.pdf_hash(pdf_path)
+        directory = cls._directory(pdf_hash)
+        os.makedirs(directory, exist_ok=True)
+        page_count = cls.page_count(pdf_path, pdf_hash)
+        last_page = page_count if last_page is None else min(last_page, page_count)
+        if page_numbers is None:
+            page_numbers = list(range(max(first_page, 1), last_page + 1))
+        else:
+            page_numbers = [page for page in page_numbers if 1 <= page <= page_count]
+
+        # 0° raster'ları (eksikler tek poppler çağrısıyla)
+        base_paths = {page: cls._page_path(directory, page, dpi, 0) for page in page_numbers}
+        missing = sorted(page for page, path in base_paths.items() if not os.path.exists(path))
+        if missing:
+            cls._rasterize(pdf_path, dpi, missing, base_paths)
+
+        paths = []
+        for page in page_numbers:
+            path = cls._page_path(directory, page, dpi, rotation)
+            try:
+                os.utime(path)      # LRU için son erişim
+            except FileNotFoundError:
+                # Döndürülmüş raster henüz türetilmedi veya başka bir iş prune() ile sildi
+                if not os.path.exists(base_paths[page]):
+                    cls._rasterize(pdf_path, dpi, [page], base_paths)
+                if rotation:
+                    with Image.open(base_paths[page]) as image:
+                        rotated = image.rotate(-rotation, expand=True)
+                    cls._write_atomic(path, lambda temp_path: rotated.save(temp_path, "PPM"))
+            paths.append(path)
+
+        if missing:
+            cls.prune()
+        return paths
+
+    @classmethod
+    def prune(cls, max_mb: Optional[int] = None):
+        """Önbellek sınırı aşıldıysa en eski erişilen raster'ları sil"""
+        limit = (Config.PAGE_RASTER_CACHE_MB if max_mb is None else max_mb) * 1024 * 1024
+        files = []
+        for root, _, names in os.walk(Config.PAGE_RASTER_DIR):
+            for name in names:
+                if name.endswith(".ppm"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            print(f"[PAGE-RASTER] 🗑️ Önbellek sınırı: {removed} sayfa raster'ı silindi")
+
+    @staticmethod
+    def raster_key(path: str) -> Optional[str]:
+        """
+        Önbellekteki raster dosyasının anahtarı: <pdf hash>_p<sayfa>_d<dpi>_r<döndürme>
+
+        Dosya içeriği anahtardan belirlendiği için OCR gibi türetilmiş sonuçlar pikseller
+        hash'lenmeden bu anahtarla saklanabilir. Önbellek dışındaki yollar için None.
+        """
+        directory, name = os.path.split(os.path.abspath(path))
+        if not name.endswith(".ppm") or \
+                os.path.dirname(os.path.dirname(directory)) != os.path.abspath(Config.PAGE_RASTER_DIR):
+            return None
+        return f"{os.path.basename(directory)}_{name[:-len('.ppm')]}"
+
+    # ===== YARDIMCI =====
+
+    @staticmethod
+    def _directory(pdf_hash):
+        return os.path.join(Config.PAGE_RASTER_DIR, pdf_hash[:2], pdf_hash)
+
+    @staticmethod
+    def _page_path(directory, page, dpi, rotation):
+        return os.path.join(directory, f"p{page:04d}_d{dpi}_r{rotation}.ppm")
+
+    @staticmethod
+    def _rasterize(pdf_path, dpi, pages, targets):
+        """Eksik sayfaları poppler ile PPM olarak rasterize et ve önbelleğe taşı"""
+        temp_dir = tempfile.mkdtemp(prefix="pages_", dir=Config.PAGE_RASTER_DIR)
+        try:
+            with stage_timer("pdf_rasterize"):
+                # Ardışık sayfa aralıkları tek çağrıda
+                start = previous = pages[0]
+                for page in pages[1:] + [None]:
+                    if page is not None and page == previous + 1:
+                        previous = page
+                        continue
+                    output = convert_from_path(
+                        pdf_path, dpi=dpi, first_page=start, last_page=previous,
+                        output_folder=temp_dir, fmt="ppm", output_file=f"r{start:04d}_", paths_only=True
+                    )
+                    for number, path in zip(range(start, previous + 1), sorted(output)):
+                        os.replace(path, targets[number])
+                    if page is not None:
+                        start = previous = page
+            print(f"[PAGE-RASTER] 🖨️ {len(pages)} sayfa rasterize edildi ({dpi} dpi): {os.path.basename(pdf_path)}")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _write_atomic(path, write):
+        """
+        Eşzamanlı okuyucular yarım dosya görmesin diye geçici dosyaya yazıp taşı
+
+        Geçici dosya adı mkstemp ile tekildir - aynı süreçteki analiz thread'leri aynı
+        sayfayı aynı anda yazsa da birbirinin dosyasını ezmez.
+        """
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            write(temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
@@ -1,28 +1,32 @@
 import os
 import re
-import tempfile
 import unicodedata
 from typing import List, Dict, Any, Optional, Tuple
-from pdf2image import convert_from_path
-from pytesseract import image_to_string
 import PyPDF2
 from fuzzywuzzy import fuzz
 from models.material import Material
+from services.page_raster import PageRasterCache
+from services.page_ocr import OCRService
+from services.page_orientation import OrientationService
+from services.pdf_text_layer import PDFTextLayer
+from services.title_block import TitleBlockService
 from models.user import User
 
 class PDFAnalysisService:
     
     @staticmethod
-    def extract_text_with_tesseract(pdf_path: str, max_pages: int = 3) -> str:
-        """PDF'den OCR ile metin çıkar"""
+    def extract_text_with_tesseract(pdf_path: str, max_pages: int = 2, rotation: int = 0,
+                                    page_numbers: Optional[List[int]] = None) -> str:
+        """PDF'den OCR ile metin çıkar (sayfa raster'ları paylaşılan önbellekten)"""
         try:
-            images = convert_from_path(pdf_path, first_page=1, last_page=max_pages, dpi=300)
+            images = PageRasterCache.pages(pdf_path, dpi=300, last_page=max_pages, rotation=rotation,
+                                           page_numbers=page_numbers)
             if not images:
                 return "Hata: PDF'den görüntü elde edilemedi"
 
             all_text = []
-            for i, image in enumerate(images[:2], start=1):
-                text = image_to_string(image, lang='tur').strip()
+            for i, image in zip(page_numbers or range(1, len(images) + 1), images):
+                text = OCRService.page(image).text.strip()
                 print(f"\n[OCR Çıktısı] Sayfa {i}:\n{text}\n{'='*80}")
                 all_text.append(text)
 
@@ -174,52 +178,77 @@ class PDFAnalysisService:
             with open(output_path, "wb") as outfile:
                 writer.write(outfile)
     
+    @staticmethod
+    def _select_matches(blocks: Optional[List[Tuple[str, List[str]]]]) -> Tuple[List[str], Optional[str]]:
+        """Bloklardan %100 eşleşmeleri seç (6061 öncelikli) - (eşleşmeler, en iyi blok)"""
+        matches = []
+        best_block = None
+        for block_text, found_materials in blocks or []:
+            found_100 = [m for m in found_materials if "%100" in m]
+            if found_100:
+                # 6061 önceliği
+                if any("6061" in m for m in found_100):
+                    matches = [m for m in found_100 if "6061" in m]
+                    best_block = block_text
+                    break
+                elif not matches:
+                    matches = found_100
+                    best_block = block_text
+        return list(dict.fromkeys(matches)), best_block
+    
     @staticmethod
     def analyze_pdf_file(file_path: str, user_id: str) -> Dict[str, Any]:
         """Tam PDF analizi"""
         try:
             file_name = os.path.basename(file_path)
             name_only = os.path.splitext(file_name)[0]
-            working_file = file_path
             matches = []
             rotation_count = 0
             best_block = None
+            analysis_type = "pdf_ocr"
 
-            # 4 defa döndürme denemesi
-            for attempt in range(4):
-                text = PDFAnalysisService.extract_text_with_tesseract(working_file)
-                if not text:
-                    continue
+            # Önce gömülü metin katmanı - vektörel CAD çıktılarında OCR gerekmez
+            native_text, ocr_pages = PDFTextLayer.split(file_path)
+            if native_text:
+                matches, best_block = PDFAnalysisService._select_matches(
+                    PDFAnalysisService.get_all_material_blocks(native_text)
+                )
+                if matches:
+                    analysis_type = "pdf_text_layer"
 
-                blocks = PDFAnalysisService.get_all_material_blocks(text)
+            # Metni olmayan sayfalar: yön önce tespit edilir, OCR yalnızca aday yönlerde
+            if not matches and ocr_pages != []:
+                first_page = ocr_pages[0] if ocr_pages else 1
+                for rotation in OrientationService.candidates(file_path, page=first_page):
+                    # Önce yalnızca antet bölgesi (OpenCV yerleşim tespiti), bulunamazsa tam sayfa
+                    title_text = TitleBlockService.text(file_path, ocr_pages, rotation=rotation)
+                    if title_text:
+                        matches, best_block = PDFAnalysisService._select_matches(
+                            PDFAnalysisService.get_all_material_blocks(title_text)
+                        )
+                        if matches:
+                            analysis_type = "pdf_title_block"
+                            rotation_count = rotation // 90
+                            break
 
-                if blocks:
-                    for block_text, found_materials in blocks:
-                        found_100 = [m for m in found_materials if "%100" in m]
-                        if found_100:
-                            # 6061 önceliği
-                            if any("6061" in m for m in found_100):
-                                matches = [m for m in found_100 if "6061" in m]
-                                best_block = block_text
-                                break
-                            elif not matches:
-                                matches = found_100
-                                best_block = block_text
+                    text = PDFAnalysisService.extract_text_with_tesseract(
+                        file_path, rotation=rotation, page_numbers=ocr_pages
+                    )
+                    if not text:
+                        continue
 
+                    matches, best_block = PDFAnalysisService._select_matches(
+                        PDFAnalysisService.get_all_material_blocks(text)
+                    )
                     if matches:
-                        matches = list(dict.fromkeys(matches))
+                        rotation_count = rotation // 90
                         break
 
-                # Eşleşme yoksa döndür
-                temp_rotated = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-                temp_rotated.close()
-                PDFAnalysisService.rotate_pdf_90_deg(working_file, temp_rotated.name)
-                working_file = temp_rotated.name
-                rotation_count += 1
-
-            # Temizlik
-            if working_file != file_path and os.path.exists(working_file):
-                os.unlink(working_file)
+                    # Sayfa bu yönde okunabiliyorsa malzeme bilgisi yoktur - ters yön denenmez
+                    if OCRService.readable(PageRasterCache.pages(file_path, dpi=300, last_page=2, rotation=rotation,
+                                                                 page_numbers=ocr_pages)):
+                        print(f"[OCR] 📖 Sayfa {rotation}° yönünde okunabilir, malzeme yok - diğer yön atlandı")
+                        break
 
             return {
                 "success": True,
@@ -227,7 +256,7 @@ class PDFAnalysisService:
                 "matches": matches,
                 "best_block": best_block,
                 "rotation_count": rotation_count,
-                "analysis_type": "pdf_ocr"
+                "analysis_type": analysis_type
             }
 
         except Exception as e:
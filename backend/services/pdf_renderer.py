@@ -4,14 +4,14 @@ import uuid
 import tempfile
 from typing import Dict, List, Any, Optional
 from PIL import Image, ImageDraw, ImageFont, ImageEnhance
-from pdf2image import convert_from_path
-import pytesseract
 import cv2
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib.patches import Rectangle
 import re
+from services.page_raster import PageRasterCache
+from services.page_ocr import OCRService
 
 
 class PDFRendererEnhanced:
@@ -57,15 +57,10 @@ class PDFRendererEnhanced:
             print(f"[PDF-RENDER] 📄 Starting comprehensive PDF rendering: {pdf_path}")
             print(f"[PDF-RENDER] 📁 Output directory: {session_output_dir}")
             
-            # Convert PDF to images
+            # Page images come from the shared raster cache (opened lazily from disk)
             try:
                 dpi = self.dpi_high if high_quality else self.dpi_standard
-                pages = convert_from_path(
-                    pdf_path, 
-                    dpi=dpi, 
-                    first_page=1, 
-                    last_page=self.max_pages
-                )
+                pages = PageRasterCache.pages(pdf_path, dpi=dpi, first_page=1, last_page=self.max_pages)
                 print(f"[PDF-RENDER] ✅ PDF converted to {len(pages)} images")
             except Exception as e:
                 print(f"[PDF-RENDER] ❌ Failed to convert PDF: {e}")
@@ -194,15 +189,8 @@ class PDFRendererEnhanced:
             annotated_files = []
             
             for i, page in enumerate(pages):
-                # Perform OCR with bounding boxes
-                page_np = np.array(page)
-                
-                # Get OCR data with bounding boxes
-                ocr_data = pytesseract.image_to_data(
-                    page, 
-                    lang='tur+eng',
-                    output_type=pytesseract.Output.DICT
-                )
+                # Shared per-page OCR result (words with boxes and confidences)
+                ocr = OCRService.page(page)
                 
                 # Create annotated image
                 annotated_img = page.copy()
@@ -214,14 +202,11 @@ class PDFRendererEnhanced:
                     font = ImageFont.load_default()
                 
                 # Draw bounding boxes around detected text
-                n_boxes = len(ocr_data['level'])
-                for j in range(n_boxes):
-                    confidence = int(ocr_data['conf'][j])
+                n_boxes = len(ocr.words)
+                for word in ocr.words:
+                    confidence = word['conf']
                     if confidence > 30:  # Only show confident detections
-                        x = ocr_data['left'][j]
-                        y = ocr_data['top'][j]
-                        w = ocr_data['width'][j]
-                        h = ocr_data['height'][j]
+                        x, y, w, h = word['left'], word['top'], word['width'], word['height']
                         
                         # Color code by confidence
                         if confidence > 80:
@@ -277,12 +262,8 @@ class PDFRendererEnhanced:
             ]
             
             for i, page in enumerate(pages):
-                # Perform OCR to get text and positions
-                ocr_data = pytesseract.image_to_data(
-                    page, 
-                    lang='tur+eng',
-                    output_type=pytesseract.Output.DICT
-                )
+                # Text and positions from the shared per-page OCR result
+                ocr = OCRService.page(page)
                 
                 # Create highlighted image
                 highlighted_img = page.copy()
@@ -296,19 +277,15 @@ class PDFRendererEnhanced:
                 material_found = []
                 
                 # Look for material keywords
-                n_boxes = len(ocr_data['level'])
-                for j in range(n_boxes):
-                    text = ocr_data['text'][j].lower().strip()
-                    confidence = int(ocr_data['conf'][j])
+                for word in ocr.words:
+                    text = word['text'].lower()
+                    confidence = word['conf']
                     
                     if confidence > 30 and text:
                         # Check if text contains material keywords
                         for keyword in material_keywords:
                             if keyword in text:
-                                x = ocr_data['left'][j]
-                                y = ocr_data['top'][j]
-                                w = ocr_data['width'][j]
-                                h = ocr_data['height'][j]
+                                x, y, w, h = word['left'], word['top'], word['width'], word['height']
                                 
                                 # Highlight material text
                                 draw.rectangle([x-2, y-2, x + w + 2, y + h + 2], 
@@ -0,0 +1,67 @@
+# services/pdf_text_layer.py - Native PDF text layer before OCR
+#
+# CAD'den vektörel olarak export edilen çizimlerde gerçek bir metin katmanı bulunur;
+# bu sayfalar için rasterize + Tesseract gerekmez. Metin PyPDF2 ile sayfa başına
+# çıkarılır ve kullanılabilirliği kontrol edilir (yeterli harf/rakam, ToUnicode eşlemesi
+# olmayan fontlardan gelen bozuk karakterler değil). Yalnızca metni kullanılamayan
+# sayfalar OCR'a gider.
+from typing import List, Optional, Tuple
+import PyPDF2
+from config import Config
+from services.metrics import stage_timer
+
+
+class PDFTextLayer:
+    """Sayfa metin katmanı ve OCR gerektiren sayfalar"""
+
+    @staticmethod
+    def page_texts(pdf_path: str, max_pages: int = 2) -> Optional[List[str]]:
+        """İlk max_pages sayfanın gömülü metni (PDF okunamazsa None)"""
+        try:
+            with stage_timer("pdf_text_layer"):
+                reader = PyPDF2.PdfReader(pdf_path)
+                texts = []
+                for page in reader.pages[:max_pages]:
+                    try:
+                        texts.append(page.extract_text() or "")
+                    except Exception:
+                        texts.append("")
+                return texts
+        except Exception as e:
+            print(f"[TEXT-LAYER] ⚠️ Metin katmanı okunamadı: {e}")
+            return None
+
+    @staticmethod
+    def is_usable(text: str) -> bool:
+        """Metin OCR yerine kullanılabilir mi (yeterli harf/rakam, çoğunluğu okunabilir karakter)"""
+        if not text:
+            return False
+        visible = [c for c in text if not c.isspace()]
+        alphanumeric = sum(c.isalnum() for c in visible)
+        if alphanumeric < Config.TEXT_LAYER_MIN_CHARS:
+            return False
+        readable = sum(c.isalnum() or c in ".,:;-_/()[]%+*=°Ø±'\"#&<>" for c in visible)
+        return readable / len(visible) >= 0.8
+
+    @classmethod
+    def split(cls, pdf_path: str, max_pages: int = 2) -> Tuple[str, Optional[List[int]]]:
+        """
+        Gömülü metin ve OCR'lanması gereken sayfalar
+
+        Returns:
+            (kullanılabilir sayfaların birleşik metni, OCR sayfa numaraları -
+             metin katmanı okunamadıysa None = ilk max_pages sayfanın tamamı)
+        """
+        texts = cls.page_texts(pdf_path, max_pages)
+        if texts is None:
+            return "", None
+
+        native, ocr_pages = [], []
+        for number, text in enumerate(texts, start=1):
+            if cls.is_usable(text):
+                native.append(text)
+            else:
+                ocr_pages.append(number)
+        if native:
+            print(f"[TEXT-LAYER] 📝 {len(native)}/{len(texts)} sayfa gömülü metinden okundu")
+        return "\n".join(native), ocr_pages
@@ -0,0 +1,123 @@
+# services/render_on_demand.py - Render-on-miss for individual STEP views
+#
+# Lazy render modunda analiz yalnızca izometrik görünümü üretir. İstenen görünüm
+# kayıtta yoksa (veya dosyası silinmişse) render dizininde eksik olan tüm görünümler
+# geometri worker'ında tek STEP import'u ile render edilir (render_step_job - dizin
+# kilidi altında) ve enhanced_renders altına yazılır; sonraki istekler bu kaydı kullanır.
+# Render dizini geometri hash'ine göre paylaşıldığından (RenderStore), aynı STEP'i
+# yükleyen diğer analizler görünümü yeniden render etmeden alır.
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any
+from models.file_analysis import FileAnalysis
+from services.analysis_cache import AnalysisCacheService
+from services.geometry_worker import run_geometry_job, GeometryWorkerError
+from services.geometry_jobs import render_step_job
+from services.render_store import RenderStore
+
+VIEW_TYPES = ("isometric", "wireframe", "technical", "material", "front", "back", "left", "right", "top", "bottom")
+
+
+class OnDemandRenderService:
+    """Görünümü kayıttan döndür, yoksa render edip kaydet"""
+
+    _locks = {}                 # analysis_id -> [Lock, bekleyen sayısı]
+    _locks_guard = threading.Lock()
+
+    @classmethod
+    def get_view(cls, analysis_id: str, analysis: Dict[str, Any], view_type: str) -> Dict[str, Any]:
+        """
+        Görünüm verisini getir (cache miss ise render et)
+
+        Returns:
+            {"success": True, "view": {...}, "rendered": bool} veya
+            {"success": False, "message": str, "status": http_kodu}
+        """
+        cached = cls._existing_view(analysis, view_type)
+        if cached:
+            return {"success": True, "view": cached, "rendered": False}
+
+        if view_type not in VIEW_TYPES:
+            return {"success": False, "message": f"'{view_type}' görünümü bulunamadı", "status": 404}
+
+        step_path = cls._step_path(analysis)
+        if not step_path:
+            return {"success": False, "message": f"'{view_type}' görünümü için STEP dosyası yok", "status": 404}
+        if not os.path.exists(step_path):
+            return {"success": False, "message": "STEP dosyası sistemde bulunamadı", "status": 404}
+
+        # Aynı analizin eşzamanlı görünüm istekleri tek render işini bekler
+        with cls._locked(analysis_id):
+            fresh = FileAnalysis.find_by_id(analysis_id) or analysis
+            cached = cls._existing_view(fresh, view_type)
+            if cached:
+                return {"success": True, "view": cached, "rendered": False}
+
+            session_id = fresh.get('render_session_id') or AnalysisCacheService._get_render_session_id(fresh) or analysis_id
+            # Aynı geometriyi paylaşan başka bir analiz bu görünümü zaten üretmiş olabilir
+            view = RenderStore.lookup_view(session_id, view_type)
+            rendered = view is None
+            # İş ve kayıt güncellemesi boyunca dizin, başka bir analizin silinmesiyle kaldırılmaz
+            with RenderStore.claim(session_id):
+                if rendered:
+                    print(f"[LAZY-RENDER] 🎨 {view_type} görünümü (ve eksik diğerleri) render ediliyor: {analysis_id}")
+                    try:
+                        render_result = run_geometry_job(render_step_job, step_path, session_id, model_files=False)
+                    except GeometryWorkerError as e:
+                        print(f"[LAZY-RENDER] ❌ {view_type} render hatası: {e}")
+                        return {"success": False, "message": f"Render hatası: {str(e)}", "status": 500}
+
+                    if not render_result.get('success'):
+                        return {"success": False, "message": f"Render başarısız: {render_result.get('message')}",
+                                "status": 500}
+                    renders = {
+                        name: result for name, result in render_result.get('renders', {}).items()
+                        if isinstance(result, dict) and result.get('success')
+                    }
+                    view = renders.get(view_type)
+                    if view is None:
+                        error = (render_result['renders'].get(view_type) or {}).get('error', 'görünüm üretilmedi')
+                        return {"success": False, "message": f"Render başarısız: {error}", "status": 500}
+                else:
+                    renders = {view_type: view}
+
+                update_data = {f"enhanced_renders.{name}": result for name, result in renders.items()}
+                if not fresh.get('render_session_id'):
+                    update_data["render_session_id"] = session_id
+                FileAnalysis.update_analysis(analysis_id, update_data)
+            print(f"[LAZY-RENDER] ✅ {view_type} görünümü hazır: {view.get('file_path')}")
+            return {"success": True, "view": view, "rendered": rendered}
+
+    @staticmethod
+    def _existing_view(analysis: Dict[str, Any], view_type: str):
+        """Kayıttaki başarılı ve diskte mevcut görünüm (yoksa None)"""
+        view = (analysis.get('enhanced_renders') or {}).get(view_type)
+        if not view or not view.get('success') or not view.get('file_path'):
+            return None
+        if not os.path.exists(RenderStore.resolve_path(view['file_path'])):
+            return None
+        return view
+
+    @staticmethod
+    def _step_path(analysis: Dict[str, Any]):
+        """STEP dosyası: doğrudan yüklenen veya PDF'den çıkarılan"""
+        if analysis.get('file_type') in ('step', 'stp'):
+            return analysis.get('file_path')
+        return analysis.get('extracted_step_path')
+
+    @classmethod
+    @contextmanager
+    def _locked(cls, analysis_id: str):
+        """Analiz başına kilit - bekleyen kalmayınca sözlükten silinir"""
+        with cls._locks_guard:
+            entry = cls._locks.setdefault(analysis_id, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with cls._locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del cls._locks[analysis_id]
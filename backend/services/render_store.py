@@ -0,0 +1,333 @@
+# services/render_store.py - Content-addressed render store shared across analyses
+#
+# Render dizini STEP içerik hash'i + render parametrelerinden türetilir
+# (static/stepviews/geo_<hash>_<parametre özeti>); aynı geometriyi yükleyen tüm
+# analizler aynı dizini referans alır. Dizindeki renders.json, tamamlanmış render
+# sonucunu, kapsadığı görünümleri ve model dosyalarının üretilip üretilmediğini saklar:
+# aynı anahtar için ikinci iş yalnızca eksik görünümleri render edip sonuca ekler.
+#
+# Referans sayımı veritabanından yapılır (render_session_id alanı); analiz silinince
+# başka referans kalmayan dizinler kaldırılır. Kilidi tutulan (render sürüyor) veya
+# işaretli (claim - render bitti, kayıt henüz güncellenmedi) dizinler silinmez.
+import os
+import json
+import time
+import uuid
+import shutil
+import tempfile
+import hashlib
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Tuple
+from config import Config
+
+try:
+    import fcntl
+except ImportError:     # Windows - kilit yalnızca süreç içi çakışmalarda önemlidir
+    fcntl = None
+
+STORE_VERSION = 1
+MANIFEST_NAME = "renders.json"
+CLAIM_PREFIX = ".claim-"
+# generate_comprehensive_views sonucunda model dosyalarına ait alanlar
+MODEL_KEYS = ("model_3d", "viewer_html", "stl_path", "obj_path", "ply_path", "glb_path")
+
+
+class RenderStore:
+    """Geometri hash'ine göre paylaşılan render dizinleri"""
+
+    BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    STATIC_DIR = os.path.join(BACKEND_DIR, "static")
+    STEPVIEWS_DIR = os.path.join(STATIC_DIR, "stepviews")
+    MESH_DIR = os.path.join(STATIC_DIR, "meshes")
+
+    @staticmethod
+    def session_id(step_hash: Optional[str], include_dimensions=True, include_materials=True,
+                   high_quality=True) -> Optional[str]:
+        """Hash + render parametrelerinden dizin adı (hash yoksa None)"""
+        if not step_hash:
+            return None
+        parameters = {
+            "version": STORE_VERSION,
+            "mode": Config.RENDER_MODE,
+            "style": Config.RENDER_STYLE,
+            "shading": Config.RENDER_SHADING,
+            "svg": Config.RENDER_SVG,
+            "dimensions": bool(include_dimensions),
+            "materials": bool(include_materials),
+            "high_quality": bool(high_quality)
+        }
+        digest = hashlib.sha256(json.dumps(parameters, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"geo_{step_hash[:32]}_{digest[:10]}"
+
+    @classmethod
+    @contextmanager
+    def lock(cls, session_id: str):
+        """Aynı render dizinine yazan işleri (worker süreçleri arasında) sıraya sok"""
+        session_dir = os.path.join(cls.STEPVIEWS_DIR, session_id)
+        os.makedirs(session_dir, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(session_dir, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @classmethod
+    @contextmanager
+    def claim(cls, session_id: str):
+        """
+        Dizini blok süresince silinmeye karşı işaretle
+
+        Render işi kilidi bıraktıktan sonra analiz kaydı güncellenene kadar dizine
+        referans yoktur; bu aralıkta release dizini silmesin diye iş + kayıt
+        güncellemesi bu blokta yapılır.
+        """
+        session_dir = os.path.join(cls.STEPVIEWS_DIR, session_id)
+        os.makedirs(session_dir, exist_ok=True)
+        marker = os.path.join(session_dir, f"{CLAIM_PREFIX}{os.getpid()}-{uuid.uuid4().hex}")
+        open(marker, "w").close()
+        try:
+            yield
+        finally:
+            try:
+                os.remove(marker)
+            except OSError:
+                pass
+
+    @staticmethod
+    def reserve(analysis_id: Optional[str], session_id: Optional[str]):
+        """Render işi başlamadan dizin referansını analiz kaydına yaz (analiz sürerken silinmesin)"""
+        from models.file_analysis import FileAnalysis
+
+        if analysis_id and session_id:
+            FileAnalysis.update_analysis(analysis_id, {"render_session_id": session_id})
+
+    @classmethod
+    def resolve_path(cls, file_path: str) -> str:
+        """Render sonucundaki göreli yol (../static/... veya static/...) -> mutlak yol"""
+        relative = file_path.replace("\\", "/")
+        while relative.startswith("../"):
+            relative = relative[3:]
+        return os.path.join(cls.BACKEND_DIR, relative)
+
+    # ===== RENDER SONUCU =====
+
+    @classmethod
+    def load_renders(cls, session_id: str) -> Optional[Dict[str, Any]]:
+        """Saklanan render sonucu - dosyalardan biri eksikse None"""
+        try:
+            with open(cls._manifest_path(session_id), "r", encoding="utf-8") as f:
+                render_result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        for view in render_result.get("renders", {}).values():
+            if isinstance(view, dict) and view.get("success") and view.get("file_path") and \
+                    not os.path.exists(cls.resolve_path(view["file_path"])):
+                return None
+        return render_result
+
+    @staticmethod
+    def missing(render_result: Dict[str, Any], views: List[str], model_files: bool) -> Tuple[List[str], bool]:
+        """
+        Saklanan sonucun kapsamadığı görünümler ve model dosyaları
+
+        Returns:
+            (eksik görünümler, model dosyaları eksik mi)
+        """
+        stored_views = RenderStore._views(render_result)
+        return ([view for view in views if view not in stored_views],
+                bool(model_files) and not RenderStore._has_model_files(render_result))
+
+    @classmethod
+    def save_renders(cls, session_id: str, render_result: Dict[str, Any], views: List[str], model_files: bool,
+                     stored: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Başarılı render sonucunu dizine yaz (RenderStore.lock(session_id) altında çağrılır)
+
+        Args:
+            views: Render edilen görünümler
+            model_files: Model dosyaları (STL/OBJ/PLY/GLB ve viewer) üretildi mi
+            stored: Verilirse yeni görünümler ve model dosyaları bu sonuca eklenir
+
+        Returns:
+            Dizindeki (birleştirilmiş) sonuç; render başarısızsa render_result
+        """
+        if not render_result or not render_result.get("success"):
+            return render_result
+        # Başarısız görünümler kapsanmış sayılmaz - sonraki iş yeniden dener
+        renders = render_result.get("renders", {})
+        views = [view for view in views if isinstance(renders.get(view), dict) and renders[view].get("success")]
+        if stored:
+            merged = dict(stored)
+            merged["renders"] = dict(stored.get("renders", {}), **render_result.get("renders", {}))
+            stored_views = cls._views(stored)
+            merged["views"] = stored_views + [view for view in views if view not in stored_views]
+            if model_files:
+                for key in MODEL_KEYS:
+                    merged[key] = render_result.get(key)
+            merged["model_files"] = bool(model_files) or cls._has_model_files(stored)
+            merged["total_views"] = len(merged["renders"])
+            render_result = merged
+        else:
+            render_result = dict(render_result, views=list(views), model_files=bool(model_files))
+        cls._write_manifest(session_id, render_result)
+        return render_result
+
+    @classmethod
+    def lookup_view(cls, session_id: str, view_type: str) -> Optional[Dict[str, Any]]:
+        """Başka bir analiz için daha önce render edilmiş görünüm"""
+        render_result = cls.load_renders(session_id)
+        view = (render_result or {}).get("renders", {}).get(view_type)
+        return view if isinstance(view, dict) and view.get("success") else None
+
+    # ===== REFERANS SAYIMI =====
+
+    @classmethod
+    def release(cls, analysis: Dict[str, Any]) -> list:
+        """
+        Silinmiş analizin dizinlerini, başka analiz referans vermiyorsa kaldır
+
+        Kayıt veritabanından silindikten sonra çağrılmalıdır.
+
+        Returns:
+            Kaldırılan dizinler
+        """
+        from services.analysis_cache import AnalysisCacheService
+
+        candidates = []
+        session_id = analysis.get('render_session_id') or AnalysisCacheService._get_render_session_id(analysis)
+        if session_id:
+            candidates.append((os.path.join(cls.STEPVIEWS_DIR, session_id), [("render_session_id", session_id)]))
+        # Analize özel dizin (STL, mesh.json)
+        candidates.append((os.path.join(cls.STEPVIEWS_DIR, analysis['id']), [("render_session_id", analysis['id'])]))
+        if analysis.get('pdf_analysis_id'):
+            pdf_id = analysis['pdf_analysis_id']
+            candidates.append((os.path.join(cls.STEPVIEWS_DIR, pdf_id),
+                               [("pdf_analysis_id", pdf_id), ("render_session_id", pdf_id)]))
+        if analysis.get('step_file_hash'):
+            step_hash = analysis['step_file_hash']
+            candidates.append((os.path.join(cls.MESH_DIR, step_hash), [("step_file_hash", step_hash)]))
+
+        removed = []
+        for path, references in candidates:
+            if path not in removed and cls._remove_unreferenced(path, references):
+                removed.append(path)
+
+        if removed:
+            print(f"[RENDER-STORE] 🗑️ Referanssız {len(removed)} dizin kaldırıldı: "
+                  f"{', '.join(os.path.basename(path) for path in removed)}")
+        return removed
+
+    @classmethod
+    def release_session(cls, session_id: Optional[str]) -> bool:
+        """Yeniden render sonrası bırakılan eski oturum dizinini, referansı kalmadıysa kaldır"""
+        if not session_id:
+            return False
+        path = os.path.join(cls.STEPVIEWS_DIR, session_id)
+        if cls._remove_unreferenced(path, [("render_session_id", session_id), ("pdf_analysis_id", session_id)]):
+            print(f"[RENDER-STORE] 🗑️ Eski render dizini kaldırıldı: {session_id}")
+            return True
+        return False
+
+    # ===== YARDIMCI =====
+
+    @classmethod
+    def _remove_unreferenced(cls, path, references):
+        """
+        Dizini, references içindeki (alan, değer) çiftlerinden hiçbiri kullanılmıyorsa sil
+
+        Referans kontrolü ve silme dizin kilidi altında yapılır; kilit başka bir işteyse
+        veya dizin işaretliyse (claim) dizin atlanır.
+        """
+        from models.file_analysis import FileAnalysis
+
+        if not os.path.isdir(path):
+            return False
+        with cls._try_lock(path) as locked:
+            if not locked or cls._claimed(path):
+                print(f"[RENDER-STORE] ⏳ Dizin kullanımda, atlandı: {os.path.basename(path)}")
+                return False
+            if any(FileAnalysis.count_references(field, value) for field, value in references):
+                return False
+            shutil.rmtree(path, ignore_errors=True)
+        return True
+
+    @staticmethod
+    @contextmanager
+    def _try_lock(path):
+        """Dizin kilidini beklemeden almayı dene - kilit alındıysa True"""
+        if fcntl is None:
+            yield True
+            return
+        try:
+            lock_file = open(os.path.join(path, ".lock"), "a")
+        except OSError:
+            lock_file = None
+        if lock_file is None:
+            yield False
+            return
+        with lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                locked = True
+            except OSError:
+                locked = False
+            try:
+                yield locked
+            finally:
+                if locked:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _claimed(path):
+        """Dizinde güncel claim işareti var mı (çöken süreçlerden kalan eski işaretler sayılmaz)"""
+        cutoff = time.time() - 2 * Config.GEOMETRY_JOB_TIMEOUT
+        try:
+            names = os.listdir(path)
+        except OSError:
+            return False
+        for name in names:
+            if not name.startswith(CLAIM_PREFIX):
+                continue
+            try:
+                if os.path.getmtime(os.path.join(path, name)) > cutoff:
+                    return True
+            except OSError:
+                continue
+        return False
+
+    @staticmethod
+    def _views(render_result):
+        """Sonucun kapsadığı görünümler (views alanı olmayan eski sonuçlarda renders anahtarları)"""
+        views = render_result.get("views")
+        return list(render_result.get("renders", {})) if views is None else list(views)
+
+    @staticmethod
+    def _has_model_files(render_result):
+        return render_result.get("model_files", bool(render_result.get("stl_path")))
+
+    @classmethod
+    def _manifest_path(cls, session_id):
+        return os.path.join(cls.STEPVIEWS_DIR, session_id, MANIFEST_NAME)
+
+    @classmethod
+    def _write_manifest(cls, session_id, render_result):
+        """
+        renders.json'u atomik yaz - çağıran RenderStore.lock(session_id) tutmalıdır
+        (oku-birleştir-yaz adımları başka bir işin yazdığı görünümü kaybetmesin)
+        """
+        path = cls._manifest_path(session_id)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(render_result, f)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
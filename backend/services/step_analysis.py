@@ -0,0 +1,144 @@
+# services/step_analysis.py - STEP geometry analysis (dimensions, volumes, stock)
+from services.step_context import StepShapeContext
+from services.orientation_engine import OrientationEngine
+from services.stock_fitter import StockFitter, always_round_up
+from services.analysis_events import report_progress
+from services.metrics import stage_timer
+import time
+
+
+class StepGeometryAnalyzer:
+    """
+    STEP geometri analizi.
+
+    Veritabanı veya OCR bağımlılığı yoktur; bu sayede geometri worker süreçlerinde
+    MaterialAnalysisService yüklenmeden çalıştırılabilir.
+    """
+
+    @classmethod
+    def analyze(cls, step_path, context=None):
+        """STEP dosyası analizi - boyutlar, hacimler, yüzey alanı ve stok alternatifleri
+
+        context verilirse önceden import edilmiş şekil kullanılır.
+        """
+        try:
+            print(f"[DEBUG] STEP analizi başlıyor: {step_path}")
+            
+            if context is None:
+                context = StepShapeContext.load(step_path)
+            if not context.objects:
+                return {"error": "STEP dosyasında obje yok"}
+            
+            # Ana şekil + kesişen şekillerden oluşan compound
+            shapes = context.objects
+            relevant_shapes = context.relevant_shapes
+            
+            # Optimal yönlendirme bulma - 24 eksen hizalı yönelim kesin bounding box üzerinden
+            print("[DEBUG] Optimal yönlendirme hesaplanıyor...")
+            
+            orientation_start = time.time()
+            part_bbox = context.compound_bounding_box
+            with stage_timer("orientation_search"):
+                orientation = OrientationEngine.find_best_orientation(
+                    (part_bbox.xlen, part_bbox.ylen, part_bbox.zlen)
+                )
+            best_dims = orientation["dimensions"]
+            report_progress(
+                "orientation", duration=time.time() - orientation_start,
+                evaluated_orientations=orientation["evaluated_orientations"],
+                dimensions=[round(d, 3) for d in best_dims]
+            )
+            dimensions_start = time.time()
+            
+            # Boyutları al
+            x, y, z = best_dims
+            
+            # Padding ekleme
+            x_pad = always_round_up(x + 10.0)
+            y_pad = always_round_up(y + 10.0)
+            z_pad = always_round_up(z + 10.0)
+            
+            # Hacim hesaplamaları
+            volume_padded = x_pad * y_pad * z_pad
+            product_volume = context.compound_volume
+            waste_volume = volume_padded - product_volume
+            waste_ratio = (waste_volume / volume_padded * 100) if volume_padded > 0 else 0.0
+            total_surface_area = context.compound_area
+            
+            # Silindirik boyutlar
+            cylindrical_diameter = max(x, y)
+            cylindrical_height = z
+            
+            # Convex hull tabanlı alternatif stoklar (OBB + silindir)
+            with stage_timer("stock_fit"):
+                vertices, _ = context.tessellate(lod="analysis", target="compound")
+                stock_fit = cls._fit_stock(vertices, product_volume)
+            
+            print(f"[SUCCESS] STEP analizi tamamlandı - X:{x:.1f}, Y:{y:.1f}, Z:{z:.1f}")
+            
+            analysis = {
+                **stock_fit,
+                "X (mm)": round(x, 3),
+                "Y (mm)": round(y, 3),
+                "Z (mm)": round(z, 3),
+                "Silindirik Çap (mm)": round(cylindrical_diameter, 3),
+                "Silindirik Yükseklik (mm)": round(cylindrical_height, 3),
+                "X+Pad (mm)": round(x_pad, 3),
+                "Y+Pad (mm)": round(y_pad, 3),
+                "Z+Pad (mm)": round(z_pad, 3),
+                "Prizma Hacmi (mm³)": round(volume_padded, 3),
+                "Ürün Hacmi (mm³)": round(product_volume, 3),
+                "Talaş Hacmi (mm³)": round(waste_volume, 3),
+                "Talaş Oranı (%)": round(waste_ratio, 2),
+                "Toplam Yüzey Alanı (mm²)": round(total_surface_area, 3),
+                "shape_count": len(shapes),
+                "relevant_shape_count": len(relevant_shapes),
+                "optimization_iterations": orientation["evaluated_orientations"],
+                "method": "cadquery_analysis"
+            }
+            report_progress("dimensions", duration=time.time() - dimensions_start, step_analysis=analysis)
+            return analysis
+            
+        except Exception as e:
+            import traceback
+            print(f"[ERROR] STEP analizi hatası: {str(e)}")
+            print(f"[TRACEBACK] {traceback.format_exc()}")
+            return {"error": f"STEP analiz hatası: {str(e)}"}
+    
+    @staticmethod
+    def _fit_stock(vertices, product_volume):
+        """Yaklaşık minimum hacimli OBB ve çevreleyen silindir stok boyutları (hata durumunda boş)"""
+        try:
+            fit = StockFitter.fit(vertices)
+            obb = fit["obb"]
+            cylinder = fit["cylinder"]
+            
+            print(f"[STOCK] 📦 OBB: {obb['padded_volume']:.0f} mm³, "
+                  f"Silindir: Ø{cylinder['padded_diameter']} x {cylinder['padded_height']} mm")
+            
+            return {
+                "Min. Prizma X (mm)": round(obb["dimensions"][0], 3),
+                "Min. Prizma Y (mm)": round(obb["dimensions"][1], 3),
+                "Min. Prizma Z (mm)": round(obb["dimensions"][2], 3),
+                "Min. Prizma X+Pad (mm)": obb["padded_dimensions"][0],
+                "Min. Prizma Y+Pad (mm)": obb["padded_dimensions"][1],
+                "Min. Prizma Z+Pad (mm)": obb["padded_dimensions"][2],
+                "Min. Prizma Hacmi (mm³)": round(obb["padded_volume"], 3),
+                "Silindir Çapı (mm)": round(cylinder["diameter"], 3),
+                "Silindir Yüksekliği (mm)": round(cylinder["height"], 3),
+                "Silindir Çapı+Pad (mm)": cylinder["padded_diameter"],
+                "Silindir Yüksekliği+Pad (mm)": cylinder["padded_height"],
+                "Silindir Hacmi (mm³)": round(cylinder["padded_volume"], 3),
+                "Silindir Talaş Hacmi (mm³)": round(cylinder["padded_volume"] - product_volume, 3),
+                "stock_fit": {
+                    "obb_axes": obb["axes"],
+                    "cylinder_axis": cylinder["axis"],
+                    "hull_point_count": fit["hull_point_count"],
+                    "candidate_axis_count": fit["candidate_axis_count"],
+                    "method": "convex_hull_candidate_axes",
+                    "approximate": True
+                }
+            }
+        except Exception as e:
+            print(f"[STOCK] ⚠️ Stok uydurma hatası: {e}")
+            return {}
@@ -0,0 +1,167 @@
+# services/step_context.py - Shared loaded STEP shape context
+import time
+import hashlib
+import cadquery as cq
+from services.metrics import record_stage
+from services.tessellation import TessellationService
+
+
+class StepShapeContext:
+    """
+    Bir STEP dosyasının tek seferlik import sonucu.
+
+    Analiz, rendering ve export aşamaları aynı context'i paylaşır; böylece OCCT dosyayı
+    yalnızca bir kez parse eder. BoundingBox, hacim, alan ve tessellation ilk kullanımda
+    hesaplanıp saklanır.
+    """
+
+    def __init__(self, step_path, assembly, import_time=None):
+        self.step_path = step_path
+        self.assembly = assembly
+        self.import_time = import_time
+        self._cache = {}
+        self._meshes = {}
+
+    @classmethod
+    def load(cls, step_path):
+        """STEP dosyasını import et ve context oluştur"""
+        start_time = time.time()
+        assembly = cq.importers.importStep(step_path)
+        import_time = time.time() - start_time
+        record_stage("step_import", import_time)
+        print(f"[STEP-CONTEXT] 📥 STEP import edildi ({import_time:.2f}s): {step_path}")
+        return cls(step_path, assembly, import_time)
+
+    def _memo(self, key, factory):
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+    # ===== TÜM ŞEKİL (render / export) =====
+
+    @property
+    def objects(self):
+        return self.assembly.objects
+
+    @property
+    def shape_hash(self):
+        """STEP içeriğinin SHA-256 özeti - aynı geometri için süreçler arası sabit anahtar"""
+        def digest():
+            sha256 = hashlib.sha256()
+            with open(self.step_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    sha256.update(chunk)
+            return sha256.hexdigest()
+        return self._memo("shape_hash", digest)
+
+    @property
+    def shape(self):
+        return self._memo("shape", self.assembly.val)
+
+    @property
+    def render_shape(self):
+        """Tüm objelerin compound'u - CadQuery exporter'larının Workplane için kullandığı şekil"""
+        return self._memo("render_shape", lambda: cq.Compound.makeCompound(
+            [obj for obj in self.objects if isinstance(obj, cq.Shape)]
+        ))
+
+    def edge_projection(self, direction, hidden_lines=True):
+        """
+        render_shape'in kenar projeksiyonu (EdgeProjection) - yön başına bir kez hesaplanır
+
+        hidden_lines=True: HLR ile görünen / gizli kenarlar, False: tüm kenarlar (wireframe)
+        """
+        from services.edge_raster import EdgeProjection
+        if hidden_lines:
+            return self._memo(("hlr", tuple(direction)), lambda: EdgeProjection.from_shape(self.render_shape, direction))
+        return self._memo(("edges", tuple(direction)), lambda: EdgeProjection.from_edges(self.render_shape, direction))
+
+    @property
+    def bounding_box(self):
+        return self._memo("bounding_box", lambda: self.shape.BoundingBox())
+
+    @property
+    def volume(self):
+        return self._memo("volume", lambda: self.shape.Volume())
+
+    @property
+    def area(self):
+        return self._memo("area", lambda: self.shape.Area())
+
+    # ===== ANALİZ COMPOUND'U (ana gövde + kesişen gövdeler) =====
+
+    @property
+    def relevant_shapes(self):
+        return self._memo("relevant_shapes", self._select_relevant_shapes)
+
+    @property
+    def compound(self):
+        return self._memo("compound", lambda: cq.Compound.makeCompound(self.relevant_shapes))
+
+    @property
+    def compound_bounding_box(self):
+        return self._memo("compound_bounding_box", lambda: self.compound.BoundingBox())
+
+    @property
+    def compound_volume(self):
+        return self._memo("compound_volume", lambda: self.compound.Volume())
+
+    @property
+    def compound_area(self):
+        return self._memo("compound_area", lambda: self.compound.Area())
+
+    def _select_relevant_shapes(self):
+        """En büyük gövde ve onun bounding box'ı ile kesişen gövdeler"""
+        sorted_shapes = sorted(self.objects, key=lambda s: s.Volume(), reverse=True)
+        main_shape = sorted_shapes[0]
+        main_bbox = main_shape.BoundingBox()
+
+        relevant_shapes = [main_shape]
+        for shape in sorted_shapes[1:]:
+            bb = shape.BoundingBox()
+            intersects = (
+                bb.xmax > main_bbox.xmin and bb.xmin < main_bbox.xmax and
+                bb.ymax > main_bbox.ymin and bb.ymin < main_bbox.ymax and
+                bb.zmax > main_bbox.zmin and bb.zmin < main_bbox.zmax
+            )
+            if intersects:
+                relevant_shapes.append(shape)
+        return relevant_shapes
+
+    # ===== TESSELLATION =====
+
+    def tessellate(self, lod="analysis", target="shape", tolerance=None, angular_tolerance=None):
+        """
+        Şekli üçgenle ve NumPy dizileri olarak sakla
+
+        Args:
+            lod: "analysis" (yönlendirme / stok), "viewer_high" (export, render) veya "viewer_low";
+                sapma hedef şeklin bbox köşegenine göre seçilir
+            target: "shape" (ilk obje), "render" (tüm objeler - model export) veya "compound" (analiz compound'u)
+            tolerance, angular_tolerance: Verilirse LOD yerine sabit sapma (mm / radyan)
+
+        Returns:
+            (vertices (N, 3) float64, triangles (M, 3) int64)
+        """
+        if target == "compound":
+            source = self.compound
+        elif target == "render":
+            source = self.render_shape
+        else:
+            source = self.shape
+
+        if tolerance is None:
+            diagonal = self._memo(("diagonal", target), lambda: source.BoundingBox().DiagonalLength)
+            tolerance, default_angular = TessellationService.deflection(diagonal, lod)
+            angular_tolerance = angular_tolerance or default_angular
+        angular_tolerance = angular_tolerance or 0.1
+
+        key = (target, tolerance, angular_tolerance)
+        if key not in self._meshes:
+            start_time = time.time()
+            self._meshes[key] = TessellationService.mesh(source, tolerance, angular_tolerance)
+            vertices, triangles = self._meshes[key]
+            record_stage("tessellation", time.time() - start_time)
+            print(f"[STEP-CONTEXT] 🔺 Tessellation ({target}, {lod}, {tolerance:.4f} mm): {len(vertices)} vertex, "
+                  f"{len(triangles)} üçgen ({time.time() - start_time:.2f}s)")
+        return self._meshes[key]
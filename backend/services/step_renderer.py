@@ -2,27 +2,62 @@
 
 import os
 import uuid
-import cadquery as cq
-from cadquery import exporters
 from PIL import Image, ImageDraw, ImageFont
-import cairosvg
-import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from matplotlib.patches import Rectangle
-import matplotlib.patches as mpatches
-import trimesh
-import hashlib
+import time
+import shutil
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from config import Config
+from services.mesh_raster import ShadedMesh
+from services.line_drawing import LineDrawing
+from services.mesh_export import MeshBuffers
+from services.step_context import StepShapeContext
+from services.analysis_events import report_progress, progress_sink
+from services.metrics import stage_timer, timed, record_stage, collect_stages
+
+ISOMETRIC_DIRECTION = (1, 1, 1)
+
 
 class StepRendererEnhanced:
     """Enhanced STEP renderer with 3D model generation and STL export"""
     
+    # Standard orthographic views: name -> projection direction
+    VIEW_DIRECTIONS = {
+        "front": (0, 0, 1),
+        "back": (0, 0, -1),
+        "left": (-1, 0, 0),
+        "right": (1, 0, 0),
+        "top": (0, 1, 0),
+        "bottom": (0, -1, 0)
+    }
+    
+    # Model file formats written from the shared mesh buffers
+    MODEL_FORMATS = ("stl", "obj", "ply", "glb")
+    
+    # Projection base rasters: (shape hash, direction, size) -> {image, png_path, svg_path}
+    PROJECTION_CACHE_SIZE = 32       # in-memory rasters (~3 MB each at 1200x900)
+    _projection_cache = OrderedDict()
+    _projection_lock = threading.Lock()
+    
     def __init__(self, output_dir="static/stepviews"):
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.output_dir = os.path.join(self.base_dir, "..", output_dir)
         os.makedirs(self.output_dir, exist_ok=True)
     
-    def generate_comprehensive_views(self, step_path, analysis_id=None, include_dimensions=True, include_materials=True, high_quality=True):
+    @classmethod
+    def view_types(cls, include_dimensions=True, include_materials=True):
+        """Full view set for the given annotation options, in render order"""
+        view_types = ["isometric", "wireframe"]
+        if include_dimensions:
+            view_types.append("technical")
+        if include_materials:
+            view_types.append("material")
+        return view_types + list(cls.VIEW_DIRECTIONS)
+    
+    def generate_comprehensive_views(self, step_path, analysis_id=None, include_dimensions=True, include_materials=True, high_quality=True, context=None, views=None, model_files=True):
         """
         Generate comprehensive views + 3D model export
         
@@ -32,6 +67,9 @@ class StepRendererEnhanced:
             include_dimensions: Add dimension annotations
             include_materials: Add material information
             high_quality: Generate high quality renders
+            context: Already loaded StepShapeContext (skips STEP import)
+            views: View types to render (None = full view set)
+            model_files: Generate OBJ/PLY/STL model files and the viewer HTML
             
         Returns:
             Dict with render results + 3D model paths
@@ -45,16 +83,19 @@ class StepRendererEnhanced:
             print(f"[STEP-RENDER-3D] 🎨 Starting comprehensive 3D rendering for: {step_path}")
             print(f"[STEP-RENDER-3D] 📁 Output directory: {session_output_dir}")
             
-            # Import STEP file
-            try:
-                assembly = cq.importers.importStep(step_path)
-                print(f"[STEP-RENDER-3D] ✅ STEP file imported successfully")
-            except Exception as e:
-                print(f"[STEP-RENDER-3D] ❌ Failed to import STEP file: {e}")
-                return {"success": False, "message": f"STEP import failed: {str(e)}"}
+            # Import STEP file (only when no shared context is given)
+            if context is None:
+                try:
+                    context = StepShapeContext.load(step_path)
+                    print(f"[STEP-RENDER-3D] ✅ STEP file imported successfully")
+                except Exception as e:
+                    print(f"[STEP-RENDER-3D] ❌ Failed to import STEP file: {e}")
+                    return {"success": False, "message": f"STEP import failed: {str(e)}"}
+            else:
+                print(f"[STEP-RENDER-3D] ♻️ Using shared STEP context")
             
             # Calculate bounding box and dimensions
-            bbox = assembly.val().BoundingBox()
+            bbox = context.bounding_box
             dimensions = {
                 "width": bbox.xlen,
                 "height": bbox.ylen,
@@ -64,58 +105,80 @@ class StepRendererEnhanced:
             print(f"[STEP-RENDER-3D] 📏 Dimensions: W={dimensions['width']:.2f}, H={dimensions['height']:.2f}, D={dimensions['depth']:.2f}")
             
             # ✅ GENERATE 3D MODEL FILES
-            model_result = self._generate_3d_model_files(assembly, session_output_dir, session_id)
+            model_result = {}
+            if model_files:
+                stage_start = time.time()
+                model_result = self._generate_3d_model_files(context, session_output_dir, session_id)
+                report_progress(
+                    "model_files", status="completed" if model_result.get("success") else "failed",
+                    duration=time.time() - stage_start, stl_path=model_result.get("stl_path")
+                )
             
-            # Generate multiple 2D views
-            renders = {}
+            # Generate 2D views - each distinct projection (direction, size) is computed once,
+            # annotated views are derived from the cached base raster
+            view_types = self.view_types(include_dimensions, include_materials)
+            if views is not None:
+                view_types = [view_type for view_type in view_types if view_type in views]
+            
+            # Shaded projections share one tessellation - computed here so forked render
+            # processes inherit it instead of meshing the shape each
+            if Config.RENDER_STYLE != "lines" and any(self.view_projection(v, high_quality) for v in view_types):
+                MeshBuffers.from_context(context)
+            
+            # Independent render tasks: distinct projections + non-projection views
+            tasks = []
+            waiting = {}    # projection key -> view types derived from it
+            for view_type in view_types:
+                projection = self.view_projection(view_type, high_quality)
+                if projection is None:
+                    tasks.append((view_type, "render_view", (
+                        context, view_type, session_output_dir, dimensions, include_dimensions, high_quality
+                    )))
+                    continue
+                key = self.projection_key(context, *projection)
+                if key not in waiting:
+                    waiting[key] = []
+                    tasks.append((key, "render_projection", (context, session_output_dir) + projection))
+                waiting[key].append(view_type)
+            
+            view_results = {}
+            
+            def on_result(name, result, stage_start):
+                if name not in waiting:
+                    view_results[name] = result
+                    self._report_render(name, result, stage_start)
+                    return
+                if result.get('success'):
+                    self._remember_projection(name, result)
+                for view_type in waiting[name]:
+                    if result.get('success'):
+                        view_result = self.render_view(
+                            context, view_type, session_output_dir, dimensions, include_dimensions, high_quality
+                        )
+                    else:
+                        view_result = {"success": False, "error": result.get('error')}
+                    view_results[view_type] = view_result
+                    self._report_render(view_type, view_result, stage_start)
+            
+            self._render_views(tasks, on_result)
             
-            # 1. Isometric view (main view)
-            isometric_result = self._generate_isometric_view(
-                assembly, session_output_dir, dimensions, 
-                include_dimensions, high_quality
-            )
-            if isometric_result['success']:
-                renders['isometric'] = isometric_result
-                print(f"[STEP-RENDER-3D] ✅ Isometric view generated")
-            
-            # 2. Wireframe view
-            wireframe_result = self._generate_wireframe_view(
-                assembly, session_output_dir, dimensions, high_quality
-            )
-            if wireframe_result['success']:
-                renders['wireframe'] = wireframe_result
-                print(f"[STEP-RENDER-3D] ✅ Wireframe view generated")
-            
-            # 3. Dimensioned technical drawing
-            if include_dimensions:
-                technical_result = self._generate_technical_drawing(
-                    assembly, session_output_dir, dimensions
-                )
-                if technical_result['success']:
-                    renders['technical'] = technical_result
-                    print(f"[STEP-RENDER-3D] ✅ Technical drawing generated")
-            
-            # 4. Material-annotated view
-            if include_materials:
-                material_result = self._generate_material_view(
-                    assembly, session_output_dir, dimensions
-                )
-                if material_result['success']:
-                    renders['material'] = material_result
-                    print(f"[STEP-RENDER-3D] ✅ Material view generated")
-            
-            # 5. Standard orthographic views
-            ortho_result = self._generate_orthographic_views(
-                assembly, session_output_dir, high_quality
-            )
-            if ortho_result['success']:
-                renders.update(ortho_result['views'])
-                print(f"[STEP-RENDER-3D] ✅ Orthographic views generated")
+            renders = {}
+            for view_type in view_types:
+                view_result = view_results[view_type]
+                if view_type in self.VIEW_DIRECTIONS:
+                    # Orthographic views are always listed (failed ones with their error)
+                    renders[view_type] = view_result
+                elif view_result['success']:
+                    renders[view_type] = view_result
+                    print(f"[STEP-RENDER-3D] ✅ {view_type.capitalize()} view generated")
             
             # ✅ GENERATE 3D VIEWER HTML
-            viewer_result = self._generate_3d_viewer_html(session_id, session_output_dir, dimensions)
+            viewer_result = {}
+            if model_files:
+                viewer_result = self._generate_3d_viewer_html(session_id, session_output_dir, dimensions)
             
-            print(f"[STEP-RENDER-3D] 🎉 Rendering complete! Generated {len(renders)} 2D views + 3D model")
+            print(f"[STEP-RENDER-3D] 🎉 Rendering complete! Generated {len(renders)} 2D views"
+                  f"{' + 3D model' if model_files else ''}")
             
             return {
                 "success": True,
@@ -128,7 +191,8 @@ class StepRendererEnhanced:
                 "viewer_html": viewer_result.get("viewer_path"),
                 "stl_path": model_result.get("stl_path"),
                 "obj_path": model_result.get("obj_path"),
-                "ply_path": model_result.get("ply_path")
+                "ply_path": model_result.get("ply_path"),
+                "glb_path": model_result.get("glb_path")
             }
             
         except Exception as e:
@@ -141,76 +205,98 @@ class StepRendererEnhanced:
                 "traceback": traceback.format_exc()
             }
     
-    def _generate_3d_model_files(self, assembly, output_dir, session_id):
-        """✅ Generate 3D model files (STL, OBJ, PLY) from STEP"""
+    def _render_views(self, tasks, on_result):
+        """
+        Run render tasks - in a fork-based process pool when possible
+        
+        Forked children inherit the already imported shape (no STEP re-import or
+        serialization). on_result(name, result, stage_start) is called in this
+        process as each task completes.
+        """
+        workers = min(Config.RENDER_WORKERS, len(tasks))
+        parallel = (
+            workers > 1
+            and "fork" in multiprocessing.get_all_start_methods()
+            # fork() from a multi-threaded process (e.g. API with geometry pool disabled) is unsafe
+            and threading.active_count() == 1
+        )
+        
+        done = set()
+        if parallel:
+            global _FORK_STATE
+            _FORK_STATE = (self, tasks)
+            start_time = time.time()
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as executor:
+                    futures = [executor.submit(_render_view_task, index) for index in range(len(tasks))]
+                    for future in as_completed(futures):
+                        name, result, duration, stages = future.result()
+                        # Stage timings measured in the child are recorded in this process
+                        for stage in stages:
+                            record_stage(stage["stage"], stage["duration"], stage["error"])
+                        on_result(name, result, time.time() - duration)
+                        done.add(name)
+                print(f"[STEP-RENDER-3D] ⚡ {len(tasks)} render tasks completed in parallel "
+                      f"({workers} processes, {time.time() - start_time:.2f}s)")
+            except BrokenProcessPool as e:
+                print(f"[STEP-RENDER-3D] ⚠️ Render pool failed ({e}), rendering remaining views sequentially")
+            finally:
+                _FORK_STATE = None
+        
+        for name, method_name, args in tasks:
+            if name in done:
+                continue
+            stage_start = time.time()
+            try:
+                result = getattr(self, method_name)(*args)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            on_result(name, result, stage_start)
+    
+    @staticmethod
+    def _report_render(view_name, view_result, stage_start):
+        """Tek bir görünümün tamamlandığını ilerleme akışına bildir"""
+        views = view_result.get('views') or {view_name: view_result}
+        report_progress(
+            f"render_{view_name}",
+            status="completed" if view_result.get('success') else "failed",
+            duration=time.time() - stage_start,
+            views={
+                name: {"file_path": view.get('file_path'), "excel_path": view.get('excel_path')}
+                for name, view in views.items() if isinstance(view, dict) and view.get('success', True)
+            },
+            error=None if view_result.get('success') else (view_result.get('message') or view_result.get('error'))
+        )
+    
+    @timed("model_files")
+    def _generate_3d_model_files(self, context, output_dir, session_id):
+        """✅ Generate 3D model files (STL, OBJ, PLY, GLB) from one shared tessellation"""
         try:
             print(f"[3D-MODEL] 🔧 Generating 3D model files...")
             
-            # Get the main shape
-            shape = assembly.val()
-            
-            # 1. Generate STL file (for 3D viewer)
-            stl_path = os.path.join(output_dir, f"model_{session_id}.stl")
-            try:
-                # Export to STL using CadQuery
-                exporters.export(shape, stl_path)
-                stl_relative = f"static/stepviews/{session_id}/model_{session_id}.stl"
-                print(f"[3D-MODEL] ✅ STL generated: {stl_path}")
-            except Exception as stl_error:
-                print(f"[3D-MODEL] ⚠️ STL generation failed: {stl_error}")
-                stl_path = None
-                stl_relative = None
-            
-            # 2. Generate OBJ file (alternative format)
-            obj_path = os.path.join(output_dir, f"model_{session_id}.obj")
-            try:
-                # Convert to mesh using trimesh (simplified approach)
-                mesh = self._cadquery_to_trimesh(shape)
-                if mesh:
-                    mesh.export(obj_path)
-                    obj_relative = f"static/stepviews/{session_id}/model_{session_id}.obj"
-                    print(f"[3D-MODEL] ✅ OBJ generated: {obj_path}")
-                else:
-                    obj_path = None
-                    obj_relative = None
-            except Exception as obj_error:
-                print(f"[3D-MODEL] ⚠️ OBJ generation failed: {obj_error}")
-                obj_path = None
-                obj_relative = None
-            
-            # 3. Generate PLY file (point cloud format)
-            ply_path = os.path.join(output_dir, f"model_{session_id}.ply")
-            try:
-                if mesh:
-                    mesh.export(ply_path)
-                    ply_relative = f"static/stepviews/{session_id}/model_{session_id}.ply"
-                    print(f"[3D-MODEL] ✅ PLY generated: {ply_path}")
-                else:
-                    ply_path = None
-                    ply_relative = None
-            except Exception as ply_error:
-                print(f"[3D-MODEL] ⚠️ PLY generation failed: {ply_error}")
-                ply_path = None
-                ply_relative = None
-            
-            # 4. Generate model statistics
-            stats = self._calculate_model_statistics(shape)
+            # One tessellation pass - every format is written from the same buffers
+            mesh = MeshBuffers.from_context(context)
+            print(f"[3D-MODEL] 🔺 Mesh: {mesh.vertex_count} vertices, {mesh.face_count} triangles")
             
-            return {
-                "success": True,
-                "stl_path": stl_relative,
-                "obj_path": obj_relative,
-                "ply_path": ply_relative,
-                "stl_file_path": stl_path,
-                "obj_file_path": obj_path,
-                "ply_file_path": ply_path,
-                "statistics": stats,
-                "formats": {
-                    "stl": bool(stl_path),
-                    "obj": bool(obj_path),
-                    "ply": bool(ply_path)
-                }
-            }
+            result = {"success": True, "formats": {}}
+            for file_format in self.MODEL_FORMATS:
+                file_path = os.path.join(output_dir, f"model_{session_id}.{file_format}")
+                try:
+                    with stage_timer(f"mesh_write_{file_format}"):
+                        mesh.write(file_path, file_format)
+                    result[f"{file_format}_path"] = f"static/stepviews/{session_id}/model_{session_id}.{file_format}"
+                    result[f"{file_format}_file_path"] = file_path
+                    print(f"[3D-MODEL] ✅ {file_format.upper()} generated: {file_path}")
+                except Exception as format_error:
+                    print(f"[3D-MODEL] ⚠️ {file_format.upper()} generation failed: {format_error}")
+                    result[f"{file_format}_path"] = None
+                    result[f"{file_format}_file_path"] = None
+                result["formats"][file_format] = bool(result[f"{file_format}_path"])
+            
+            # Model statistics
+            result["statistics"] = self._calculate_model_statistics(context)
+            result["statistics"]["mesh"] = {"vertices": mesh.vertex_count, "triangles": mesh.face_count}
+            return result
             
         except Exception as e:
             print(f"[3D-MODEL] ❌ 3D model generation failed: {str(e)}")
@@ -219,64 +305,12 @@ class StepRendererEnhanced:
                 "error": str(e)
             }
     
-    def _cadquery_to_trimesh(self, shape):
-        """Convert CadQuery shape to trimesh - simplified bounding box approach"""
-        try:
-            print(f"[TRIMESH] 🔄 Converting CadQuery shape to trimesh...")
-            
-            # Get bounding box from CadQuery shape
-            bbox = shape.BoundingBox()
-            
-            # Create bounding box vertices
-            vertices = np.array([
-                [bbox.xmin, bbox.ymin, bbox.zmin],  # 0: min corner
-                [bbox.xmax, bbox.ymin, bbox.zmin],  # 1: max x
-                [bbox.xmax, bbox.ymax, bbox.zmin],  # 2: max x,y
-                [bbox.xmin, bbox.ymax, bbox.zmin],  # 3: max y
-                [bbox.xmin, bbox.ymin, bbox.zmax],  # 4: max z
-                [bbox.xmax, bbox.ymin, bbox.zmax],  # 5: max x,z
-                [bbox.xmax, bbox.ymax, bbox.zmax],  # 6: max corner
-                [bbox.xmin, bbox.ymax, bbox.zmax],  # 7: max y,z
-            ])
-            
-            # Create bounding box faces (triangulated)
-            faces = np.array([
-                # Bottom face (z = zmin)
-                [0, 1, 2], [0, 2, 3],
-                # Top face (z = zmax)
-                [4, 7, 6], [4, 6, 5],
-                # Front face (y = ymin)
-                [0, 4, 5], [0, 5, 1],
-                # Back face (y = ymax)
-                [2, 6, 7], [2, 7, 3],
-                # Left face (x = xmin)
-                [0, 3, 7], [0, 7, 4],
-                # Right face (x = xmax)
-                [1, 5, 6], [1, 6, 2],
-            ])
-            
-            # Create trimesh
-            mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
-            
-            # Validate mesh
-            if mesh.is_valid:
-                print(f"[TRIMESH] ✅ Valid mesh created: {len(vertices)} vertices, {len(faces)} faces")
-                return mesh
-            else:
-                print(f"[TRIMESH] ⚠️ Invalid mesh created, attempting repair...")
-                mesh.fix_normals()
-                return mesh
-            
-        except Exception as e:
-            print(f"[TRIMESH] ❌ CadQuery to trimesh conversion failed: {e}")
-            return None
-    
-    def _calculate_model_statistics(self, shape):
+    def _calculate_model_statistics(self, context):
         """Calculate 3D model statistics"""
         try:
-            bbox = shape.BoundingBox()
-            volume = shape.Volume()
-            surface_area = shape.Area()
+            bbox = context.bounding_box
+            volume = context.volume
+            surface_area = context.area
             
             return {
                 "volume": round(volume, 3),
@@ -443,7 +477,7 @@ class StepRendererEnhanced:
     <script type="module">
         import * as THREE from 'https://esm.sh/three@0.160.0';
         import {{ OrbitControls }} from 'https://esm.sh/three@0.160.0/examples/jsm/controls/OrbitControls.js';
-        import {{ STLLoader }} from 'https://esm.sh/three@0.160.0/examples/jsm/loaders/STLLoader.js';
+        import {{ GLTFLoader }} from 'https://esm.sh/three@0.160.0/examples/jsm/loaders/GLTFLoader.js';
         
         // Scene setup
         const scene = new THREE.Scene();
@@ -473,11 +507,12 @@ class StepRendererEnhanced:
         
         // Load model
         let model = null;
-        const loader = new STLLoader();
-        const modelPath = '/static/stepviews/{session_id}/model_{session_id}.stl';
+        const loader = new GLTFLoader();
+        const modelPath = '/static/stepviews/{session_id}/model_{session_id}.glb';
         
-        loader.load(modelPath, function(geometry) {{
-            geometry.computeVertexNormals();
+        loader.load(modelPath, function(gltf) {{
+            // GLB carries the shared tessellation with per-face vertex normals
+            const geometry = gltf.scene.getObjectByProperty('isMesh', true).geometry;
             geometry.computeBoundingBox();
             
             const center = new THREE.Vector3();
@@ -508,7 +543,7 @@ class StepRendererEnhanced:
             controls.target.set(0, 0, 0);
             controls.update();
         }}, undefined, function(error) {{
-            console.error('STL loading failed:', error);
+            console.error('GLB loading failed:', error);
         }});
         
         // Controls
@@ -574,42 +609,151 @@ class StepRendererEnhanced:
     
     # ===== 2D RENDERING METHODS =====
     
-    def _generate_isometric_view(self, assembly, output_dir, dimensions, include_dimensions=True, high_quality=True):
-        """Generate isometric view with optional dimensions"""
+    def render_view(self, context, view_type, output_dir, dimensions, include_dimensions=True, high_quality=True):
+        """
+        Single render API for every view type
+        
+        Projection views (isometric, material, orthographic) are derived from the
+        cached base raster of their (direction, size) projection.
+        """
+        size = (1200, 900) if high_quality else (800, 600)
+        if view_type == "isometric":
+            return self._generate_isometric_view(context, output_dir, dimensions, include_dimensions, high_quality)
+        if view_type == "material":
+            return self._generate_material_view(context, output_dir, dimensions)
+        if view_type == "wireframe":
+            return self._generate_wireframe_view(context, output_dir, dimensions, high_quality)
+        if view_type == "technical":
+            return self._generate_technical_drawing(context, output_dir, dimensions)
+        if view_type in self.VIEW_DIRECTIONS:
+            return self._generate_orthographic_view(context, output_dir, view_type, self.VIEW_DIRECTIONS[view_type], size)
+        return {"success": False, "error": f"Unknown view type: {view_type}"}
+    
+    def view_projection(self, view_type, high_quality=True):
+        """(projection direction, size) a view is derived from - None for non-projection views"""
+        size = (1200, 900) if high_quality else (800, 600)
+        if view_type == "isometric":
+            return ISOMETRIC_DIRECTION, size
+        if view_type == "material":
+            return ISOMETRIC_DIRECTION, (1200, 900)
+        if view_type in self.VIEW_DIRECTIONS:
+            return self.VIEW_DIRECTIONS[view_type], size
+        return None
+    
+    @staticmethod
+    def projection_key(context, direction, size):
+        """Projection cache key: (shape hash, projection direction, size)"""
+        return (context.shape_hash, tuple(direction), tuple(size))
+    
+    @timed("render_projection")
+    def render_projection(self, context, output_dir, direction, size):
+        """
+        Projection of the shape as in-memory base raster (+ PNG on disk)
+        
+        RENDER_STYLE "shaded"/"shaded_edges" draws the viewer_high tessellation with the
+        NumPy z-buffer rasterizer (visible HLR edges overlaid with the same fit);
+        "lines" is the hidden-line drawing. SVG is written only when RENDER_SVG is
+        enabled. Computed at most once per (shape hash, direction, size); cached rasters
+        from another output directory are copied instead of re-projected.
+        """
+        key = self.projection_key(context, direction, size)
+        cached = self._cached_projection(key, output_dir)
+        if cached:
+            return cached
+        
         try:
-            # Export as SVG first
-            svg_path = os.path.join(output_dir, "isometric.svg")
-            exporters.export(
-                assembly, 
-                svg_path, 
-                opt={
-                    "projectionDir": (1, 1, 1),
-                    "width": 1200 if high_quality else 800,
-                    "height": 900 if high_quality else 600
-                }
-            )
-            
-            # Convert SVG to PNG
-            png_path = svg_path.replace(".svg", ".png")
-            cairosvg.svg2png(url=svg_path, write_to=png_path)
+            style = Config.RENDER_STYLE
+            edges = None
+            if style != "shaded" or Config.RENDER_SVG:
+                with stage_timer("hlr_projection"):
+                    edges = context.edge_projection(direction)
+            
+            if style == "lines":
+                with stage_timer("edge_rasterize"):
+                    image = edges.rasterize(size)
+            else:
+                mesh = ShadedMesh.from_buffers(MeshBuffers.from_context(context))
+                bounds = mesh.bounds(direction)
+                with stage_timer("mesh_rasterize"):
+                    image = mesh.rasterize(direction, size, shading=Config.RENDER_SHADING, bounds=bounds)
+                if style == "shaded_edges":
+                    with stage_timer("edge_rasterize"):
+                        image = edges.rasterize(size, show_hidden=False, bounds=bounds, background=image)
+            
+            name = "projection_{}_{}_{}_{}_{}x{}".format(context.shape_hash[:12], *direction, *size)
+            png_path = os.path.join(output_dir, f"{name}.png")
+            Image.fromarray(image).save(png_path)
+            
+            svg_path = None
+            if Config.RENDER_SVG:
+                svg_path = os.path.join(output_dir, f"{name}.svg")
+                with open(svg_path, "w", encoding="utf-8") as f:
+                    f.write(edges.to_svg(size))
+            
+            projection = {"success": True, "image": image, "png_path": png_path, "svg_path": svg_path}
+            self._remember_projection(key, projection)
+            return projection
             
-            # Add dimension annotations if requested
+        except Exception as e:
+            print(f"[STEP-RENDER-3D] ❌ Projection {direction} {size[0]}x{size[1]} failed: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    @classmethod
+    def _remember_projection(cls, key, projection):
+        with cls._projection_lock:
+            cls._projection_cache[key] = projection
+            cls._projection_cache.move_to_end(key)
+            while len(cls._projection_cache) > cls.PROJECTION_CACHE_SIZE:
+                cls._projection_cache.popitem(last=False)
+    
+    def _cached_projection(self, key, output_dir):
+        """Cached base raster for key inside output_dir (None on a miss)"""
+        with self._projection_lock:
+            projection = self._projection_cache.get(key)
+        if not projection:
+            return None
+        files = [k for k in ("png_path", "svg_path") if projection.get(k)]
+        if not all(os.path.exists(projection[k]) for k in files):
+            return None
+        if os.path.dirname(os.path.abspath(projection["png_path"])) == os.path.abspath(output_dir):
+            return projection
+        try:
+            local = dict(projection)
+            for k in files:
+                local[k] = os.path.join(output_dir, os.path.basename(projection[k]))
+                shutil.copyfile(projection[k], local[k])
+            return local
+        except OSError as e:
+            print(f"[STEP-RENDER-3D] ⚠️ Cached projection copy failed: {e}")
+            return None
+    
+    @timed("render_isometric")
+    def _generate_isometric_view(self, context, output_dir, dimensions, include_dimensions=True, high_quality=True):
+        """Generate isometric view with optional dimensions"""
+        try:
+            projection = self.render_projection(context, output_dir, *self.view_projection("isometric", high_quality))
+            if not projection['success']:
+                return {"success": False, "error": projection['error']}
+            svg_path = projection['svg_path']
+            png_path = projection['png_path']
+            img = Image.fromarray(projection['image'])
+            
+            # Add dimension annotations if requested (in memory, from the base raster)
             if include_dimensions:
-                annotated_path = self._add_dimension_annotations(
-                    png_path, dimensions, "isometric"
-                )
-                png_path = annotated_path
+                img = self._add_dimension_annotations(img, dimensions, "isometric")
+                png_path = os.path.join(output_dir, "isometric_annotated.png")
+                img.save(png_path)
             
-            # Create Excel-friendly version
-            excel_path = png_path.replace(".png", "_excel.png")
-            self._create_excel_version(png_path, excel_path)
+            # Create Excel-friendly version from the same buffer
+            excel_path = os.path.join(output_dir, "isometric_excel.png")
+            self._create_excel_version(img, excel_path)
             
             return {
                 "success": True,
                 "view_type": "isometric",
                 "file_path": png_path.replace(self.base_dir, "").lstrip("/\\"),
                 "excel_path": excel_path.replace(self.base_dir, "").lstrip("/\\"),
-                "svg_path": svg_path.replace(self.base_dir, "").lstrip("/\\"),
+                "svg_path": svg_path.replace(self.base_dir, "").lstrip("/\\") if svg_path else None,
                 "dimensions": dimensions,
                 "quality": "high" if high_quality else "standard"
             }
@@ -618,35 +762,22 @@ class StepRendererEnhanced:
             print(f"[STEP-RENDER-3D] ❌ Isometric view failed: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def _generate_wireframe_view(self, assembly, output_dir, dimensions, high_quality=True):
-        """Generate wireframe view using matplotlib"""
+    @timed("render_wireframe")
+    def _generate_wireframe_view(self, context, output_dir, dimensions, high_quality=True):
+        """Generate wireframe view - every model edge projected isometrically"""
         try:
-            # Extract vertices and edges from CadQuery object
-            shape = assembly.val()
-            
-            # Create matplotlib 3D plot
-            fig = plt.figure(figsize=(12, 9) if high_quality else (8, 6))
-            ax = fig.add_subplot(111, projection='3d')
-            
-            # Get bounding box for scaling
-            bbox = shape.BoundingBox()
-            
-            # Draw wireframe (simplified approach)
-            self._draw_bounding_box_wireframe(ax, bbox)
-            
-            # Set equal aspect ratio and labels
-            ax.set_xlabel('X (mm)')
-            ax.set_ylabel('Y (mm)')
-            ax.set_zlabel('Z (mm)')
-            ax.set_title('Wireframe View')
+            size = (1200, 900) if high_quality else (800, 600)
+            with stage_timer("edge_projection"):
+                edges = context.edge_projection(ISOMETRIC_DIRECTION, hidden_lines=False)
             
-            # Set view angle
-            ax.view_init(elev=20, azim=45)
+            drawing = LineDrawing(edges, size, show_hidden=False, line_width=1.2)
+            drawing.title("Wireframe View")
+            drawing.notes([
+                f"X: {dimensions['width']:.1f} mm   Y: {dimensions['height']:.1f} mm   Z: {dimensions['depth']:.1f} mm"
+            ])
             
-            # Save wireframe
             wireframe_path = os.path.join(output_dir, "wireframe.png")
-            plt.savefig(wireframe_path, dpi=300 if high_quality else 150, bbox_inches='tight')
-            plt.close()
+            drawing.save(wireframe_path)
             
             return {
                 "success": True,
@@ -659,41 +790,21 @@ class StepRendererEnhanced:
             print(f"[STEP-RENDER-3D] ❌ Wireframe view failed: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def _generate_technical_drawing(self, assembly, output_dir, dimensions):
-        """Generate technical drawing with dimensions"""
+    @timed("render_technical")
+    def _generate_technical_drawing(self, context, output_dir, dimensions):
+        """Generate technical drawing - front view hidden-line projection with dimension lines"""
         try:
-            # Create front view with dimensions
-            fig, ax = plt.subplots(figsize=(12, 8))
-            
-            bbox = assembly.val().BoundingBox()
-            
-            # Draw rectangle representing front view
-            rect = Rectangle(
-                (bbox.xmin, bbox.zmin), 
-                bbox.xlen, 
-                bbox.zlen, 
-                linewidth=2, 
-                edgecolor='black', 
-                facecolor='lightblue', 
-                alpha=0.3
-            )
-            ax.add_patch(rect)
-            
-            # Add dimension lines and text
-            self._add_dimension_lines(ax, bbox, dimensions)
-            
-            ax.set_xlim(bbox.xmin - bbox.xlen * 0.2, bbox.xmax + bbox.xlen * 0.2)
-            ax.set_ylim(bbox.zmin - bbox.zlen * 0.2, bbox.zmax + bbox.zlen * 0.2)
-            ax.set_aspect('equal')
-            ax.grid(True, alpha=0.3)
-            ax.set_xlabel('X (mm)')
-            ax.set_ylabel('Z (mm)')
-            ax.set_title('Technical Drawing - Front View')
-            
-            # Save technical drawing
+            with stage_timer("hlr_projection"):
+                edges = context.edge_projection(self.VIEW_DIRECTIONS["front"])
+            
+            drawing = LineDrawing(edges, (1500, 1000))
+            drawing.title("Technical Drawing - Front View")
+            drawing.dimension(0, f"{dimensions['width']:.1f} mm")
+            drawing.dimension(1, f"{dimensions['height']:.1f} mm")
+            drawing.notes([f"Depth: {dimensions['depth']:.1f} mm"])
+            
             technical_path = os.path.join(output_dir, "technical.png")
-            plt.savefig(technical_path, dpi=300, bbox_inches='tight')
-            plt.close()
+            drawing.save(technical_path)
             
             return {
                 "success": True,
@@ -706,27 +817,18 @@ class StepRendererEnhanced:
             print(f"[STEP-RENDER-3D] ❌ Technical drawing failed: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def _generate_material_view(self, assembly, output_dir, dimensions):
+    @timed("render_material")
+    def _generate_material_view(self, context, output_dir, dimensions):
         """Generate view with material annotations"""
         try:
-            # Start with isometric SVG
-            svg_path = os.path.join(output_dir, "material.svg")
-            exporters.export(
-                assembly, 
-                svg_path, 
-                opt={
-                    "projectionDir": (1, 1, 1),
-                    "width": 1200,
-                    "height": 900
-                }
-            )
-            
-            # Convert to PNG
-            png_path = svg_path.replace(".svg", ".png")
-            cairosvg.svg2png(url=svg_path, write_to=png_path)
+            # Same isometric projection as the isometric view (cached)
+            projection = self.render_projection(context, output_dir, *self.view_projection("material"))
+            if not projection['success']:
+                return {"success": False, "error": projection['error']}
             
-            # Add material annotations
-            annotated_path = self._add_material_annotations(png_path, dimensions)
+            # Add material annotations (in memory, from the base raster)
+            annotated_path = os.path.join(output_dir, "material_annotated.png")
+            self._add_material_annotations(Image.fromarray(projection['image']), dimensions).save(annotated_path)
             
             return {
                 "success": True,
@@ -739,65 +841,27 @@ class StepRendererEnhanced:
             print(f"[STEP-RENDER-3D] ❌ Material view failed: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def _generate_orthographic_views(self, assembly, output_dir, high_quality=True):
-        """Generate standard orthographic views"""
-        try:
-            views = {}
-            view_directions = {
-                "front": (0, 0, 1),
-                "back": (0, 0, -1),
-                "left": (-1, 0, 0),
-                "right": (1, 0, 0),
-                "top": (0, 1, 0),
-                "bottom": (0, -1, 0)
-            }
-            
-            size = (1200, 900) if high_quality else (800, 600)
-            
-            for name, direction in view_directions.items():
-                try:
-                    # Export SVG
-                    svg_path = os.path.join(output_dir, f"{name}.svg")
-                    exporters.export(
-                        assembly, 
-                        svg_path, 
-                        opt={
-                            "projectionDir": direction,
-                            "width": size[0],
-                            "height": size[1]
-                        }
-                    )
-                    
-                    # Convert to PNG
-                    png_path = svg_path.replace(".svg", ".png")
-                    cairosvg.svg2png(url=svg_path, write_to=png_path)
-                    
-                    views[name] = {
-                        "success": True,
-                        "view_type": name,
-                        "file_path": png_path.replace(self.base_dir, "").lstrip("/\\"),
-                        "svg_path": svg_path.replace(self.base_dir, "").lstrip("/\\")
-                    }
-                    
-                except Exception as e:
-                    print(f"[STEP-RENDER-3D] ⚠️ {name} view failed: {str(e)}")
-                    views[name] = {"success": False, "error": str(e)}
-            
-            return {
-                "success": True,
-                "views": views
-            }
-            
-        except Exception as e:
-            print(f"[STEP-RENDER-3D] ❌ Orthographic views failed: {str(e)}")
-            return {"success": False, "error": str(e)}
+    @timed("render_orthographic")
+    def _generate_orthographic_view(self, context, output_dir, name, direction, size):
+        """Generate a single orthographic view (the base projection raster)"""
+        projection = self.render_projection(context, output_dir, direction, size)
+        if not projection['success']:
+            print(f"[STEP-RENDER-3D] ⚠️ {name} view failed: {projection['error']}")
+            return {"success": False, "error": projection['error']}
+        
+        return {
+            "success": True,
+            "view_type": name,
+            "file_path": projection['png_path'].replace(self.base_dir, "").lstrip("/\\"),
+            "svg_path": projection['svg_path'].replace(self.base_dir, "").lstrip("/\\") if projection['svg_path'] else None
+        }
     
     # ===== HELPER METHODS =====
     
-    def _add_dimension_annotations(self, image_path, dimensions, view_type="isometric"):
-        """Add dimension annotations to image"""
+    def _add_dimension_annotations(self, image, dimensions, view_type="isometric"):
+        """Add dimension annotations - returns an annotated copy of the image"""
         try:
-            img = Image.open(image_path)
+            img = image.copy()
             draw = ImageDraw.Draw(img)
             
             # Try to use a better font
@@ -828,20 +892,16 @@ class StepRendererEnhanced:
             volume_text = f"Volume: {volume:.0f} mm³"
             draw.text((margin, y_offset), volume_text, fill="blue", font=font)
             
-            # Save annotated image
-            annotated_path = image_path.replace(".png", "_annotated.png")
-            img.save(annotated_path)
-            
-            return annotated_path
+            return img
             
         except Exception as e:
             print(f"[STEP-RENDER-3D] ⚠️ Annotation failed: {str(e)}")
-            return image_path
+            return image
     
-    def _add_material_annotations(self, image_path, dimensions):
-        """Add material information to image"""
+    def _add_material_annotations(self, image, dimensions):
+        """Add material information - returns an annotated copy of the image"""
         try:
-            img = Image.open(image_path)
+            img = image.copy()
             draw = ImageDraw.Draw(img)
             
             try:
@@ -865,19 +925,15 @@ class StepRendererEnhanced:
                 y_pos = y_start + i * 25
                 draw.text((width - 300, y_pos), text, fill="green", font=font)
             
-            annotated_path = image_path.replace(".png", "_material.png")
-            img.save(annotated_path)
-            
-            return annotated_path
+            return img
             
         except Exception as e:
             print(f"[STEP-RENDER-3D] ⚠️ Material annotation failed: {str(e)}")
-            return image_path
+            return image
     
-    def _create_excel_version(self, input_path, output_path):
-        """Create Excel-friendly smaller version"""
+    def _create_excel_version(self, img, output_path):
+        """Create Excel-friendly smaller version of an in-memory image"""
         try:
-            img = Image.open(input_path)
             # Resize to 33% for Excel compatibility
             width, height = img.size
             new_size = (int(width * 0.33), int(height * 0.33))
@@ -886,54 +942,6 @@ class StepRendererEnhanced:
         except Exception as e:
             print(f"[STEP-RENDER-3D] ⚠️ Excel version creation failed: {str(e)}")
     
-    def _draw_bounding_box_wireframe(self, ax, bbox):
-        """Draw wireframe bounding box"""
-        # Define the 8 vertices of the bounding box
-        x = [bbox.xmin, bbox.xmax]
-        y = [bbox.ymin, bbox.ymax] 
-        z = [bbox.zmin, bbox.zmax]
-        
-        # Draw the 12 edges of the bounding box
-        # Bottom face
-        ax.plot([x[0], x[1]], [y[0], y[0]], [z[0], z[0]], 'b-', linewidth=2)
-        ax.plot([x[1], x[1]], [y[0], y[1]], [z[0], z[0]], 'b-', linewidth=2)
-        ax.plot([x[1], x[0]], [y[1], y[1]], [z[0], z[0]], 'b-', linewidth=2)
-        ax.plot([x[0], x[0]], [y[1], y[0]], [z[0], z[0]], 'b-', linewidth=2)
-        
-        # Top face
-        ax.plot([x[0], x[1]], [y[0], y[0]], [z[1], z[1]], 'b-', linewidth=2)
-        ax.plot([x[1], x[1]], [y[0], y[1]], [z[1], z[1]], 'b-', linewidth=2)
-        ax.plot([x[1], x[0]], [y[1], y[1]], [z[1], z[1]], 'b-', linewidth=2)
-        ax.plot([x[0], x[0]], [y[1], y[0]], [z[1], z[1]], 'b-', linewidth=2)
-        
-        # Vertical edges
-        ax.plot([x[0], x[0]], [y[0], y[0]], [z[0], z[1]], 'b-', linewidth=2)
-        ax.plot([x[1], x[1]], [y[0], y[0]], [z[0], z[1]], 'b-', linewidth=2)
-        ax.plot([x[1], x[1]], [y[1], y[1]], [z[0], z[1]], 'b-', linewidth=2)
-        ax.plot([x[0], x[0]], [y[1], y[1]], [z[0], z[1]], 'b-', linewidth=2)
-    
-    def _add_dimension_lines(self, ax, bbox, dimensions):
-        """Add dimension lines to technical drawing"""
-        try:
-            # Horizontal dimension
-            y_dim = bbox.zmin - bbox.zlen * 0.1
-            ax.annotate('', xy=(bbox.xmax, y_dim), xytext=(bbox.xmin, y_dim),
-                       arrowprops=dict(arrowstyle='<->', color='red', lw=2))
-            ax.text((bbox.xmin + bbox.xmax) / 2, y_dim - bbox.zlen * 0.05, 
-                   f"{dimensions['width']:.1f}mm", ha='center', va='top', 
-                   fontsize=12, color='red', weight='bold')
-            
-            # Vertical dimension
-            x_dim = bbox.xmax + bbox.xlen * 0.1
-            ax.annotate('', xy=(x_dim, bbox.zmax), xytext=(x_dim, bbox.zmin),
-                       arrowprops=dict(arrowstyle='<->', color='red', lw=2))
-            ax.text(x_dim + bbox.xlen * 0.05, (bbox.zmin + bbox.zmax) / 2, 
-                   f"{dimensions['depth']:.1f}mm", ha='left', va='center', 
-                   fontsize=12, color='red', weight='bold', rotation=90)
-            
-        except Exception as e:
-            print(f"[STEP-RENDER-3D] ⚠️ Dimension lines failed: {str(e)}")
-    
     def _estimate_mass(self, dimensions, density=2.7):
         """Estimate mass assuming aluminum"""
         volume_mm3 = dimensions['width'] * dimensions['height'] * dimensions['depth']
@@ -942,22 +950,44 @@ class StepRendererEnhanced:
         return mass_g / 1000  # kg
 
 
+# ✅ Parallel view rendering (fork-based process pool)
+
+# (renderer, tasks) of the running _render_views call - inherited by forked children
+_FORK_STATE = None
+
+
+def _render_view_task(index):
+    """Render one view task inside a forked child, return (name, result, duration, stages)"""
+    renderer, tasks = _FORK_STATE
+    name, method_name, args = tasks[index]
+    start_time = time.time()
+    # Progress is reported by the parent; the inherited sink must not be written concurrently
+    with collect_stages() as stages, progress_sink(None):
+        try:
+            view_result = getattr(renderer, method_name)(*args)
+        except Exception as e:
+            view_result = {"success": False, "error": str(e)}
+    return name, view_result, time.time() - start_time, stages
+
+
 # ✅ 3D Model Utilities
 class ModelExporter:
     """Utility class for 3D model export operations"""
     
+    STEPVIEWS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "static", "stepviews")
+    
     @staticmethod
-    def export_step_to_stl(step_path, stl_path):
+    def export_step_to_stl(step_path, stl_path, context=None):
         """Export STEP file to STL format"""
         try:
             print(f"[MODEL-EXPORT] 🔄 Converting STEP to STL: {step_path}")
             
-            # Import STEP
-            assembly = cq.importers.importStep(step_path)
-            shape = assembly.val()
+            # Import STEP (only when no shared context is given)
+            if context is None:
+                context = StepShapeContext.load(step_path)
             
             # Export to STL
-            exporters.export(shape, stl_path)
+            ModelExporter.export_context_to_stl(context, stl_path)
             
             print(f"[MODEL-EXPORT] ✅ STL exported: {stl_path}")
             return True
@@ -967,19 +997,55 @@ class ModelExporter:
             return False
     
     @staticmethod
-    def create_3d_viewer_data(step_path, session_id):
+    def export_analysis_stl(step_path, analysis_id, context=None):
+        """Export the viewer STL of an analysis to static/stepviews/<analysis_id>/model_<analysis_id>.stl"""
+        try:
+            session_output_dir = os.path.join(ModelExporter.STEPVIEWS_DIR, analysis_id)
+            os.makedirs(session_output_dir, exist_ok=True)
+            
+            stl_filename = f"model_{analysis_id}.stl"
+            stl_path_full = os.path.join(session_output_dir, stl_filename)
+            
+            if not ModelExporter.export_step_to_stl(step_path, stl_path_full, context=context):
+                return {"success": False, "error": "STL export failed"}
+            
+            if not os.path.exists(stl_path_full):
+                return {"success": False, "error": "STL dosyası oluşturulamadı"}
+            
+            file_size = os.path.getsize(stl_path_full)
+            stl_relative = f"/static/stepviews/{analysis_id}/{stl_filename}"
+            print(f"[STL-CREATE] ✅ STL oluşturuldu: {stl_filename} ({file_size} bytes)")
+            
+            return {
+                "success": True,
+                "stl_path": stl_relative,
+                "stl_url": stl_relative,
+                "file_size": file_size
+            }
+            
+        except Exception as e:
+            print(f"[STL-CREATE] ❌ STL oluşturma hatası: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    @staticmethod
+    def export_context_to_stl(context, stl_path):
+        """Export a loaded STEP context to binary STL from its shared tessellation buffers"""
+        MeshBuffers.from_context(context).write_stl(stl_path)
+    
+    @staticmethod
+    def create_3d_viewer_data(step_path, session_id, context=None):
         """Create comprehensive 3D viewer data package"""
         try:
             print(f"[3D-DATA] 📦 Creating 3D viewer data package...")
             
-            # Import STEP
-            assembly = cq.importers.importStep(step_path)
-            shape = assembly.val()
+            # Import STEP (only when no shared context is given)
+            if context is None:
+                context = StepShapeContext.load(step_path)
             
             # Calculate comprehensive model data
-            bbox = shape.BoundingBox()
-            volume = shape.Volume()
-            surface_area = shape.Area()
+            bbox = context.bounding_box
+            volume = context.volume
+            surface_area = context.area
             
             # Center of mass (simplified)
             center = [
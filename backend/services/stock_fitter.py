@@ -0,0 +1,314 @@
+# services/stock_fitter.py - Convex hull based stock fitting (approximate OBB + enclosing cylinder)
+import math
+import numpy as np
+from scipy.spatial import ConvexHull, QhullError
+
+STOCK_METHODS = ("aabb", "obb", "cylinder", "min")
+
+# step_analysis içindeki hacim anahtarları
+STOCK_VOLUME_KEYS = {
+    "aabb": "Prizma Hacmi (mm³)",
+    "obb": "Min. Prizma Hacmi (mm³)",
+    "cylinder": "Silindir Hacmi (mm³)"
+}
+
+
+def always_round_up(value):
+    """Padding'li stok boyutunu üst tam sayıya yuvarla (0.01 mm'den küçük artıklar yok sayılır)"""
+    return int(value) if abs(value - int(value)) < 0.01 else int(value) + 1
+
+
+class StockFitter:
+    """
+    Tessellation'ın convex hull'u üzerinden ham malzeme (stok) boyutlandırma.
+
+    Her iki sonuç da aday eksen kümesi üzerinde yaklaşıktır: gerçek minimumun
+    hacmine eşit veya ondan büyüktür (stok için güvenli taraf). Kesin minimum hacimli
+    kutu (O'Rourke, hull kenar çiftleri) ve kesin minimum silindir (sürekli eksen
+    araması) yerine:
+
+    - Yaklaşık minimum hacimli yönlendirilmiş bounding box (OBB): hull yüz normalleri,
+      PCA ve koordinat eksenleri aday eksen olarak alınır; her eksen için hull
+      izdüşümünün minimum alanlı dikdörtgeni rotating calipers ile bulunur (eksen
+      başına kesin).
+    - Yaklaşık minimum çevreleyen silindir: aynı aday eksenlerde izdüşümün minimum
+      çevreleyen çemberi (Welzl, eksen başına kesin) ve eksen boyunca yükseklik.
+    """
+
+    PADDING_MM = 10.0
+    MAX_BOX_AXES = 512          # OBB için en büyük alanlı hull yüz normali sayısı
+    MAX_CYLINDER_AXES = 64      # Silindir için aday eksen sayısı (eksen başına Welzl)
+    NORMAL_DECIMALS = 6         # Normal tekilleştirme hassasiyeti
+
+    # ===== PUBLIC API =====
+
+    @classmethod
+    def fit(cls, vertices):
+        """
+        Vertex dizisi için yaklaşık OBB ve silindir stoklarını hesapla
+
+        Args:
+            vertices: (N, 3) tessellation vertex'leri
+
+        Returns:
+            Dict: "obb" ve "cylinder" sonuçları (ham ve padding'li boyutlar,
+            aday eksenlere göre yaklaşık - "approximate": True)
+        """
+        points = cls._hull_points(vertices)
+        axes = cls._candidate_axes(points)
+
+        box_axes = axes[:cls.MAX_BOX_AXES]
+        cylinder_axes = axes[:cls.MAX_CYLINDER_AXES]
+
+        return {
+            "obb": cls.approximate_min_volume_box(points, box_axes),
+            "cylinder": cls.approximate_min_enclosing_cylinder(points, cylinder_axes),
+            "hull_point_count": len(points),
+            "candidate_axis_count": len(axes)
+        }
+
+    @classmethod
+    def approximate_min_volume_box(cls, points, axes):
+        """
+        Aday eksenler üzerinde en küçük hacimli OBB (gerçek minimum hacme eşit veya büyük)
+
+        Eksen yönündeki yükseklikler ve düzlem izdüşümleri tüm eksenler için tek matris
+        çarpımıyla hesaplanır; eksen başına yalnızca 2D hull + rotating calipers kalır.
+        """
+        heights = cls._extents(points, axes)
+        planar = cls._project_planes(points, axes)
+
+        best = None
+        for index in range(len(axes)):
+            width, depth, angle = cls._min_area_rectangle(planar[:, index])
+            volume = width * depth * heights[index]
+            if best is None or volume < best["volume"]:
+                best = {"volume": volume, "index": index, "dimensions": (width, depth, float(heights[index])),
+                        "angle": angle}
+
+        u, v = cls._plane_basis(axes[best["index"]])
+        angle = best["angle"]
+        box_axes = (math.cos(angle) * u + math.sin(angle) * v, -math.sin(angle) * u + math.cos(angle) * v,
+                    axes[best["index"]])
+
+        # Boyutlar büyükten küçüğe sıralanır (X ≥ Y ≥ Z)
+        order = np.argsort(best["dimensions"])[::-1]
+        dimensions = [float(best["dimensions"][i]) for i in order]
+        padded = [always_round_up(d + cls.PADDING_MM) for d in dimensions]
+
+        return {
+            "dimensions": dimensions,
+            "padded_dimensions": padded,
+            "volume": float(best["volume"]),
+            "padded_volume": float(padded[0] * padded[1] * padded[2]),
+            "axes": [box_axes[i].tolist() for i in order],
+            "approximate": True
+        }
+
+    @classmethod
+    def approximate_min_enclosing_cylinder(cls, points, axes):
+        """Aday eksenler üzerinde en küçük hacimli çevreleyen silindir (gerçek minimuma eşit veya büyük)"""
+        heights = cls._extents(points, axes)
+        planar = cls._project_planes(points, axes)
+
+        best = None
+        for index, axis in enumerate(axes):
+            radius = cls._min_enclosing_circle(planar[:, index])
+            volume = math.pi * radius * radius * heights[index]
+            if best is None or volume < best["volume"]:
+                best = {"volume": volume, "diameter": 2 * radius, "height": float(heights[index]), "axis": axis}
+
+        padded_diameter = always_round_up(best["diameter"] + cls.PADDING_MM)
+        padded_height = always_round_up(best["height"] + cls.PADDING_MM)
+
+        return {
+            "diameter": float(best["diameter"]),
+            "height": float(best["height"]),
+            "padded_diameter": padded_diameter,
+            "padded_height": padded_height,
+            "volume": float(best["volume"]),
+            "padded_volume": float(math.pi * (padded_diameter / 2) ** 2 * padded_height),
+            "axis": best["axis"].tolist(),
+            "approximate": True
+        }
+
+    @staticmethod
+    def select_stock_volume(step_analysis, method):
+        """
+        Malzeme maliyetinde kullanılacak stok hacmini seç
+
+        Args:
+            step_analysis: analyze_step_file sonucu
+            method: "aabb", "obb", "cylinder" veya "min" (mevcut olanların en küçüğü)
+
+        Returns:
+            (hacim, kullanılan yöntem) - istenen hacim yoksa "aabb"ye düşülür
+        """
+        if method not in STOCK_METHODS:
+            method = "aabb"
+
+        if method == "min":
+            candidates = [
+                (step_analysis.get(key), name) for name, key in STOCK_VOLUME_KEYS.items()
+                if step_analysis.get(key)
+            ]
+            if candidates:
+                return min(candidates)
+            method = "aabb"
+
+        volume = step_analysis.get(STOCK_VOLUME_KEYS.get(method, ""))
+        if not volume:
+            return step_analysis.get(STOCK_VOLUME_KEYS["aabb"]), "aabb"
+        return volume, method
+
+    # ===== HULL & EKSENLER =====
+
+    @staticmethod
+    def _hull_points(vertices):
+        """Convex hull vertex'leri (düzlemsel/dejenere parçalarda tüm noktalar)"""
+        vertices = np.unique(np.asarray(vertices, dtype=np.float64).reshape(-1, 3), axis=0)
+        try:
+            hull = ConvexHull(vertices)
+            return vertices[hull.vertices]
+        except (QhullError, ValueError):
+            return vertices
+
+    @classmethod
+    def _candidate_axes(cls, points):
+        """
+        Aday eksenler - önce koordinat eksenleri ve PCA, sonra alanı büyükten küçüğe
+        tekilleştirilmiş hull yüz normalleri
+
+        Returns:
+            (K, 3) birim vektörler
+        """
+        axes = [np.eye(3)]
+
+        centered = points - points.mean(axis=0)
+        if len(points) >= 3:
+            _, _, principal = np.linalg.svd(centered, full_matrices=False)
+            axes.append(principal)
+
+        try:
+            hull = ConvexHull(points)
+            normals = hull.equations[:, :3]
+            triangles = points[hull.simplices]
+            areas = 0.5 * np.linalg.norm(
+                np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]), axis=1
+            )
+            # n ve -n aynı eksendir - ilk sıfır olmayan bileşen pozitif yapılır
+            signs = np.sign(normals[np.arange(len(normals)), np.argmax(np.abs(normals) > 1e-9, axis=1)])
+            normals = normals * signs[:, None]
+            keys, inverse = np.unique(np.round(normals, cls.NORMAL_DECIMALS), axis=0, return_inverse=True)
+            face_area = np.bincount(inverse.ravel(), weights=areas, minlength=len(keys))
+            order = np.argsort(face_area)[::-1]
+            unit = keys[order] / np.linalg.norm(keys[order], axis=1)[:, None]
+            axes.append(unit)
+        except (QhullError, ValueError):
+            pass
+
+        return np.vstack(axes)
+
+    @staticmethod
+    def _extents(points, axes):
+        """Her aday eksen boyunca nokta kümesinin uzunluğu - (K,)"""
+        heights = points @ np.asarray(axes).T
+        return heights.max(axis=0) - heights.min(axis=0)
+
+    @classmethod
+    def _project_planes(cls, points, axes):
+        """Noktaların her eksene dik düzlemdeki (u, v) koordinatları - (N, K, 2)"""
+        bases = np.array([cls._plane_basis(axis) for axis in axes])        # (K, 2, 3)
+        return np.einsum("nd,kbd->nkb", points, bases)
+
+    @staticmethod
+    def _plane_basis(axis):
+        """Eksene dik düzlem için ortonormal (u, v) tabanı"""
+        helper = np.array([1.0, 0.0, 0.0]) if abs(axis[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+        u = np.cross(axis, helper)
+        u /= np.linalg.norm(u)
+        v = np.cross(axis, u)
+        return u, v
+
+    # ===== 2D YARDIMCILAR =====
+
+    @staticmethod
+    def _min_area_rectangle(planar):
+        """
+        2D nokta kümesinin minimum alanlı çevreleyen dikdörtgeni (rotating calipers)
+
+        Returns:
+            (genişlik, derinlik, açı) - açı dikdörtgenin ilk kenarının u eksenine açısı
+        """
+        try:
+            hull = ConvexHull(planar)
+            polygon = planar[hull.vertices]
+        except (QhullError, ValueError):
+            polygon = planar
+
+        edges = np.roll(polygon, -1, axis=0) - polygon
+        angles = np.unique(np.mod(np.arctan2(edges[:, 1], edges[:, 0]), math.pi / 2))
+        if len(angles) == 0:
+            angles = np.zeros(1)
+
+        cos_a, sin_a = np.cos(angles), np.sin(angles)
+        proj_u = polygon[:, :1] * cos_a + polygon[:, 1:] * sin_a      # (m, k)
+        proj_v = -polygon[:, :1] * sin_a + polygon[:, 1:] * cos_a
+        widths = proj_u.max(axis=0) - proj_u.min(axis=0)
+        depths = proj_v.max(axis=0) - proj_v.min(axis=0)
+
+        best = int(np.argmin(widths * depths))
+        return float(widths[best]), float(depths[best]), float(angles[best])
+
+    @classmethod
+    def _min_enclosing_circle(cls, planar):
+        """2D minimum çevreleyen çember yarıçapı (hull üzerinde iteratif Welzl)"""
+        try:
+            hull = ConvexHull(planar)
+            points = planar[hull.vertices]
+        except (QhullError, ValueError):
+            points = np.unique(planar, axis=0)
+
+        points = points[np.random.default_rng(0).permutation(len(points))]
+        tolerance = 1e-9
+
+        def first_outside(center, radius, start, stop):
+            """points[start:stop] içinde çemberin dışındaki ilk noktanın indeksi (vektörel tarama)"""
+            if stop <= start:
+                return None
+            outside = np.flatnonzero(np.linalg.norm(points[start:stop] - center, axis=1) > radius + tolerance)
+            return start + int(outside[0]) if len(outside) else None
+
+        # Welzl'in iteratif biçimi; içerideki noktalar tek tek değil dilim halinde atlanır
+        center, radius = points[0], 0.0
+        i = first_outside(center, radius, 1, len(points))
+        while i is not None:
+            center, radius = points[i], 0.0
+            j = first_outside(center, radius, 0, i)
+            while j is not None:
+                center = (points[i] + points[j]) / 2
+                radius = np.linalg.norm(points[i] - center)
+                k = first_outside(center, radius, 0, j)
+                while k is not None:
+                    center, radius = cls._circumcircle(points[i], points[j], points[k])
+                    k = first_outside(center, radius, k + 1, j)
+                j = first_outside(center, radius, j + 1, i)
+            i = first_outside(center, radius, i + 1, len(points))
+
+        return float(radius)
+
+    @staticmethod
+    def _circumcircle(a, b, c):
+        """Üç noktadan geçen çember (doğrusal noktalarda en uzak çift)"""
+        d = 2 * (a[0] * (b[1] - c[1]) + b[0] * (c[1] - a[1]) + c[0] * (a[1] - b[1]))
+        if abs(d) < 1e-12:
+            pairs = [(a, b), (a, c), (b, c)]
+            p, q = max(pairs, key=lambda pair: np.linalg.norm(pair[0] - pair[1]))
+            center = (p + q) / 2
+            return center, np.linalg.norm(p - center)
+
+        a2, b2, c2 = a @ a, b @ b, c @ c
+        ux = (a2 * (b[1] - c[1]) + b2 * (c[1] - a[1]) + c2 * (a[1] - b[1])) / d
+        uy = (a2 * (c[0] - b[0]) + b2 * (a[0] - c[0]) + c2 * (b[0] - a[0])) / d
+        center = np.array([ux, uy])
+        return center, np.linalg.norm(a - center)
@@ -0,0 +1,94 @@
+# services/tessellation.py - Adaptive, parallel OCCT tessellation
+#
+# Lineer sapma parça boyutuna göre seçilir: bounding box köşegeninin bir oranı
+# (LOD başına), mm cinsinden alt/üst sınırlarla. 2 m'lik bir kaynaklı konstrüksiyon ile
+# 10 mm'lik bir pim aynı göreli hassasiyette üçgenlenir.
+#
+# LOD'lar:
+#   analysis     - yönlendirme araması ve stok hesabı (en hassas)
+#   viewer_high  - model export (STL/OBJ/PLY/GLB), shaded render, viewer tam seviye
+#   viewer_low   - viewer'ın ilk gösterdiği kaba seviye
+import time
+import numpy as np
+from OCP.BRep import BRep_Tool
+from OCP.BRepMesh import BRepMesh_IncrementalMesh
+from OCP.IMeshTools import IMeshTools_Parameters
+from OCP.TopAbs import TopAbs_FACE, TopAbs_REVERSED
+from OCP.TopExp import TopExp_Explorer
+from OCP.TopLoc import TopLoc_Location
+from OCP.TopoDS import TopoDS
+from config import Config
+from services.metrics import record_stage
+
+
+class TessellationService:
+    """Köşegene göre sapma seçimi ve paralel BRepMesh üçgenleme"""
+
+    LODS = ("analysis", "viewer_high", "viewer_low")
+
+    @staticmethod
+    def deflection(diagonal, lod="analysis"):
+        """
+        LOD için (lineer sapma mm, açısal sapma radyan)
+
+        Args:
+            diagonal: Şeklin bounding box köşegeni (mm)
+            lod: analysis / viewer_high / viewer_low
+        """
+        if lod not in Config.TESSELLATION_LODS:
+            raise ValueError(f"Bilinmeyen tessellation LOD'u: {lod}")
+        ratio, angular = Config.TESSELLATION_LODS[lod]
+        linear = min(max(diagonal * ratio, Config.TESSELLATION_MIN_DEFLECTION), Config.TESSELLATION_MAX_DEFLECTION)
+        return linear, angular
+
+    @staticmethod
+    def mesh(shape, linear_deflection, angular_deflection):
+        """
+        Şekli BRepMesh ile üçgenle ve NumPy dizilerine çıkar
+
+        Paralel modda yüzeyler tüm çekirdeklerde üçgenlenir. Aynı TopoDS yüzeyleri
+        farklı compound'larda paylaşıldığı için mevcut (daha hassas) üçgenlemenin
+        kabalaştırılmasına izin verilir; her çağrı istenen sapmayı üretir.
+
+        Returns:
+            (vertices (N, 3) float64, triangles (M, 3) int64)
+        """
+        start_time = time.time()
+        parameters = IMeshTools_Parameters()
+        parameters.Deflection = linear_deflection
+        parameters.Angle = angular_deflection
+        parameters.Relative = False
+        parameters.InParallel = Config.TESSELLATION_PARALLEL
+        parameters.AllowQualityDecrease = True
+        BRepMesh_IncrementalMesh(shape.wrapped, parameters)
+        record_stage("brep_mesh", time.time() - start_time)
+
+        vertex_blocks, triangle_blocks = [], []
+        offset = 0
+        explorer = TopExp_Explorer(shape.wrapped, TopAbs_FACE)
+        while explorer.More():
+            face = TopoDS.Face_s(explorer.Current())
+            explorer.Next()
+            location = TopLoc_Location()
+            triangulation = BRep_Tool.Triangulation_s(face, location)
+            if triangulation is None or triangulation.NbTriangles() == 0:
+                continue
+
+            transform = location.Transformation()
+            nodes = np.array([
+                triangulation.Node(i).Transformed(transform).Coord()
+                for i in range(1, triangulation.NbNodes() + 1)
+            ], dtype=np.float64)
+            triangles = np.array([
+                triangulation.Triangle(i).Get() for i in range(1, triangulation.NbTriangles() + 1)
+            ], dtype=np.int64) - 1
+            if face.Orientation() == TopAbs_REVERSED:
+                triangles = triangles[:, ::-1]
+
+            vertex_blocks.append(nodes)
+            triangle_blocks.append(triangles + offset)
+            offset += len(nodes)
+
+        if not vertex_blocks:
+            return np.zeros((0, 3), dtype=np.float64), np.zeros((0, 3), dtype=np.int64)
+        return np.concatenate(vertex_blocks), np.concatenate(triangle_blocks)
@@ -0,0 +1,110 @@
+# services/title_block.py - Title-block region-of-interest OCR
+#
+# Malzeme bilgisi teknik resimlerde neredeyse her zaman antette (çerçevenin sağ alt
+# köşesindeki tablo) bulunur. Yerleşim düşük çözünürlüklü raster üzerinde OpenCV ile
+# çıkarılır:
+#   1) Yatay / dikey çizgiler morfolojik açma ile ayrılır (yazı ve geometri elenir)
+#   2) En büyük dikdörtgen çerçeve bulunur (yoksa sayfanın tamamı)
+#   3) Çizgi ızgarasının içindeki dikdörtgen boşluklar tablo hücreleridir; çerçevenin
+#      sağ alt bölgesindeki hücrelerin birleşimi antet bölgesidir
+# Yalnızca bu bölge yüksek çözünürlüklü raster'dan kırpılıp OCR'lanır. Bölge bulunamazsa
+# None döner ve çağıran tam sayfa OCR'a geçer.
+from typing import List, Optional, Tuple
+import cv2
+import numpy as np
+from config import Config
+from services.metrics import stage_timer
+from services.page_raster import PageRasterCache
+from services.page_ocr import OCRService
+
+MIN_TITLE_CELLS = 3
+REGION_PADDING = 0.01           # sayfa boyutunun oranı
+
+
+class TitleBlockService:
+    """Antet bölgesi tespiti ve yalnızca o bölgenin OCR'ı"""
+
+    @classmethod
+    def locate(cls, image) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Düşük çözünürlüklü sayfa görüntüsünde antet bölgesi
+
+        Returns:
+            (x0, y0, x1, y1) sayfa boyutuna oranla veya bulunamazsa None
+        """
+        gray = np.asarray(image.convert("L"))
+        height, width = gray.shape
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+        # Tablo / çerçeve çizgileri (hücre kenarı en az ~5 mm)
+        segment = max(10, Config.LAYOUT_DPI // 5)
+        horizontal = cv2.morphologyEx(binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (segment, 1)))
+        vertical = cv2.morphologyEx(binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, segment)))
+        grid = cv2.dilate(cv2.bitwise_or(horizontal, vertical), np.ones((3, 3), np.uint8))
+
+        # Çizim çerçevesi: sayfanın yarısından büyük en geniş dış kontur
+        frame = (0, 0, width, height)
+        contours, _ = cv2.findContours(grid, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if contours:
+            x, y, w, h = cv2.boundingRect(max(contours, key=cv2.contourArea))
+            if w * h >= 0.5 * width * height:
+                frame = (x, y, w, h)
+        frame_x, frame_y, frame_w, frame_h = frame
+
+        # Hücreler: ızgara dışındaki dikdörtgen boşluklar
+        _, _, stats, _ = cv2.connectedComponentsWithStats(cv2.bitwise_not(grid), connectivity=4)
+        cells = []
+        for left, top, w, h, area in stats[1:]:
+            if w < segment // 2 or h < segment // 4 or w * h > 0.05 * frame_w * frame_h:
+                continue
+            if area < 0.8 * w * h:
+                continue                                # dikdörtgen değil
+            center_x, center_y = left + w / 2, top + h / 2
+            if center_x > frame_x + 0.5 * frame_w and center_y > frame_y + 0.6 * frame_h:
+                cells.append((left, top, left + w, top + h))
+
+        if len(cells) < MIN_TITLE_CELLS:
+            return None
+
+        cells = np.array(cells, dtype=np.float64)
+        x0, y0 = cells[:, 0].min() / width - REGION_PADDING, cells[:, 1].min() / height - REGION_PADDING
+        x1, y1 = cells[:, 2].max() / width + REGION_PADDING, cells[:, 3].max() / height + REGION_PADDING
+        return float(max(x0, 0.0)), float(max(y0, 0.0)), float(min(x1, 1.0)), float(min(y1, 1.0))
+
+    @classmethod
+    def text(cls, pdf_path: str, page_numbers: Optional[List[int]] = None, rotation: int = 0,
+             dpi: int = 300) -> Optional[str]:
+        """
+        Sayfaların antet bölgelerinin OCR metni
+
+        Args:
+            pdf_path: PDF dosya yolu
+            page_numbers: Sayfalar (None = ilk 2 sayfa)
+            rotation: Saat yönünde döndürme (yön tespitinden)
+            dpi: OCR çözünürlüğü
+
+        Returns:
+            Birleşik metin veya hiçbir sayfada antet bulunamazsa None
+        """
+        page_numbers = page_numbers or [1, 2]
+        with stage_timer("title_block_layout"):
+            layouts = PageRasterCache.pages(pdf_path, dpi=Config.LAYOUT_DPI, rotation=rotation,
+                                            page_numbers=page_numbers)
+            regions = [cls.locate(image) for image in layouts]
+        if not any(regions):
+            print("[TITLE-BLOCK] ⚠️ Antet bulunamadı, tam sayfa OCR kullanılacak")
+            return None
+
+        pages = PageRasterCache.pages(pdf_path, dpi=dpi, rotation=rotation, page_numbers=page_numbers)
+        texts = []
+        for region, page in zip(regions, pages):
+            if region is None:
+                continue
+            width, height = page.size
+            box = (int(region[0] * width), int(region[1] * height), int(region[2] * width), int(region[3] * height))
+            # Kırpılan bölge raster anahtarı + kutu ile saklanır (pikseller hash'lenmez)
+            key = f"{OCRService.raster_key(page)}_tb{box[0]}-{box[1]}-{box[2]}-{box[3]}"
+            texts.append(OCRService.page(page.crop(box), key=key).text)
+            ratio = (box[2] - box[0]) * (box[3] - box[1]) / float(width * height)
+            print(f"[TITLE-BLOCK] 🔍 Antet OCR: {box} (sayfanın %{ratio * 100:.0f}'i)")
+        return "".join(texts)
@@ -0,0 +1,107 @@
+// compact_mesh_loader.js - EngTeklif progressive mesh (.etm) yükleyici
+//
+// services/compact_mesh.py tarafından üretilen LOD dosyalarını sırayla indirir:
+// önce kaba seviye gösterilir, sonraki seviyeler geldikçe geometri yenilenir.
+// THREE'ye bağımlı değildir; çözülmüş diziler BufferGeometry'ye doğrudan verilebilir.
+
+const MESH_MAGIC = "ETMS";
+const HEADER_SIZE = 44;
+const FLAG_UINT32_INDICES = 1;
+
+async function gunzipIfNeeded(buffer) {
+  const bytes = new Uint8Array(buffer);
+  // Sunucu Content-Encoding: gzip gönderdiyse tarayıcı zaten açmıştır
+  if (bytes.length < 2 || bytes[0] !== 0x1f || bytes[1] !== 0x8b) {
+    return buffer;
+  }
+  const stream = new Blob([bytes])
+    .stream()
+    .pipeThrough(new DecompressionStream("gzip"));
+  return new Response(stream).arrayBuffer();
+}
+
+function octDecode(encoded, count) {
+  const normals = new Float32Array(count * 3);
+  for (let i = 0; i < count; i++) {
+    let x = encoded[i * 2] / 127;
+    let y = encoded[i * 2 + 1] / 127;
+    const z = 1 - Math.abs(x) - Math.abs(y);
+    if (z < 0) {
+      const fx = x;
+      x = (1 - Math.abs(y)) * (fx >= 0 ? 1 : -1);
+      y = (1 - Math.abs(fx)) * (y >= 0 ? 1 : -1);
+    }
+    const length = Math.hypot(x, y, z) || 1;
+    normals[i * 3] = x / length;
+    normals[i * 3 + 1] = y / length;
+    normals[i * 3 + 2] = z / length;
+  }
+  return normals;
+}
+
+export function decodeCompactMesh(buffer) {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(
+    view.getUint8(0),
+    view.getUint8(1),
+    view.getUint8(2),
+    view.getUint8(3)
+  );
+  if (magic !== MESH_MAGIC) {
+    throw new Error("Geçersiz mesh dosyası");
+  }
+
+  const level = view.getUint16(6, true);
+  const vertexCount = view.getUint32(8, true);
+  const indexCount = view.getUint32(12, true);
+  const flags = view.getUint32(16, true);
+  const low = [0, 1, 2].map((i) => view.getFloat32(20 + i * 4, true));
+  const high = [0, 1, 2].map((i) => view.getFloat32(32 + i * 4, true));
+
+  let offset = HEADER_SIZE;
+  const quantized = new Uint16Array(buffer, offset, vertexCount * 3);
+  offset += vertexCount * 6;
+  const encodedNormals = new Int8Array(buffer, offset, vertexCount * 2);
+  offset += vertexCount * 2;
+  const indices =
+    flags & FLAG_UINT32_INDICES
+      ? new Uint32Array(buffer, offset, indexCount)
+      : new Uint16Array(buffer, offset, indexCount);
+
+  const positions = new Float32Array(vertexCount * 3);
+  const scale = [0, 1, 2].map((i) => (high[i] - low[i]) / 65535);
+  for (let i = 0; i < vertexCount * 3; i++) {
+    const axis = i % 3;
+    positions[i] = low[axis] + quantized[i] * scale[axis];
+  }
+
+  return {
+    level,
+    positions,
+    normals: octDecode(encodedNormals, vertexCount),
+    indices: indices.slice(),
+  };
+}
+
+// manifest: {lods: [{level, url, ...}]} veya manifest URL'i
+// onLevel(mesh, lod, isFinal) her seviye çözüldüğünde çağrılır
+export async function loadCompactMesh(manifest, onLevel, fetchOptions = {}) {
+  if (typeof manifest === "string") {
+    const response = await fetch(manifest, fetchOptions);
+    if (!response.ok) {
+      throw new Error(`Mesh manifest alınamadı (${response.status})`);
+    }
+    manifest = await response.json();
+  }
+
+  const lods = manifest.lods || [];
+  for (let i = 0; i < lods.length; i++) {
+    const response = await fetch(lods[i].url, fetchOptions);
+    if (!response.ok) {
+      throw new Error(`Mesh LOD ${lods[i].level} alınamadı (${response.status})`);
+    }
+    const buffer = await gunzipIfNeeded(await response.arrayBuffer());
+    onLevel(decodeCompactMesh(buffer), lods[i], i === lods.length - 1);
+  }
+  return manifest;
+}
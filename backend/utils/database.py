@@ -1,5 +1,20 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 from config import Config
+from services.metrics import record_stage
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo komut süreleri - her komut 'mongo_<komut>' aşaması olarak kaydedilir"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        record_stage(f"mongo_{event.command_name}", event.duration_micros / 1e6)
+
+    def failed(self, event):
+        record_stage(f"mongo_{event.command_name}", event.duration_micros / 1e6, error=True)
+
 
 class Database:
     _instance = None
@@ -13,7 +28,8 @@ class Database:
     
     def connect(self):
         if self._client is None:
-            self._client = MongoClient(Config.MONGO_URL)
+            # Komut süreleri /metrics'e ve analiz aşama dökümüne yazılır
+            self._client = MongoClient(Config.MONGO_URL, event_listeners=[MongoCommandMetrics()])
             self._db = self._client[Config.DATABASE_NAME]
             print(f"MongoDB'ye bağlanıldı: {Config.DATABASE_NAME}")
         return self._db
@@ -1,5 +1,5 @@
 import { useState, useCallback } from 'react';
-import { apiService, FileUploadResponse, AnalysisResult } from '../services/api';
+import { apiService, FileUploadResponse, AnalysisResult, BatchProgress } from '../services/api';
 
 export interface UploadedFile {
   file: File;
@@ -14,6 +14,7 @@ export const useFileUpload = () => {
   const [files, setFiles] = useState<UploadedFile[]>([]);
   const [isUploading, setIsUploading] = useState(false);
   const [totalProcessingTime, setTotalProcessingTime] = useState(0);
+  const [batchProgress, setBatchProgress] = useState<BatchProgress | null>(null);
 
   const addFiles = useCallback((newFiles: File[]) => {
     const uploadedFiles: UploadedFile[] = newFiles.map(file => ({
@@ -31,12 +32,111 @@ export const useFileUpload = () => {
   const clearFiles = useCallback(() => {
     setFiles([]);
     setTotalProcessingTime(0);
+    setBatchProgress(null);
   }, []);
 
   const updateFileStatus = useCallback((index: number, updates: Partial<UploadedFile>) => {
     setFiles(prev => prev.map((file, i) => i === index ? { ...file, ...updates } : file));
   }, []);
 
+  // Tamamlanmış analizin sonucunu al
+  const completeFromStatus = useCallback(async (index: number, analysisId: string) => {
+    const status = await apiService.getAnalysisStatus(analysisId, true);
+    if (status.success && status.result) {
+      updateFileStatus(index, { status: 'completed', progress: 100, result: status.result });
+    } else {
+      updateFileStatus(index, { status: 'failed', progress: 0, error: status.message || 'Analiz sonucu alınamadı' });
+    }
+  }, [updateFileStatus]);
+
+  // ✅ Toplu analiz - backend işleri paralel çalıştırır, burada sadece ilerleme izlenir
+  const analyzeBatch = useCallback(async (uploaded: Array<{ index: number; analysisId: string }>) => {
+    uploaded.forEach(({ index }) => updateFileStatus(index, { status: 'analyzing', progress: 55 }));
+
+    const batchResponse = await apiService.batchAnalyze(uploaded.map(({ analysisId }) => analysisId));
+    if (!batchResponse.success) {
+      uploaded.forEach(({ index }) => updateFileStatus(index, {
+        status: 'failed',
+        progress: 0,
+        error: batchResponse.message || 'Analiz başlatılamadı'
+      }));
+      return;
+    }
+
+    // Kuyruğa alınanlar batch durumundan, zaten çalışanlar kendi /status kayıtlarından izlenir
+    const indexById = new Map(uploaded.map(({ index, analysisId }) => [analysisId, index]));
+    const queuedIds = new Map<string, number>();
+    const runningIds = new Map<string, number>();
+
+    for (const item of batchResponse.results) {
+      const index = indexById.get(item.analysis_id);
+      if (index === undefined) continue;
+
+      if (item.status === 'queued') {
+        queuedIds.set(item.analysis_id, index);
+      } else if (item.status === 'already_running') {
+        runningIds.set(item.analysis_id, index);
+        updateFileStatus(index, { progress: 60 });
+      } else if (item.status === 'already_processed') {
+        await completeFromStatus(index, item.analysis_id);
+      } else {
+        // Dosya yok, yetki yok vb.
+        updateFileStatus(index, { status: 'failed', progress: 0, error: item.error || item.status });
+      }
+    }
+
+    while (queuedIds.size > 0 || runningIds.size > 0) {
+      await new Promise(resolve => setTimeout(resolve, 2000));
+
+      if (batchResponse.batch_id && queuedIds.size > 0) {
+        const statusResponse = await apiService.getBatchStatus(batchResponse.batch_id);
+        if (!statusResponse.success) {
+          queuedIds.forEach(index => updateFileStatus(index, {
+            status: 'failed',
+            progress: 0,
+            error: statusResponse.message || 'Toplu analiz durumu alınamadı'
+          }));
+          queuedIds.clear();
+        } else {
+          setBatchProgress(statusResponse.batch);
+
+          for (const item of statusResponse.batch.items) {
+            const index = queuedIds.get(item.analysis_id);
+            if (index === undefined) continue;
+
+            if (item.status === 'analyzing') {
+              updateFileStatus(index, { progress: 60 });
+            } else if (item.status === 'completed') {
+              queuedIds.delete(item.analysis_id);
+              await completeFromStatus(index, item.analysis_id);
+            } else if (item.status === 'failed') {
+              queuedIds.delete(item.analysis_id);
+              updateFileStatus(index, { status: 'failed', progress: 0, error: item.error || 'Analiz başarısız' });
+            }
+          }
+        }
+      }
+
+      for (const [analysisId, index] of Array.from(runningIds)) {
+        const status = await apiService.getAnalysisStatus(analysisId);
+        if (!status.success) {
+          runningIds.delete(analysisId);
+          updateFileStatus(index, { status: 'failed', progress: 0, error: status.message || 'Analiz durumu alınamadı' });
+        } else if (status.analysis.status === 'completed') {
+          runningIds.delete(analysisId);
+          await completeFromStatus(index, analysisId);
+        } else if (status.analysis.status === 'failed') {
+          runningIds.delete(analysisId);
+          updateFileStatus(index, {
+            status: 'failed',
+            progress: 0,
+            error: status.job?.error || status.analysis.error_message || 'Analiz başarısız'
+          });
+        }
+      }
+    }
+  }, [updateFileStatus, completeFromStatus]);
+
   const uploadAndAnalyze = useCallback(async () => {
     if (files.length === 0) return;
 
@@ -54,13 +154,13 @@ export const useFileUpload = () => {
     const startTime = Date.now();
 
     try {
-      // Sadece pending dosyaları upload et
+      // 1) Sadece pending dosyaları upload et
+      const uploaded: Array<{ index: number; analysisId: string }> = [];
+
       for (const { file, index } of pendingFiles) {
-        // Upload başlat
         updateFileStatus(index, { status: 'uploading', progress: 0 });
 
         try {
-          // Dosyayı upload et
           const uploadResponse: FileUploadResponse = await apiService.uploadSingleFile(file.file);
           
           if (uploadResponse.success && uploadResponse.file_info) {
@@ -69,25 +169,7 @@ export const useFileUpload = () => {
               progress: 50,
               analysisId: uploadResponse.file_info.analysis_id 
             });
-
-            // Analizi başlat
-            updateFileStatus(index, { status: 'analyzing', progress: 60 });
-
-            const analysisResponse = await apiService.analyzeFile(uploadResponse.file_info.analysis_id);
-            
-            if (analysisResponse.success) {
-              updateFileStatus(index, { 
-                status: 'completed', 
-                progress: 100,
-                result: analysisResponse 
-              });
-            } else {
-              updateFileStatus(index, { 
-                status: 'failed', 
-                progress: 0,
-                error: analysisResponse.message || 'Analiz başarısız' 
-              });
-            }
+            uploaded.push({ index, analysisId: uploadResponse.file_info.analysis_id });
           } else {
             updateFileStatus(index, { 
               status: 'failed', 
@@ -104,12 +186,17 @@ export const useFileUpload = () => {
         }
       }
 
+      // 2) ✅ Tüm dosyaları tek toplu analizde paralel çalıştır (küçük dosyalar önce)
+      if (uploaded.length > 0) {
+        await analyzeBatch(uploaded);
+      }
+
       const endTime = Date.now();
       setTotalProcessingTime((endTime - startTime) / 1000);
     } finally {
       setIsUploading(false);
     }
-  }, [files, updateFileStatus]);
+  }, [files, updateFileStatus, analyzeBatch]);
 
   const retryFile = useCallback(async (index: number) => {
     const file = files[index];
@@ -245,6 +332,7 @@ export const useFileUpload = () => {
     files,
     isUploading,
     totalProcessingTime,
+    batchProgress,
     addFiles,
     removeFile,
     clearFiles,
@@ -22,6 +22,7 @@ export interface FileUploadResponse {
 
 export interface AnalysisStatus {
   success: boolean;
+  message?: string;
   analysis: {
     id: string;
     status: string;
@@ -36,7 +37,89 @@ export interface AnalysisStatus {
     has_renders: boolean;
     material_matches_count: number;
     render_count: number;
+    job_id?: string;
+  };
+  job?: AnalysisJob;
+  queue?: {
+    queued: number;
+    running: number;
+    workers: number;
   };
+  result?: AnalysisResult;
+}
+
+// ✅ Asenkron analiz işi (POST /analyze -> 202)
+export interface AnalysisJob {
+  job_id: string;
+  analysis_id: string;
+  status: "queued" | "analyzing" | "completed" | "failed";
+  created_at: string;
+  started_at?: string | null;
+  finished_at?: string | null;
+  processing_time?: number | null;
+  error?: string | null;
+}
+
+// ✅ Toplu analiz ilerlemesi (/batch-status/<batch_id>)
+export interface BatchProgress {
+  batch_id: string;
+  created_at: string;
+  total: number;
+  counts: {
+    queued: number;
+    analyzing: number;
+    completed: number;
+    failed: number;
+  };
+  progress_percent: number;
+  finished: boolean;
+  elapsed_seconds: number;
+  estimated_remaining_seconds: number | null;
+  workers: number;
+  items: Array<{
+    job_id: string;
+    analysis_id: string;
+    status: string;
+    filename?: string;
+    file_size?: number;
+    processing_time?: number | null;
+    error?: string | null;
+  }>;
+}
+
+export interface BatchAnalyzeResponse {
+  success: boolean;
+  message: string;
+  batch_id: string | null;
+  status_url: string | null;
+  workers: number;
+  queued_count: number;
+  results: Array<{
+    analysis_id: string;
+    job_id?: string;
+    status: string;
+    filename?: string | null;
+    error?: string;
+  }>;
+}
+
+// ✅ SSE aşama olayı (/events/<analysis_id>)
+export interface AnalysisStageEvent {
+  seq: number;
+  stage: string; // analysis, step_import, orientation, dimensions, material_calculation, render_*, stl ...
+  status: "queued" | "started" | "completed" | "failed" | "skipped" | string;
+  timestamp: number;
+  duration: number | null;
+  payload: { [key: string]: any };
+}
+
+export interface AnalysisJobResponse {
+  success: boolean;
+  message: string;
+  job_id: string;
+  analysis_id: string;
+  status: string;
+  status_url: string;
 }
 
 export interface AnalysisResult {
@@ -183,21 +266,151 @@ class ApiService {
     return response.json();
   }
 
-  async analyzeFile(analysisId: string): Promise<AnalysisResult> {
+  // ✅ Analiz kuyruğa alınır (202) ve tamamlanana kadar durum sorgulanır
+  // onEvent verilirse aşamalar (boyutlar, fiyat, render'lar) geldikçe bildirilir
+  async analyzeFile(
+    analysisId: string,
+    pollIntervalMs = 2000,
+    onEvent?: (event: AnalysisStageEvent) => void
+  ): Promise<AnalysisResult> {
+    const job = await this.startAnalysis(analysisId);
+    if (!job.success || !job.job_id) {
+      return job as unknown as AnalysisResult;
+    }
+    if (onEvent) {
+      try {
+        await this.streamAnalysisEvents(analysisId, onEvent);
+      } catch (error) {
+        console.warn("Analiz olay akışı kesildi, durum sorgulamaya geçiliyor", error);
+      }
+    }
+    return this.waitForAnalysis(analysisId, pollIntervalMs);
+  }
+
+  // ✅ SSE akışı - EventSource Authorization header gönderemediği için fetch ile okunur
+  async streamAnalysisEvents(
+    analysisId: string,
+    onEvent: (event: AnalysisStageEvent) => void,
+    signal?: AbortSignal
+  ): Promise<void> {
+    const response = await fetch(
+      `${API_BASE_URL}/api/upload/events/${analysisId}`,
+      {
+        method: "GET",
+        headers: {
+          ...this.getAuthHeaders(),
+          Accept: "text/event-stream",
+        },
+        signal,
+      }
+    );
+    if (!response.ok || !response.body) {
+      throw new Error(`Olay akışı açılamadı (${response.status})`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary = buffer.indexOf("\n\n");
+      while (boundary !== -1) {
+        const chunk = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        const data = chunk
+          .split("\n")
+          .filter((line) => line.startsWith("data:"))
+          .map((line) => line.slice(5).trim())
+          .join("\n");
+        if (data) {
+          onEvent(JSON.parse(data) as AnalysisStageEvent);
+        }
+        boundary = buffer.indexOf("\n\n");
+      }
+    }
+  }
+
+  async startAnalysis(
+    analysisId: string,
+    options: { stock_method?: string } = {}
+  ): Promise<AnalysisJobResponse> {
     const response = await fetch(
       `${API_BASE_URL}/api/upload/analyze/${analysisId}`,
       {
         method: "POST",
         headers: this.getAuthHeaders(),
+        body: JSON.stringify(options),
       }
     );
 
     return response.json();
   }
 
-  async getAnalysisStatus(analysisId: string): Promise<AnalysisStatus> {
+  async waitForAnalysis(
+    analysisId: string,
+    pollIntervalMs = 2000
+  ): Promise<AnalysisResult> {
+    while (true) {
+      const status = await this.getAnalysisStatus(analysisId, true);
+      if (!status.success) {
+        return status as unknown as AnalysisResult;
+      }
+
+      if (status.analysis.status === "completed" && status.result) {
+        return status.result;
+      }
+      if (status.analysis.status === "failed") {
+        return {
+          success: false,
+          message:
+            status.job?.error ||
+            status.analysis.error_message ||
+            "Analiz başarısız",
+        } as AnalysisResult;
+      }
+
+      await new Promise((resolve) => setTimeout(resolve, pollIntervalMs));
+    }
+  }
+
+  async batchAnalyze(
+    analysisIds: string[],
+    options: { stock_method?: string; force?: boolean } = {}
+  ): Promise<BatchAnalyzeResponse> {
+    const response = await fetch(`${API_BASE_URL}/api/upload/batch-analyze`, {
+      method: "POST",
+      headers: this.getAuthHeaders(),
+      body: JSON.stringify({ analysis_ids: analysisIds, ...options }),
+    });
+
+    return response.json();
+  }
+
+  async getBatchStatus(
+    batchId: string
+  ): Promise<{ success: boolean; message?: string; batch: BatchProgress }> {
+    const response = await fetch(
+      `${API_BASE_URL}/api/upload/batch-status/${batchId}`,
+      {
+        method: "GET",
+        headers: this.getAuthHeaders(),
+      }
+    );
+
+    return response.json();
+  }
+
+  async getAnalysisStatus(
+    analysisId: string,
+    includeResult = false
+  ): Promise<AnalysisStatus> {
+    const query = includeResult ? "?include_result=true" : "";
     const response = await fetch(
-      `${API_BASE_URL}/api/upload/status/${analysisId}`,
+      `${API_BASE_URL}/api/upload/status/${analysisId}${query}`,
       {
         method: "GET",
         headers: this.getAuthHeaders(),